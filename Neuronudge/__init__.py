@@ -3,10 +3,11 @@ from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from flask_login import LoginManager
+from Neuronudge.routing import RoutingSession
 import os
 
 # --- Initialize extensions ---
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})  # replica-aware, see routing.py
 migrate = Migrate()
 login_manager = LoginManager()  # keep lowercase
 
@@ -21,26 +22,87 @@ def create_app():
     app = Flask(__name__)
 
     # --- Configuration ---
-    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///db.sqlite'
+    # Database URL and pool settings come from the environment (see engine.py)
+    from Neuronudge.engine import configure_database, create_schema, install_sqlite_pragmas
+    configure_database(app)
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
     app.config['SECRET_KEY'] = 'dev' #Replace later
     app.config['ALLOWED_EXTENSIONS'] = {"png","jpg","jpeg","gif"}
     app.config['UPLOAD_FOLDER'] = os.path.join(app.root_path, 'static', 'uploads', 'avatars')
     app.config['MAX_CONTENT_LENGTH'] = 2 * 1024 * 1024
+    # Task stats cache: 'memory' (per worker LRU) or 'redis' (shared across workers)
+    app.config['STATS_CACHE_BACKEND'] = os.environ.get('STATS_CACHE_BACKEND', 'memory')
+    app.config['STATS_CACHE_URL'] = os.environ.get('STATS_CACHE_URL', 'redis://localhost:6379/0')
+    app.config['STATS_CACHE_TTL'] = int(os.environ.get('STATS_CACHE_TTL', 60))
+    app.config['STATS_CACHE_SIZE'] = int(os.environ.get('STATS_CACHE_SIZE', 1024))
+    app.config['SEARCH_FTS_ENABLED'] = os.environ.get('SEARCH_FTS_ENABLED', '1') != '0'
+    # Audit events are buffered and written to ActivityLog in batches (see audit.py)
+    app.config['AUDIT_BATCH_SIZE'] = int(os.environ.get('AUDIT_BATCH_SIZE', 100))
+    app.config['AUDIT_FLUSH_INTERVAL_MS'] = int(os.environ.get('AUDIT_FLUSH_INTERVAL_MS', 500))
+    app.config['AUDIT_QUEUE_SIZE'] = int(os.environ.get('AUDIT_QUEUE_SIZE', 10000))
+    # Raw ActivityLog rows older than this are rolled up by `flask prune-activity`
+    app.config['ACTIVITY_RETENTION_DAYS'] = int(os.environ.get('ACTIVITY_RETENTION_DAYS', 90))
+    # Per-worker ring buffer behind the recent-activity feed
+    app.config['ACTIVITY_FEED_SIZE'] = int(os.environ.get('ACTIVITY_FEED_SIZE', 50))
+    app.config['ACTIVITY_FEED_TTL'] = int(os.environ.get('ACTIVITY_FEED_TTL', 30))
+    # /activity?since= polls resend events this recent, in case a lower id committed late
+    app.config['ACTIVITY_POLL_LAG_SECONDS'] = int(os.environ.get('ACTIVITY_POLL_LAG_SECONDS', 10))
+    # Reminders fire this long before a task is due; delivered by `flask run-reminders`
+    app.config['REMINDER_LEAD_MINUTES'] = int(os.environ.get('REMINDER_LEAD_MINUTES', 60))
+    app.config['REMINDER_NOTIFIER'] = os.environ.get('REMINDER_NOTIFIER', 'log')  # log, file or webhook
+    app.config['REMINDER_NOTIFIER_TARGET'] = os.environ.get('REMINDER_NOTIFIER_TARGET')
+    # Live dashboard updates: per-worker pub/sub, or 'redis' to share events between workers
+    app.config['LIVE_BROKER'] = os.environ.get('LIVE_BROKER', 'memory')
+    app.config['LIVE_BROKER_URL'] = os.environ.get('LIVE_BROKER_URL', 'redis://localhost:6379/0')
+    # Rendered dashboard widgets ({% cache %} blocks), keyed by user and data version.
+    # 'redis' shares version bumps between workers; with 'memory' other workers
+    # may serve a stale fragment for up to FRAGMENT_CACHE_TTL seconds
+    app.config['FRAGMENT_CACHE_ENABLED'] = os.environ.get('FRAGMENT_CACHE_ENABLED', '1') != '0'
+    app.config['FRAGMENT_CACHE_SIZE'] = int(os.environ.get('FRAGMENT_CACHE_SIZE', 2048))
+    app.config['FRAGMENT_CACHE_TTL'] = int(os.environ.get('FRAGMENT_CACHE_TTL', 60))
+    app.config['FRAGMENT_VERSION_BACKEND'] = os.environ.get('FRAGMENT_VERSION_BACKEND', app.config['STATS_CACHE_BACKEND'])
+    app.config['FRAGMENT_VERSION_URL'] = os.environ.get('FRAGMENT_VERSION_URL', app.config['STATS_CACHE_URL'])
+    # Compiled templates are cached on disk for every worker and preloaded at startup;
+    # an empty TEMPLATE_BYTECODE_CACHE_DIR turns the disk cache off
+    app.config['TEMPLATE_BYTECODE_CACHE_DIR'] = os.environ.get(
+        'TEMPLATE_BYTECODE_CACHE_DIR', os.path.join(app.instance_path, 'jinja_cache'))
+    app.config['TEMPLATE_PRELOAD'] = os.environ.get('TEMPLATE_PRELOAD', '1') != '0'
+    # On-the-fly response compression (see compression.py); br and zstd need the
+    # 'brotli' / 'zstandard' packages and are skipped when those are missing
+    app.config['COMPRESSION_ENABLED'] = os.environ.get('COMPRESSION_ENABLED', '1') != '0'
+    app.config['COMPRESSION_ENCODINGS'] = os.environ.get('COMPRESSION_ENCODINGS', 'br,gzip').split(',')
+    app.config['COMPRESSION_MIN_SIZE'] = int(os.environ.get('COMPRESSION_MIN_SIZE', 500))
+    # Serve source static files instead of the `flask build-assets` output
+    app.config['ASSETS_DEBUG'] = os.environ.get('ASSETS_DEBUG', '0') != '0'
     
     # --- Initialize extensions with app ---
     db.init_app(app)
-    migrate.init_app(app, db)
+    from Neuronudge.search import exclude_fts_tables
+    migrate.init_app(app, db, include_name=exclude_fts_tables)
     login_manager.init_app(app)
 
     # --- Import models to register with SQLAlchemy ---
     from Neuronudge import models  # ensures models are registered
 
+    from Neuronudge.stats import init_stats_cache
+    init_stats_cache(app)
+
+    from Neuronudge.fragments import init_fragments
+    init_fragments(app)
+
+    from Neuronudge.live import init_live
+    init_live(app)
+
+    from Neuronudge.audit import init_audit
+    init_audit(app)
+
     # --- Flask-Login user loader ---
     @login_manager.user_loader
     def load_user(user_id):
-        from Neuronudge.models import User  # local import to avoid circular import
-        return User.query.get(int(user_id))
+        # local import to avoid circular import
+        from Neuronudge.user_context import load_user_context
+        ctx = load_user_context(int(user_id))
+        return ctx.user if ctx else None
 
     os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 
@@ -54,14 +116,44 @@ def create_app():
 
     # --- Auto-create database tables if they don't exist ---
     with app.app_context():
-        db.create_all()
+        for engine in db.engines.values():
+            install_sqlite_pragmas(engine)
+        create_schema(app, db)  # stamps a new database at the latest migration
 
+        # Full-text task search (needs the task table to exist)
+        from Neuronudge.search import init_search
+        init_search(app)
+
+    from Neuronudge.routing import init_routing
+    init_routing(app)
+
+    # --- CLI commands (available through manage.py / flask) ---
+    from Neuronudge.importer import init_importer
+    init_importer(app)
+
+    from Neuronudge.activity import init_activity
+    init_activity(app)
+
+    from Neuronudge.progress import init_progress
+    init_progress(app)
+
+    from Neuronudge.reminders import init_reminders
+    init_reminders(app)
+
+    # --- Static assets: built bundles, precompressed variants ---
+    from Neuronudge.assets import init_assets
+    init_assets(app)
+
+    # --- HTTP caching: immutable fingerprinted static files, private pages ---
+    from Neuronudge.caching import init_caching
+    init_caching(app)
+
+    # --- Templates: bytecode cache and warm-up (after all Jinja extensions) ---
+    from Neuronudge.templating import init_templates
+    init_templates(app)
+
+    # --- Response compression: outermost WSGI layer ---
+    from Neuronudge.compression import init_compression
+    init_compression(app)
 
-    @app.after_request
-    def add_header(response):
-        response.headers["Cache-Control"] = "no-store, no-cache, must-revalidate, max-age=0"
-        response.headers["Pragma"] = "no-cache"
-        response.headers["Expires"] = "0"
-        return response
-    
     return app
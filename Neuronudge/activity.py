@@ -0,0 +1,213 @@
+# Neuronudge/activity.py
+from collections import OrderedDict, deque, namedtuple
+from datetime import date, datetime, timedelta
+from threading import Lock
+import time
+import click
+from flask import current_app
+from sqlalchemy import delete, func, select, union
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from . import db
+from .models import ActivityDaily, ActivityLog
+
+RECENT_ACTIVITY_LIMIT = 10
+
+
+class ActivityEvent(namedtuple('ActivityEvent', 'user_id action timestamp id', defaults=(None,))):
+    """
+    One audit event, as queued for ActivityLog and kept in the live feed.
+    id is the ActivityLog id, None until the audit writer has stored it.
+    """
+    __slots__ = ()
+
+    @property
+    def description(self):
+        # Name used by the dashboard "recent activity" templates
+        return self.action
+
+    def as_dict(self):
+        return {'id': self.id, 'action': self.action, 'timestamp': self.timestamp.isoformat()}
+
+
+class MemoryActivityFeed:
+    """
+    Per-user ring buffers of the latest events (one set per worker), LRU-bounded
+    by user count. A user's buffer is "seeded" once it has been merged with
+    ActivityLog; until then it only holds events recorded in this process.
+    Entries expire after `ttl` seconds so other workers' events show up.
+    """
+
+    def __init__(self, maxlen=50, maxusers=1024, ttl=30):
+        self.maxlen = maxlen
+        self.maxusers = maxusers
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = Lock()
+
+    def _live_entry(self, user_id):
+        entry = self._data.get(user_id)
+        if entry is not None and entry['expires_at'] < time.monotonic():
+            del self._data[user_id]
+            return None
+        return entry
+
+    def _store(self, user_id, entry):
+        self._data[user_id] = entry
+        self._data.move_to_end(user_id)
+        while len(self._data) > self.maxusers:
+            self._data.popitem(last=False)
+
+    def append(self, event):
+        with self._lock:
+            entry = self._live_entry(event.user_id)
+            if entry is None:
+                entry = {'expires_at': time.monotonic() + self.ttl, 'seeded': False,
+                         'events': deque(maxlen=self.maxlen)}
+            entry['events'].append(event)
+            self._store(event.user_id, entry)
+
+    def get(self, user_id):
+        """Buffered events, oldest first, or None if the buffer must be (re)seeded."""
+        with self._lock:
+            entry = self._live_entry(user_id)
+            if entry is None or not entry['seeded']:
+                return None
+            self._data.move_to_end(user_id)
+            return list(entry['events'])
+
+    def seed(self, user_id, stored_events):
+        """
+        Merge events read from ActivityLog with any recorded here that the
+        audit writer has not flushed yet, and mark the buffer seeded.
+        """
+        with self._lock:
+            entry = self._live_entry(user_id)
+            pending = entry['events'] if entry is not None else ()
+            merged = {(e.timestamp, e.action): e for e in stored_events}
+            for event in pending:
+                merged.setdefault((event.timestamp, event.action), event)
+            events = deque(sorted(merged.values(), key=lambda e: e.timestamp), maxlen=self.maxlen)
+            self._store(user_id, {'expires_at': time.monotonic() + self.ttl, 'seeded': True, 'events': events})
+            return list(events)
+
+
+def _to_event(row):
+    return ActivityEvent(row.user_id, row.action, row.timestamp, row.id)
+
+
+def _buffered_events(user_id):
+    """The user's ring buffer, seeded from ActivityLog (newest rows, one indexed query) on a miss."""
+    feed = current_app.extensions['activity_feed']
+    events = feed.get(user_id)
+    if events is None:
+        rows = db.session.execute(
+            select(ActivityLog)
+            .where(ActivityLog.user_id == user_id)
+            .order_by(ActivityLog.timestamp.desc(), ActivityLog.id.desc())
+            .limit(feed.maxlen)
+        ).scalars().all()
+        events = feed.seed(user_id, [_to_event(row) for row in rows])
+    return events
+
+
+def get_recent_activity(user_id, limit=RECENT_ACTIVITY_LIMIT):
+    """Latest events for a user, newest first."""
+    return _buffered_events(user_id)[::-1][:limit]
+
+
+def get_activity_since(user_id, since_id=None, limit=100, now=None):
+    """
+    Events for a poller that has seen everything up to ActivityLog id
+    `since_id`, oldest first (without since_id, the latest
+    RECENT_ACTIVITY_LIMIT). Pollers pass back the highest id they have got.
+
+    Read from ActivityLog, not the ring buffer, which never sees other
+    workers' events. An id is not a commit order either: on PostgreSQL two
+    audit writers can take ids 7 and 8 and commit 8 first, so a poller
+    already past 8 would never ask for 7. Events recorded in the last
+    ACTIVITY_POLL_LAG_SECONDS are therefore sent again whatever their id.
+    Clients drop ids they already have; the lag has to outlast an audit
+    batch's way from record() to commit.
+    """
+    query = select(ActivityLog).where(ActivityLog.user_id == user_id)
+    if since_id is None:
+        rows = db.session.execute(
+            query.order_by(ActivityLog.id.desc()).limit(RECENT_ACTIVITY_LIMIT)
+        ).scalars().all()[::-1]
+    else:
+        now = now or datetime.utcnow()
+        lag_start = now - timedelta(seconds=current_app.config.get('ACTIVITY_POLL_LAG_SECONDS', 10))
+        # A UNION so each half is a range on its own index (an OR scans all the user's rows)
+        wanted = union(
+            select(ActivityLog.id).where(ActivityLog.user_id == user_id, ActivityLog.id > since_id),
+            select(ActivityLog.id).where(ActivityLog.user_id == user_id, ActivityLog.timestamp > lag_start),
+        )
+        rows = db.session.execute(
+            select(ActivityLog).where(ActivityLog.id.in_(wanted)).order_by(ActivityLog.id.asc()).limit(limit)
+        ).scalars().all()
+    return [_to_event(row) for row in rows]
+
+
+def _upsert_daily(conn, rows):
+    # Add to an existing (user_id, day) bucket instead of replacing it
+    insert = pg_insert if conn.dialect.name == 'postgresql' else sqlite_insert
+    stmt = insert(ActivityDaily.__table__)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['user_id', 'day'],
+        set_={'count': ActivityDaily.__table__.c.count + stmt.excluded['count']},
+    )
+    conn.execute(stmt, rows)
+
+
+def _as_date(value):
+    # func.date() returns a string on SQLite and a date on PostgreSQL
+    return value if isinstance(value, date) else date.fromisoformat(value)
+
+
+def roll_up_and_prune(retention_days, now=None):
+    """
+    Fold raw ActivityLog rows older than `retention_days` into per-user daily
+    counts in ActivityDaily, then delete them. Works one day at a time so each
+    transaction stays small. Returns the number of raw rows removed.
+    """
+    now = now or datetime.utcnow()
+    cutoff = datetime.combine((now - timedelta(days=retention_days)).date(), datetime.min.time())
+    removed = 0
+    while True:
+        with db.engine.begin() as conn:
+            oldest = conn.execute(
+                select(func.min(ActivityLog.timestamp)).where(ActivityLog.timestamp < cutoff)
+            ).scalar()
+            if oldest is None:
+                return removed
+            start = datetime.combine(oldest.date(), datetime.min.time())
+            end = min(start + timedelta(days=1), cutoff)
+            in_bucket = (ActivityLog.timestamp >= start) & (ActivityLog.timestamp < end)
+            counts = conn.execute(
+                select(ActivityLog.user_id, func.date(ActivityLog.timestamp), func.count())
+                .where(in_bucket)
+                .group_by(ActivityLog.user_id, func.date(ActivityLog.timestamp))
+            ).all()
+            _upsert_daily(conn, [
+                {'user_id': user_id, 'day': _as_date(day), 'count': count}
+                for user_id, day, count in counts
+            ])
+            removed += conn.execute(delete(ActivityLog).where(in_bucket)).rowcount
+
+
+def init_activity(app):
+    app.extensions['activity_feed'] = MemoryActivityFeed(
+        maxlen=app.config.get('ACTIVITY_FEED_SIZE', 50),
+        maxusers=app.config.get('ACTIVITY_FEED_USERS', 1024),
+        ttl=app.config.get('ACTIVITY_FEED_TTL', 30),
+    )
+
+    @app.cli.command('prune-activity')
+    @click.option('--days', type=int, default=None,
+                  help="Days of raw activity to keep (defaults to ACTIVITY_RETENTION_DAYS).")
+    def prune_activity_command(days):
+        """Roll old ActivityLog rows up into daily counts and delete them."""
+        days = days if days is not None else app.config['ACTIVITY_RETENTION_DAYS']
+        removed = roll_up_and_prune(days)
+        print(f"Rolled up and removed {removed} activity rows older than {days} days.")
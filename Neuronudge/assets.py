@@ -0,0 +1,204 @@
+# Neuronudge/assets.py
+import gzip
+import hashlib
+import json
+import logging
+import os
+import re
+from flask import current_app, request, send_from_directory
+
+logger = logging.getLogger('neuronudge.assets')
+
+# Output name (what templates pass to url_for('static', filename=...)) -> sources
+# under static/, concatenated in order. Add a source to a list to bundle it.
+ASSET_BUNDLES = {
+    'style.css': ['style.css'],
+    'main.js': ['main.js'],
+    'css/js/timer.js': ['css/js/timer.js'],
+    'js/dashboard_customized.js': ['js/dashboard_customized.js'],
+}
+
+# Built files and manifest.json live here, relative to static/
+DIST_DIR = 'dist'
+MANIFEST_NAME = 'manifest.json'
+
+# Precompressed siblings, in order of preference
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+_MIMETYPES = {'.js': 'text/javascript', '.css': 'text/css'}
+
+
+# --- Minification ---
+
+def _minify_js(source):
+    try:
+        import rjsmin
+    except ImportError:
+        # No safe way to minify without a tokenizer: whitespace and `//` inside
+        # template literals, strings and regexes are content, so copy it as is
+        return source
+    return rjsmin.jsmin(source)
+
+
+_CSS_STRING = r'"(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\''
+
+
+def _squeeze_css(source):
+    # Whitespace before ':' stays: `a :hover` (any hovered descendant of a) is not `a:hover`
+    source = re.sub(r'\s*([{};,>])\s*', r'\1', re.sub(r'\s+', ' ', source))
+    return re.sub(r':\s+', ':', source)
+
+
+def _minify_css(source):
+    try:
+        import rcssmin
+    except ImportError:
+        # Fallback: drop comments and squeeze whitespace, leaving quoted strings untouched
+        source = re.sub(_CSS_STRING + r'|(/\*.*?\*/)', lambda m: '' if m.group(1) else m.group(), source, flags=re.S)
+        parts = re.split(f'({_CSS_STRING})', source, flags=re.S)
+        return ''.join(part if i % 2 else _squeeze_css(part) for i, part in enumerate(parts)).strip()
+    return rcssmin.cssmin(source)
+
+
+def minify(name, source):
+    if name.endswith('.js'):
+        return _minify_js(source)
+    if name.endswith('.css'):
+        return _minify_css(source)
+    return source
+
+
+def _brotli(data):
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return brotli.compress(data, quality=11)
+
+
+# --- Build ---
+
+def build_assets(static_folder, bundles=None):
+    """
+    Concatenate, minify and content-hash each bundle into static/dist, write
+    .gz and (with the 'brotli' package) .br siblings, then write the
+    manifest. Returns a size report row per bundle.
+    """
+    bundles = bundles or ASSET_BUNDLES
+    dist = os.path.join(static_folder, DIST_DIR)
+    os.makedirs(dist, exist_ok=True)
+    manifest = {}
+    report = []
+    for name, sources in bundles.items():
+        parts = []
+        for source in sources:
+            with open(os.path.join(static_folder, source), encoding='utf-8') as f:
+                parts.append(f.read())
+        # ';' keeps concatenated scripts from running into each other
+        joined = (';\n' if name.endswith('.js') else '\n').join(parts)
+        minified = minify(name, joined).encode('utf-8')
+
+        stem, ext = os.path.splitext(name)
+        digest = hashlib.md5(minified).hexdigest()[:12]
+        output = f"{DIST_DIR}/{stem}.{digest}.min{ext}"
+        path = os.path.join(static_folder, output)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(minified)
+
+        # mtime=0 keeps the .gz byte-identical across builds
+        gzipped = gzip.compress(minified, compresslevel=9, mtime=0)
+        with open(path + '.gz', 'wb') as f:
+            f.write(gzipped)
+        brotlied = _brotli(minified)
+        if brotlied is not None:
+            with open(path + '.br', 'wb') as f:
+                f.write(brotlied)
+
+        manifest[name] = output
+        report.append({
+            'name': name,
+            'output': output,
+            'source': len(joined.encode('utf-8')),
+            'minified': len(minified),
+            'gzip': len(gzipped),
+            'brotli': len(brotlied) if brotlied is not None else None,
+        })
+
+    with open(os.path.join(dist, MANIFEST_NAME), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return report
+
+
+def load_manifest(static_folder):
+    path = os.path.join(static_folder, DIST_DIR, MANIFEST_NAME)
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+# --- Serving ---
+
+def hashed_asset(filename):
+    """The built file that replaces `filename`, or None if it is not in the manifest."""
+    manifest = current_app.extensions.get('asset_manifest')
+    return manifest.get(filename) if manifest else None
+
+
+def is_hashed_asset(filename):
+    outputs = current_app.extensions.get('asset_outputs')
+    return bool(outputs) and filename in outputs
+
+
+def _serve_precompressed(static_view):
+    def static(filename):
+        if not is_hashed_asset(filename):
+            return static_view(filename=filename)
+        static_folder = current_app.static_folder
+        for encoding, suffix in ENCODINGS:
+            if request.accept_encodings[encoding] and os.path.isfile(os.path.join(static_folder, filename + suffix)):
+                response = send_from_directory(
+                    static_folder, filename + suffix,
+                    mimetype=_MIMETYPES.get(os.path.splitext(filename)[1])
+                )
+                response.headers['Content-Encoding'] = encoding
+                break
+        else:
+            response = static_view(filename=filename)
+        response.vary.add('Accept-Encoding')
+        return response
+    return static
+
+
+def _format_size(size):
+    return '-' if size is None else f"{size / 1024:.1f} KB"
+
+
+def init_assets(app):
+    """
+    Resolve url_for('static') through the build manifest (see caching.py) and
+    serve precompressed builds. With ASSETS_DEBUG, or before the first
+    `flask build-assets`, the source files are served as they are.
+    """
+    if not app.config.get('ASSETS_DEBUG'):
+        manifest = load_manifest(app.static_folder)
+        app.extensions['asset_manifest'] = manifest
+        app.extensions['asset_outputs'] = frozenset(manifest.values())
+    app.view_functions['static'] = _serve_precompressed(app.view_functions['static'])
+
+    @app.cli.command('build-assets')
+    def build_assets_command():
+        """Minify, fingerprint and precompress static bundles; print their weight."""
+        report = build_assets(app.static_folder)
+        print(f"{'bundle':<30} {'source':>10} {'minified':>10} {'gzip':>10} {'brotli':>10}")
+        for row in report:
+            print(f"{row['name']:<30} {_format_size(row['source']):>10} {_format_size(row['minified']):>10} "
+                  f"{_format_size(row['gzip']):>10} {_format_size(row['brotli']):>10}")
+        totals = {key: sum(row[key] or 0 for row in report) for key in ('source', 'minified', 'gzip', 'brotli')}
+        print(f"{'total':<30} {_format_size(totals['source']):>10} {_format_size(totals['minified']):>10} "
+              f"{_format_size(totals['gzip']):>10} {_format_size(totals['brotli'] or None):>10}")
+        if not any(row['brotli'] for row in report):
+            logger.warning("The 'brotli' package is not installed; only .gz files were written")
+        print(f"Wrote {len(report)} bundles to {os.path.join(app.static_folder, DIST_DIR)}.")
@@ -0,0 +1,150 @@
+# Neuronudge/audit.py
+import atexit
+import logging
+import queue
+import threading
+import time
+from datetime import datetime
+from flask import current_app
+from . import db
+from .activity import ActivityEvent
+from .models import ActivityLog
+
+# Console output for the audit trail (written from the audit writer thread)
+logger = logging.getLogger('neuronudge.audit')
+if not logger.hasHandlers():
+    handler = logging.StreamHandler()
+    formatter = logging.Formatter('%(asctime)s %(levelname)s: %(message)s')
+    handler.setFormatter(formatter)
+    logger.addHandler(handler)
+logger.setLevel(logging.INFO)
+
+# Queued by stop() so a writer waiting on an empty queue wakes up at once
+_WAKE = object()
+
+
+class AuditPipeline:
+    """
+    Buffered audit trail. Request threads only enqueue events; a background
+    thread writes them to ActivityLog in bulk every `batch_size` events or
+    `flush_interval` seconds, whichever comes first.
+    """
+
+    def __init__(self, app, batch_size=100, flush_interval=0.5, max_queue=10000):
+        self.app = app
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = None
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        # Request threads and the writer thread all update the counters
+        self._counts_lock = threading.Lock()
+        self.enqueued = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self._reported_dropped = 0
+
+    def record(self, user_id, action):
+        """Queue an audit event without blocking; counts it as dropped if the queue is full."""
+        self._ensure_started()
+        event = ActivityEvent(user_id, action[:255], datetime.utcnow())
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            with self._counts_lock:
+                self.dropped += 1
+        else:
+            with self._counts_lock:
+                self.enqueued += 1
+        return event
+
+    def stats(self):
+        with self._counts_lock:
+            return {
+                'enqueued': self.enqueued,
+                'written': self.written,
+                'dropped': self.dropped,
+                'failed': self.failed,
+                'pending': self._queue.qsize(),
+            }
+
+    def _ensure_started(self):
+        # Started lazily so CLI commands and migrations never spawn the thread,
+        # and so each forked gunicorn worker gets its own
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stopping.clear()
+                self._thread = threading.Thread(target=self._run, name='audit-writer', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while not (self._stopping.is_set() and self._queue.empty()):
+            try:
+                event = self._queue.get(timeout=max(deadline - time.monotonic(), 0.01))
+            except queue.Empty:
+                event = _WAKE
+            if event is not _WAKE:
+                batch.append(event)
+            if len(batch) >= self.batch_size or (batch and time.monotonic() >= deadline):
+                self._write(batch)
+                batch = []
+            if time.monotonic() >= deadline:
+                deadline = time.monotonic() + self.flush_interval
+        if batch:
+            self._write(batch)
+
+    def _write(self, batch):
+        try:
+            with self.app.app_context():
+                with db.engine.begin() as conn:
+                    conn.execute(ActivityLog.__table__.insert(), [event._asdict() for event in batch])
+            with self._counts_lock:
+                self.written += len(batch)
+        except Exception:
+            with self._counts_lock:
+                self.failed += len(batch)
+            logger.exception("Failed to write %d audit events", len(batch))
+        for event in batch:
+            logger.info('User %s performed action: %s', event.user_id, event.action)
+        if self.dropped > self._reported_dropped:
+            logger.warning("Audit queue full: %d events dropped so far", self.dropped)
+            self._reported_dropped = self.dropped
+
+    def stop(self, timeout=5):
+        """Flush everything still queued and stop the writer thread."""
+        thread = self._thread
+        if thread is None or not thread.is_alive():
+            return
+        self._stopping.set()
+        try:
+            self._queue.put_nowait(_WAKE)
+        except queue.Full:
+            pass  # the writer is busy draining and will see _stopping
+        thread.join(timeout)
+        logger.info("Audit pipeline stopped: %s", self.stats())
+
+
+def init_audit(app):
+    pipeline = AuditPipeline(
+        app,
+        batch_size=app.config.get('AUDIT_BATCH_SIZE', 100),
+        flush_interval=app.config.get('AUDIT_FLUSH_INTERVAL_MS', 500) / 1000,
+        max_queue=app.config.get('AUDIT_QUEUE_SIZE', 10000),
+    )
+    app.extensions['audit'] = pipeline
+    atexit.register(pipeline.stop)
+    return pipeline
+
+
+def log_action(user_id, action):
+    """Record an audit event: queued for ActivityLog and pushed onto the user's live feed."""
+    event = current_app.extensions['audit'].record(user_id, action)
+    feed = current_app.extensions.get('activity_feed')
+    if feed is not None:
+        feed.append(event)
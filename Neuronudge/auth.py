@@ -3,7 +3,8 @@ from flask import Blueprint, render_template, redirect, url_for, flash, request,
 from .forms import LoginForm, RegisterForm
 from .models import User
 from . import db
-from flask_login import login_user, logout_user, login_required
+from .audit import log_action
+from flask_login import login_user, logout_user, login_required, current_user
 from werkzeug.security import generate_password_hash
 
 auth = Blueprint('auth', __name__)
@@ -15,6 +16,7 @@ def login():
         user = User.query.filter_by(email=form.email.data).first()
         if user and user.check_password(form.password.data):
             login_user(user)
+            log_action(user.id, "Logged in")
             flash("Login successful!", category='success')
             return redirect(url_for('main.dashboard'))
         else:
@@ -55,11 +57,13 @@ def register():
                 feature_task_export=form.feature_task_export.data,
                 feature_progress_graphs=form.feature_progress_graphs.data
             )
+            new_user.refresh_feature_mask()
             db.session.add(new_user)
             db.session.commit()
 
             # Automatically log in the user
             login_user(new_user)
+            log_action(new_user.id, "Registered account")
             flash("Registration successful!", category='success')
 
             # Redirect to main dashboard (template chosen dynamically by profile)
@@ -77,6 +81,7 @@ def register():
 @auth.route('/logout')
 @login_required
 def logout():
+    log_action(current_user.id, "Logged out")
     logout_user()
     flash("You have been logged out.", category='info')
     return redirect(url_for('auth.login'))
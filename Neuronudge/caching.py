@@ -0,0 +1,115 @@
+# Neuronudge/caching.py
+from functools import wraps
+from threading import Lock
+import hashlib
+import os
+from flask import current_app, request
+from flask_login import current_user
+from sqlalchemy import func, select
+from werkzeug.security import safe_join
+from . import db
+from .assets import hashed_asset, is_hashed_asset
+from .models import Task
+from .timeutils import pacific_today
+
+# Query parameter carrying a static file's content hash
+STATIC_VERSION_ARG = 'v'
+
+STATIC_IMMUTABLE = 'public, max-age=31536000, immutable'
+STATIC_REVALIDATE = 'public, no-cache'
+PRIVATE_REVALIDATE = 'private, no-cache'
+
+_fingerprints = {}
+_fingerprints_lock = Lock()
+
+
+def static_fingerprint(filename):
+    """
+    Short content hash of a file under static/. Static files only change
+    with a deploy, so the hash is kept for the life of the process; in debug
+    mode it is recomputed whenever the file's mtime changes.
+    """
+    path = safe_join(current_app.static_folder, filename)
+    cached = _fingerprints.get(path)
+    if cached is not None and not current_app.debug:
+        return cached[1]
+    try:
+        mtime = os.stat(path).st_mtime
+    except (TypeError, OSError):
+        return None
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    with open(path, 'rb') as f:
+        digest = hashlib.md5(f.read()).hexdigest()[:12]
+    with _fingerprints_lock:
+        _fingerprints[path] = (mtime, digest)
+    return digest
+
+
+def task_version(user_id):
+    """(max updated_at, count) of a user's tasks; changes with every task write."""
+    return db.session.execute(
+        select(func.max(Task.updated_at), func.count(Task.id)).where(Task.user_id == user_id)
+    ).one()
+
+
+def task_etag(user_id):
+    """ETag for a per-user response that depends only on their tasks and the request."""
+    last_updated, count = task_version(user_id)
+    # The day is included because some responses default to date ranges relative to today
+    key = f"{user_id}:{last_updated}:{count}:{pacific_today()}:{request.full_path}"
+    return hashlib.md5(key.encode('utf-8')).hexdigest()
+
+
+def conditional_on_tasks(view):
+    """
+    Answer 304 when the client's If-None-Match matches the current user's
+    task_etag, without running the view; otherwise tag the view's response.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        etag = task_etag(current_user.id)
+        # Weak comparison: the compression middleware weakens the ETag of compressed responses
+        if request.if_none_match.contains_weak(etag):
+            response = current_app.response_class(status=304)
+        else:
+            response = current_app.make_response(view(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = PRIVATE_REVALIDATE
+        return response
+    return wrapper
+
+
+def init_caching(app):
+    @app.url_defaults
+    def fingerprint_static_urls(endpoint, values):
+        # url_for('static', filename=...) -> the built file from the asset manifest,
+        # or /static/...?v=<content hash> for files that are not built
+        if endpoint == 'static' and 'filename' in values and STATIC_VERSION_ARG not in values:
+            built = hashed_asset(values['filename'])
+            if built:
+                values['filename'] = built
+                return
+            fingerprint = static_fingerprint(values['filename'])
+            if fingerprint:
+                values[STATIC_VERSION_ARG] = fingerprint
+
+    @app.after_request
+    def apply_cache_policy(response):
+        if request.endpoint == 'static':
+            # A matching fingerprint means this URL's content can never change
+            version = request.args.get(STATIC_VERSION_ARG)
+            filename = request.view_args.get('filename') if request.view_args else None
+            # as does a content-hashed build name
+            if response.status_code == 200 and is_hashed_asset(filename):
+                response.headers['Cache-Control'] = STATIC_IMMUTABLE
+            elif version and response.status_code == 200 and version == static_fingerprint(filename):
+                response.headers['Cache-Control'] = STATIC_IMMUTABLE
+            else:
+                response.headers['Cache-Control'] = STATIC_REVALIDATE
+        elif 'Cache-Control' not in response.headers:
+            # Pages and JSON are per user: browsers may keep them, shared caches may not
+            response.headers['Cache-Control'] = PRIVATE_REVALIDATE
+        return response
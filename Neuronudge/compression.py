@@ -0,0 +1,235 @@
+# Neuronudge/compression.py
+from itertools import chain
+import logging
+import zlib
+from werkzeug.datastructures import Headers
+from werkzeug.http import parse_accept_header, parse_cache_control_header
+
+logger = logging.getLogger('neuronudge.compression')
+
+# Only these content types are compressed. text/event-stream is left out on
+# purpose: an SSE stream must reach the browser message by message.
+COMPRESSIBLE_TYPES = frozenset({
+    'text/html',
+    'text/plain',
+    'text/css',
+    'text/csv',
+    'text/javascript',
+    'application/javascript',
+    'application/json',
+    'application/x-ndjson',
+    'application/xml',
+    'image/svg+xml',
+})
+
+DEFAULT_LEVELS = {'gzip': 6, 'br': 4, 'zstd': 3}
+
+
+# --- Encoders: compress() / flush() (sync point) / finish() ---
+
+class GzipEncoder:
+    def __init__(self, level):
+        self._obj = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data):
+        return self._obj.compress(data)
+
+    def flush(self):
+        return self._obj.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._obj.flush()
+
+
+class BrotliEncoder:
+    def __init__(self, level):
+        import brotli
+        self._obj = brotli.Compressor(quality=level)
+
+    def compress(self, data):
+        return self._obj.process(data)
+
+    def flush(self):
+        return self._obj.flush()
+
+    def finish(self):
+        return self._obj.finish()
+
+
+class ZstdEncoder:
+    def __init__(self, level):
+        import zstandard
+        self._block = zstandard.COMPRESSOBJ_FLUSH_BLOCK
+        self._obj = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data):
+        return self._obj.compress(data)
+
+    def flush(self):
+        return self._obj.flush(self._block)
+
+    def finish(self):
+        return self._obj.flush()
+
+
+ENCODERS = {'gzip': GzipEncoder, 'br': BrotliEncoder, 'zstd': ZstdEncoder}
+
+# Python package each optional encoding needs
+_ENCODER_PACKAGES = {'br': 'brotli', 'zstd': 'zstandard'}
+
+
+def available_encodings(preferred):
+    """The encodings in `preferred` whose backend package is importable."""
+    encodings = []
+    for encoding in preferred:
+        if encoding not in ENCODERS:
+            raise ValueError(f"Unknown compression encoding: {encoding}")
+        package = _ENCODER_PACKAGES.get(encoding)
+        if package is not None:
+            try:
+                __import__(package)
+            except ImportError:
+                logger.info("'%s' compression disabled: the '%s' package is not installed", encoding, package)
+                continue
+        encodings.append(encoding)
+    return encodings
+
+
+class CompressionMiddleware:
+    """
+    WSGI middleware that compresses allowlisted response types for clients
+    that accept them.
+
+    A response is left alone when it is not a 200, already has a
+    Content-Encoding (precompressed assets, ?gzip=1 exports), says
+    no-transform, or is smaller than min_size. Streamed responses without a
+    Content-Length are read ahead only until min_size bytes have arrived.
+    After that each chunk is compressed as it comes, with a sync flush every
+    flush_size input bytes, so long exports reach the client progressively
+    instead of being buffered whole.
+    """
+
+    def __init__(self, app, encodings=('gzip',), levels=None, min_size=500, flush_size=16384):
+        self.app = app
+        self.encodings = list(encodings)
+        self.levels = {**DEFAULT_LEVELS, **(levels or {})}
+        self.min_size = min_size
+        self.flush_size = flush_size
+
+    def _choose_encoding(self, environ):
+        accepted = parse_accept_header(environ.get('HTTP_ACCEPT_ENCODING'))
+        for encoding in self.encodings:
+            if accepted[encoding]:
+                return encoding
+        return None
+
+    def __call__(self, environ, start_response):
+        if environ.get('REQUEST_METHOD') == 'HEAD' or not self.encodings:
+            return self.app(environ, start_response)
+        captured = []
+
+        def capture(status, headers, exc_info=None):
+            captured[:] = [status, headers, exc_info]
+            return self._write_unsupported
+
+        app_iter = self.app(environ, capture)
+        return self._respond(environ, start_response, captured, app_iter)
+
+    @staticmethod
+    def _write_unsupported(data):
+        raise RuntimeError("CompressionMiddleware does not support the WSGI write() callable")
+
+    def _compressible(self, status, headers):
+        if not status.startswith('200'):
+            return False
+        if 'Content-Encoding' in headers:
+            return False
+        mimetype = headers.get('Content-Type', '').split(';')[0].strip().lower()
+        if mimetype not in COMPRESSIBLE_TYPES:
+            return False
+        if 'no-transform' in parse_cache_control_header(headers.get('Cache-Control')):
+            return False
+        length = headers.get('Content-Length', type=int)
+        return length is None or length >= self.min_size
+
+    def _respond(self, environ, start_response, captured, app_iter):
+        chunks = iter(app_iter)
+        try:
+            pending = []
+            if not captured:
+                # start_response may be deferred until the first chunk
+                pending.append(next(chunks, b''))
+            status, header_list, exc_info = captured
+            headers = Headers(header_list)
+
+            if not self._compressible(status, headers):
+                start_response(status, header_list, exc_info)
+                yield from pending
+                yield from chunks
+                return
+
+            # The representation depends on Accept-Encoding from here on
+            headers['Vary'] = _add_vary(headers.get('Vary', ''), 'Accept-Encoding')
+            encoding = self._choose_encoding(environ)
+
+            # Read ahead until the body is known to reach min_size
+            size = sum(len(c) for c in pending)
+            if encoding is not None and 'Content-Length' not in headers:
+                for chunk in chunks:
+                    pending.append(chunk)
+                    size += len(chunk)
+                    if size >= self.min_size:
+                        break
+                else:
+                    encoding = None
+                    headers['Content-Length'] = str(size)
+
+            if encoding is None:
+                start_response(status, headers.to_wsgi_list(), exc_info)
+                yield from pending
+                yield from chunks
+                return
+
+            headers['Content-Encoding'] = encoding
+            headers.remove('Content-Length')
+            headers.remove('Accept-Ranges')
+            # Byte-for-byte different from the uncompressed body, so no longer a strong match
+            etag = headers.get('ETag')
+            if etag and not etag.startswith('W/'):
+                headers['ETag'] = 'W/' + etag
+            start_response(status, headers.to_wsgi_list(), exc_info)
+
+            encoder = ENCODERS[encoding](self.levels[encoding])
+            unflushed = 0
+            for chunk in chain(pending, chunks):
+                data = encoder.compress(chunk)
+                unflushed += len(chunk)
+                if unflushed >= self.flush_size:
+                    data += encoder.flush()
+                    unflushed = 0
+                if data:
+                    yield data
+            yield encoder.finish()
+        finally:
+            if hasattr(app_iter, 'close'):
+                app_iter.close()
+
+
+def _add_vary(vary, field):
+    values = [v.strip() for v in vary.split(',') if v.strip()]
+    if field.lower() not in (v.lower() for v in values) and '*' not in values:
+        values.append(field)
+    return ', '.join(values)
+
+
+def init_compression(app):
+    """Wrap app.wsgi_app in CompressionMiddleware unless COMPRESSION_ENABLED is off."""
+    if not app.config.get('COMPRESSION_ENABLED', True):
+        return
+    app.wsgi_app = CompressionMiddleware(
+        app.wsgi_app,
+        encodings=available_encodings(app.config.get('COMPRESSION_ENCODINGS', ['gzip'])),
+        levels=app.config.get('COMPRESSION_LEVELS'),
+        min_size=app.config.get('COMPRESSION_MIN_SIZE', 500),
+        flush_size=app.config.get('COMPRESSION_FLUSH_SIZE', 16384)
+    )
@@ -0,0 +1,103 @@
+# Neuronudge/features.py
+from functools import lru_cache
+import json
+
+# Canonical dashboard feature keys (the names templates and JS check).
+# The position of each key is its bit in User.feature_mask, so only ever
+# append to this list; never reorder or remove entries.
+FEATURES = [
+    'task_timer',
+    'focus_mode',
+    'scroll_autostart',
+    'task_stats',
+    'deadline_tracker',
+    'custom_colors',
+    'reminders',
+    'priority_sort',
+    'task_export',
+    'graphs',
+    'gamification',
+    'tips',
+]
+
+FEATURE_BITS = {name: 1 << i for i, name in enumerate(FEATURES)}
+
+# Other spellings found in dashboard_features / older forms -> canonical key
+FEATURE_ALIASES = {
+    'timer': 'task_timer',
+    'auto_reminders': 'reminders',
+    'auto-reminders': 'reminders',
+    'auto reminders': 'reminders',
+    'auto_reminder': 'reminders',
+    'progress_graphs': 'graphs',
+    'progress-graphs': 'graphs',
+    'graph': 'graphs',
+    'stats': 'task_stats',
+    'focusmode': 'focus_mode',
+    'focus': 'focus_mode',
+    'scrollautostart': 'scroll_autostart',
+    'autoscroll': 'scroll_autostart',
+    'colors': 'custom_colors',
+    'export': 'task_export',
+    'game': 'gamification',
+    'daily_tips': 'tips',
+}
+
+# User feature_* flags -> canonical key
+FEATURE_FLAGS = {
+    'feature_timer': 'task_timer',
+    'feature_task_timer': 'task_timer',
+    'feature_focus_mode': 'focus_mode',
+    'feature_scroll_autostart': 'scroll_autostart',
+    'feature_task_stats': 'task_stats',
+    'feature_deadline_tracker': 'deadline_tracker',
+    'feature_custom_colors': 'custom_colors',
+    'feature_auto_reminders': 'reminders',
+    'feature_priority_sort': 'priority_sort',
+    'feature_task_export': 'task_export',
+    'feature_progress_graphs': 'graphs',
+}
+
+
+def canonical_feature(name):
+    """Map any stored spelling of a feature to its canonical key (or None)."""
+    if not isinstance(name, str):
+        return None
+    key = name.strip().lower()
+    key = FEATURE_ALIASES.get(key, key)
+    return key if key in FEATURE_BITS else None
+
+
+def compute_feature_mask(user):
+    """
+    Fold a user's feature_* flags and dashboard_features list into one
+    bitmask. Works on User instances and on plain result rows.
+    """
+    mask = 0
+    for flag, name in FEATURE_FLAGS.items():
+        if getattr(user, flag, False):
+            mask |= FEATURE_BITS[name]
+
+    stored = getattr(user, 'dashboard_features', None)
+    if isinstance(stored, str):
+        try:
+            stored = json.loads(stored)
+        except ValueError:
+            stored = None
+    if isinstance(stored, (list, tuple, set)):
+        for raw in stored:
+            name = canonical_feature(raw)
+            if name:
+                mask |= FEATURE_BITS[name]
+    return mask
+
+
+@lru_cache(maxsize=256)
+def features_from_mask(mask):
+    """Sorted canonical feature keys enabled in a mask."""
+    return tuple(sorted(name for name, bit in FEATURE_BITS.items() if mask & bit))
+
+
+def mask_has_feature(mask, name):
+    bit = FEATURE_BITS.get(canonical_feature(name))
+    return bool(bit and (mask or 0) & bit)
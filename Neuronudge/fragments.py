@@ -0,0 +1,185 @@
+# Neuronudge/fragments.py
+from collections import OrderedDict
+from threading import Lock
+import atexit
+import logging
+import time
+from flask import current_app, g, request
+from flask_login import current_user
+from jinja2 import nodes
+from jinja2.ext import Extension
+from markupsafe import Markup
+
+logger = logging.getLogger('neuronudge.fragments')
+
+
+class FragmentCache:
+    """In-process LRU of rendered template fragments with a per-entry TTL (one per worker)."""
+
+    def __init__(self, maxsize=2048, ttl=60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, html):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, html)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else None,
+            'evictions': self.evictions,
+            'size': len(self._data),
+        }
+
+
+# --- Per-user data versions ---
+
+class MemoryVersionStore:
+    """
+    Version counters for this worker only. Other workers keep serving their
+    fragments until the TTL runs out; use the redis store to share bumps.
+    One int per user that has changed data, so it is not bounded.
+    """
+
+    def __init__(self):
+        self._versions = {}
+        self._lock = Lock()
+
+    def get(self, user_id):
+        return self._versions.get(user_id, 0)
+
+    def bump(self, user_id):
+        with self._lock:
+            self._versions[user_id] = self._versions.get(user_id, 0) + 1
+
+
+class RedisVersionStore:
+    """Version counters shared by every worker through Redis INCR."""
+
+    def __init__(self, url, prefix='neuronudge:fragment_version:'):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("FRAGMENT_VERSION_BACKEND='redis' requires the 'redis' package")
+        self._client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def get(self, user_id):
+        return int(self._client.get(f"{self.prefix}{user_id}") or 0)
+
+    def bump(self, user_id):
+        self._client.incr(f"{self.prefix}{user_id}")
+
+
+class DeferredList:
+    """
+    A list computed on first use. Views pass widget data this way so a
+    cached fragment does not run the query behind it.
+    """
+
+    def __init__(self, load):
+        self._load = load
+        self._items = None
+
+    @property
+    def items(self):
+        if self._items is None:
+            self._items = list(self._load())
+        return self._items
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+    def __getitem__(self, index):
+        return self.items[index]
+
+
+class FragmentCacheExtension(Extension):
+    """
+    {% cache 'name' [, vary...] %}...{% endcache %}
+
+    Caches the rendered block per template, endpoint, current user and the
+    user's data version, plus any extra `vary` values (e.g. a query arg the
+    block reads). Anonymous requests render the block every time.
+    """
+
+    tags = {'cache'}
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        args = [nodes.Const(parser.name), parser.parse_expression()]
+        while parser.stream.skip_if('comma'):
+            args.append(parser.parse_expression())
+        body = parser.parse_statements(('name:endcache',), drop_needle=True)
+        return nodes.CallBlock(self.call_method('_cache_support', args), [], [], body).set_lineno(lineno)
+
+    def _cache_support(self, template_name, name, *vary, caller):
+        cache = current_app.extensions.get('fragment_cache')
+        if cache is None or not current_user.is_authenticated:
+            return caller()
+        key = (template_name, name, request.endpoint, current_user.id, _user_version(current_user.id), *vary)
+        html = cache.get(key)
+        if html is None:
+            html = Markup(caller())
+            cache.set(key, html)
+        return html
+
+
+def _user_version(user_id):
+    # Read the version once per request, however many fragments the page has
+    if 'fragment_version' not in g:
+        g.fragment_version = current_app.extensions['fragment_versions'].get(user_id)
+    return g.fragment_version
+
+
+def bump_fragment_version(user_id):
+    """Invalidate every cached fragment of a user. Call after any commit that changes their tasks."""
+    versions = current_app.extensions.get('fragment_versions')
+    if versions is not None:
+        versions.bump(user_id)
+
+
+def init_fragments(app):
+    """Register the {% cache %} tag and create the fragment cache configured for this app."""
+    backend = app.config.get('FRAGMENT_VERSION_BACKEND', 'memory')
+    if backend == 'redis':
+        versions = RedisVersionStore(app.config['FRAGMENT_VERSION_URL'])
+    elif backend == 'memory':
+        versions = MemoryVersionStore()
+    else:
+        raise ValueError(f"Unknown FRAGMENT_VERSION_BACKEND: {backend}")
+    cache = FragmentCache(
+        maxsize=app.config.get('FRAGMENT_CACHE_SIZE', 2048),
+        ttl=app.config.get('FRAGMENT_CACHE_TTL', 60)
+    )
+    app.jinja_env.add_extension(FragmentCacheExtension)
+    if app.config.get('FRAGMENT_CACHE_ENABLED', True):
+        app.extensions['fragment_cache'] = cache
+        app.extensions['fragment_versions'] = versions
+        atexit.register(lambda: logger.info("Fragment cache: %s", cache.stats()))
+    return cache
@@ -0,0 +1,40 @@
+# Neuronudge/history.py
+from datetime import datetime
+from sqlalchemy import case, insert, literal, select
+from . import db
+from .models import Task, TaskTransition
+
+
+def record_transition(task, from_status, now=None):
+    """Add a TaskTransition for `task` if its workflow status changed from `from_status`."""
+    to_status = task.workflow_status
+    if to_status == from_status:
+        return
+    db.session.add(TaskTransition(
+        task_id=task.id,
+        user_id=task.user_id,
+        from_status=from_status,
+        to_status=to_status,
+        changed_at=now or datetime.utcnow()
+    ))
+
+
+def record_bulk_completion(user_id, task_ids, now):
+    """
+    INSERT ... SELECT a '-> completed' transition for each of the user's
+    open tasks in task_ids. Run it before the UPDATE that completes them.
+    """
+    # Same mapping as Task.workflow_status for open tasks
+    from_status = case((Task.status == 'in progress', Task.status), else_=literal('not started'))
+    pending = select(
+        Task.id, Task.user_id, from_status, literal('completed'), literal(now, TaskTransition.changed_at.type)
+    ).where(
+        Task.id.in_(task_ids),
+        Task.user_id == user_id,
+        Task.completed == False
+    )
+    db.session.execute(
+        insert(TaskTransition).from_select(
+            ['task_id', 'user_id', 'from_status', 'to_status', 'changed_at'], pending
+        )
+    )
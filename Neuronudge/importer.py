@@ -0,0 +1,215 @@
+# Neuronudge/importer.py
+import csv
+import io
+import json
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+import click
+from . import db
+from .forms import TaskForm
+from .fragments import bump_fragment_version
+from .models import User
+from .progress import record_progress
+from .reminders import reminder_time
+from .search import fts_bulk_insert
+from .stats import invalidate_task_counts
+from .timeutils import pacific_due_to_utc
+
+IMPORT_FORMATS = ('csv', 'ndjson')
+
+# Rows per executemany INSERT / transaction
+IMPORT_BATCH_SIZE = 5000
+
+# Stop collecting row errors after this many (the count keeps going)
+MAX_REPORTED_ERRORS = 1000
+
+# Column order of the tuples handed to executemany
+_INSERT_COLUMNS = ('title', 'description', 'completed', 'completed_at', 'due_date', 'priority',
+                   'reminder_set', 'remind_at', 'status', 'created_at', 'updated_at', 'user_id')
+
+# Same choices TaskForm offers, so imports accept exactly what the form does
+PRIORITY_CHOICES = {value for value, _ in TaskForm.priority.kwargs['choices']}
+STATUS_CHOICES = {value for value, _ in TaskForm.status.kwargs['choices']}
+
+# TaskForm status value -> Task.status as the status endpoint stores it
+TASK_STATUSES = {'not_started': 'not started', 'in_progress': 'in progress', 'completed': 'completed'}
+
+_TRUE_VALUES = {'1', 'true', 'yes', 'y', 'on'}
+
+# Imports repeat the same handful of due dates; skip re-localizing each one
+_due_to_utc = lru_cache(maxsize=4096)(pacific_due_to_utc)
+
+
+def _as_bool(value):
+    if isinstance(value, bool):
+        return value
+    return str(value or '').strip().lower() in _TRUE_VALUES
+
+
+def _as_text(value):
+    return '' if value is None else str(value).strip()
+
+
+def validate_row(row):
+    """
+    Check one imported row against TaskForm's rules and return
+    (values, errors). values is None when the row is rejected.
+    """
+    errors = []
+
+    title = _as_text(row.get('title'))
+    if not title:
+        errors.append("title: This field is required.")
+
+    due_raw = _as_text(row.get('due_date'))
+    due_date = None
+    if not due_raw:
+        errors.append("due_date: This field is required.")
+    else:
+        try:
+            due_date = date.fromisoformat(due_raw[:10])
+        except ValueError:
+            errors.append("due_date: Not a valid date value.")
+
+    due_time = _as_text(row.get('due_time'))
+    if due_time:
+        try:
+            datetime.strptime(due_time, '%H:%M')
+        except ValueError:
+            errors.append("due_time: Not a valid time value.")
+
+    priority = _as_text(row.get('priority')) or '2'
+    if priority not in PRIORITY_CHOICES:
+        errors.append("priority: Not a valid choice.")
+
+    status = _as_text(row.get('status')) or 'not_started'
+    if status not in STATUS_CHOICES:
+        errors.append("status: Not a valid choice.")
+
+    if errors:
+        return None, errors
+
+    # TaskForm.validate moves date-only entries to the day before
+    if not due_time:
+        due_date = due_date - timedelta(days=1)
+
+    return {
+        'title': title,
+        'description': _as_text(row.get('description')),
+        'completed': status == 'completed',
+        'status': TASK_STATUSES[status],
+        'due_date': _due_to_utc(due_date),
+        'priority': int(priority),
+        'reminder_set': _as_bool(row.get('reminder_set')),
+    }, []
+
+
+def _insert_batch(rows):
+    """
+    Insert a batch of already-validated row tuples with a single DBAPI
+    executemany and commit it as one transaction.
+    """
+    conn = db.session.connection()
+    placeholder = '?' if conn.dialect.paramstyle == 'qmark' else '%s'
+    sql = 'INSERT INTO task ({}) VALUES ({})'.format(
+        ', '.join(_INSERT_COLUMNS), ', '.join([placeholder] * len(_INSERT_COLUMNS))
+    )
+    with fts_bulk_insert(conn):
+        conn.exec_driver_sql(sql, rows)
+    db.session.commit()
+
+
+def iter_rows(stream, fmt):
+    """Lazily parse a text stream of CSV or NDJSON into dicts."""
+    if fmt == 'csv':
+        yield from csv.DictReader(stream)
+        return
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        # A non-object line is reported as an invalid row rather than aborting the import
+        yield row if isinstance(row, dict) else {}
+
+
+def import_tasks(user_id, stream, fmt):
+    """
+    Validate and insert tasks for one user from a text stream.
+
+    Valid rows are inserted with one executemany INSERT per
+    IMPORT_BATCH_SIZE rows; invalid rows are skipped and reported.
+    Returns {"imported": n, "failed": n, "errors": [{"row": i, "errors": [...]}]}.
+    """
+    report = {'imported': 0, 'failed': 0, 'errors': []}
+    batch = []
+    completed = late = 0
+    utc_now = now = datetime.utcnow()
+    if db.engine.dialect.name == 'sqlite':
+        # Match the text format SQLAlchemy stores DateTime columns in on SQLite
+        as_db_datetime = lru_cache(maxsize=4096)(lambda value: value.strftime('%Y-%m-%d %H:%M:%S.%f'))
+    else:
+        as_db_datetime = lambda value: value
+    now = as_db_datetime(now)
+
+    def flush():
+        if batch:
+            _insert_batch(batch)
+            report['imported'] += len(batch)
+            batch.clear()
+
+    for line_no, row in enumerate(iter_rows(stream, fmt), start=1):
+        values, errors = validate_row(row)
+        if errors:
+            report['failed'] += 1
+            if len(report['errors']) < MAX_REPORTED_ERRORS:
+                report['errors'].append({'row': line_no, 'errors': errors})
+            continue
+        remind_at = reminder_time(values['due_date'], values['reminder_set'], values['completed'])
+        if values['completed']:
+            completed += 1
+            late += values['due_date'] < utc_now
+        batch.append((
+            values['title'], values['description'], values['completed'], now if values['completed'] else None,
+            as_db_datetime(values['due_date']), values['priority'], values['reminder_set'],
+            remind_at and as_db_datetime(remind_at), values['status'], now, now, user_id
+        ))
+        if len(batch) >= IMPORT_BATCH_SIZE:
+            flush()
+    flush()
+    if report['imported']:
+        record_progress(user_id, created=report['imported'], completed=completed, late=late)
+        db.session.commit()
+    invalidate_task_counts(user_id)
+    bump_fragment_version(user_id)
+    return report
+
+
+def guess_format(filename, default='csv'):
+    if filename and filename.lower().endswith(('.ndjson', '.jsonl')):
+        return 'ndjson'
+    if filename and filename.lower().endswith('.csv'):
+        return 'csv'
+    return default
+
+
+def init_importer(app):
+    @app.cli.command('import-tasks')
+    @click.argument('path', type=click.Path(exists=True, dir_okay=False))
+    @click.option('--email', required=True, help="Email of the user who will own the tasks.")
+    @click.option('--format', 'fmt', type=click.Choice(IMPORT_FORMATS), default=None,
+                  help="Input format (guessed from the file extension by default).")
+    def import_tasks_command(path, email, fmt):
+        """Bulk import tasks from a CSV or NDJSON file."""
+        user = User.query.filter_by(email=email).first()
+        if user is None:
+            raise click.ClickException(f"No user with email {email}")
+        fmt = fmt or guess_format(path)
+        with io.open(path, encoding='utf-8', newline='') as stream:
+            report = import_tasks(user.id, stream, fmt)
+        print(f"Imported {report['imported']} tasks, {report['failed']} rows rejected.")
+        for entry in report['errors']:
+            print(f"  row {entry['row']}: {'; '.join(entry['errors'])}")
@@ -0,0 +1,153 @@
+# Neuronudge/live.py
+from collections import defaultdict
+from datetime import datetime
+from threading import Lock, Thread
+import json
+import logging
+import queue
+import time
+from flask import current_app
+from .stats import get_task_counts
+
+logger = logging.getLogger('neuronudge.live')
+
+# Events buffered per stream before further ones are dropped for it
+SUBSCRIBER_QUEUE_SIZE = 100
+
+
+def format_sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+class LiveHub:
+    """In-process pub/sub: user id -> the queues of that user's open streams."""
+
+    def __init__(self):
+        self._subscribers = defaultdict(set)
+        self._lock = Lock()
+        self.broker = None
+
+    def subscribe(self, user_id):
+        q = queue.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        with self._lock:
+            self._subscribers[user_id].add(q)
+        if self.broker is not None:
+            self.broker.start()
+        return q
+
+    def unsubscribe(self, user_id, q):
+        with self._lock:
+            subscribers = self._subscribers.get(user_id)
+            if subscribers is not None:
+                subscribers.discard(q)
+                if not subscribers:
+                    del self._subscribers[user_id]
+
+    def has_listeners(self, user_id):
+        # With a broker, streams may be open on another worker
+        return self.broker is not None or user_id in self._subscribers
+
+    def publish(self, user_id, event, data):
+        if self.broker is not None:
+            self.broker.publish(user_id, event, data)
+        else:
+            self.dispatch(user_id, format_sse(event, data))
+
+    def dispatch(self, user_id, message):
+        with self._lock:
+            subscribers = list(self._subscribers.get(user_id, ()))
+        for q in subscribers:
+            try:
+                q.put_nowait(message)
+            except queue.Full:
+                pass  # a stalled client misses updates rather than blocking the writer
+
+
+class RedisBroker:
+    """Fans events out to every worker through one Redis pub/sub channel."""
+
+    def __init__(self, hub, url, channel='neuronudge:live'):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("LIVE_BROKER='redis' requires the 'redis' package")
+        self._client = redis.Redis.from_url(url)
+        self.hub = hub
+        self.channel = channel
+        self._thread = None
+        self._lock = Lock()
+
+    def publish(self, user_id, event, data):
+        self._client.publish(self.channel, json.dumps({'user_id': user_id, 'event': event, 'data': data}))
+
+    def start(self):
+        # One listener per worker, started with its first stream
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = Thread(target=self._listen, name='live-broker', daemon=True)
+                self._thread.start()
+
+    def _listen(self):
+        while True:
+            try:
+                pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                for message in pubsub.listen():
+                    payload = json.loads(message['data'])
+                    self.hub.dispatch(payload['user_id'], format_sse(payload['event'], payload['data']))
+            except Exception:
+                logger.exception("Live broker connection lost, reconnecting")
+                time.sleep(1)
+
+
+def event_stream(hub, user_id, heartbeat=15, max_age=300):
+    """
+    Yield SSE messages for one user. Comments keep idle proxies from closing
+    the connection; after max_age seconds the stream ends and the browser's
+    EventSource reconnects, so abandoned streams never pile up.
+
+    Every open stream occupies a worker thread under a threaded server. On
+    PostgreSQL, production runs gunicorn's gevent worker with psycopg2
+    patched to yield (see gunicorn.conf.py), where an idle stream costs one
+    greenlet. SQLite is not supported under gevent: its calls, busy_timeout
+    waits included, block the whole worker.
+    """
+    q = hub.subscribe(user_id)
+    deadline = time.monotonic() + max_age
+    try:
+        yield "retry: 3000\n\n"
+        while time.monotonic() < deadline:
+            try:
+                yield q.get(timeout=heartbeat)
+            except queue.Empty:
+                yield ": keepalive\n\n"
+    finally:
+        hub.unsubscribe(user_id, q)
+
+
+def _hub():
+    return current_app.extensions.get('live_hub')
+
+
+def publish_task_change(user_id, op, task=None, task_ids=None):
+    """
+    Push a task delta ({op, ids, completed, overdue, status, title}) and fresh counts
+    to the user's open dashboards. Call after the change is committed.
+    """
+    hub = _hub()
+    if hub is None or not hub.has_listeners(user_id):
+        return
+    delta = {'op': op, 'ids': list(task_ids) if task_ids is not None else [task.id]}
+    if task is not None:
+        overdue = not task.completed and task.due_date is not None and task.due_date < datetime.utcnow()
+        delta.update(completed=task.completed, overdue=overdue, status=task.workflow_status, title=task.title)
+    hub.publish(user_id, 'task', delta)
+    hub.publish(user_id, 'counts', get_task_counts(user_id).as_dict())
+
+
+def init_live(app):
+    hub = LiveHub()
+    if app.config.get('LIVE_BROKER') == 'redis':
+        hub.broker = RedisBroker(hub, app.config['LIVE_BROKER_URL'])
+    app.extensions['live_hub'] = hub
+    return hub
@@ -7,6 +7,8 @@ from wtforms import SelectField
 from wtforms.validators import DataRequired
 from flask import url_for
 from sqlalchemy import JSON
+from sqlalchemy.dialects.postgresql import JSONB
+from .features import compute_feature_mask, features_from_mask, mask_has_feature
 
 class User(UserMixin, db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -22,7 +24,7 @@ class User(UserMixin, db.Model):
     preferences = db.relationship('OnboardingPreferences', back_populates='user', uselist=False)
     avatar_url = db.Column(db.String(300), default=None)
     registered_on = db.Column(db.DateTime, default=datetime.utcnow)
-    dashboard_features = db.Column(JSON, nullable=False, default=[])
+    dashboard_features = db.Column(JSON().with_variant(JSONB(), 'postgresql'), nullable=False, default=[])
 
     feature_task_timer = db.Column(db.Boolean, default=False)
     feature_task_stats = db.Column(db.Boolean, default=True)
@@ -31,6 +33,21 @@ class User(UserMixin, db.Model):
     feature_priority_sort = db.Column(db.Boolean, default=False)
     feature_task_export = db.Column(db.Boolean, default=False)
     feature_progress_graphs = db.Column(db.Boolean, default=False)
+
+    # Normalized feature set (bits per features.FEATURES), derived from the
+    # flags above and dashboard_features whenever they are saved
+    feature_mask = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+
+    def refresh_feature_mask(self):
+        self.feature_mask = compute_feature_mask(self)
+
+    def has_feature(self, name):
+        return mask_has_feature(self.feature_mask, name)
+
+    @property
+    def features(self):
+        return features_from_mask(self.feature_mask or 0)
+
     def set_password(self, password):
         self.password_hash = generate_password_hash(password)
 
@@ -49,15 +66,48 @@ class Task(db.Model):
     description = db.Column(db.Text, nullable=False)
     due_date = db.Column(db.DateTime)
     completed = db.Column(db.Boolean, default=False)
+    completed_at = db.Column(db.DateTime)               # set/cleared by set_completed
     priority = db.Column(db.Integer, default=2)         # 1 = high, 2 = med, 3 = low
     status = db.Column(db.String(20), default='not started')
     reminder_set = db.Column(db.Boolean, default=False)
+    remind_at = db.Column(db.DateTime, index=True)      # next reminder, maintained in reminders.py
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
 
+    # NULL-free copies of the task list sort key (priority, due date nulls last),
+    # so ix_task_user_priority_due returns rows already in list order
+    sort_priority = db.Column(db.Integer, db.Computed('coalesce(priority, 99)', persisted=True))
+    sort_due_date = db.Column(db.DateTime, db.Computed("coalesce(due_date, '9999-12-31 23:59:59.999999')", persisted=True))
+
+    # Every dashboard query filters on user_id, then sorts/filters by one of these
+    __table_args__ = (
+        db.Index('ix_task_user_completed_due', 'user_id', 'completed', 'due_date'),
+        db.Index('ix_task_user_priority_due', 'user_id', 'sort_priority', 'sort_due_date', 'id'),
+        db.Index('ix_task_user_updated', 'user_id', 'updated_at'),
+        db.Index('ix_task_user_completed_at', 'user_id', 'completed_at'),
+    )
+
+    # Badge label the list views compute per request; not a column, so setting it writes nothing
+    display_status = None
+
     def __repr__(self):
         return f"<Task {self.title}>"
+
+    @property
+    def workflow_status(self):
+        """'not started', 'in progress' or 'completed', as recorded in TaskTransition."""
+        if self.completed:
+            return 'completed'
+        return 'in progress' if self.status == 'in progress' else 'not started'
+
+    def set_completed(self, completed, now=None):
+        """Set completed and keep completed_at in step with it."""
+        if completed and not self.completed:
+            self.completed_at = now or datetime.utcnow()
+        elif not completed:
+            self.completed_at = None
+        self.completed = completed
     def full_due_datetime(self):
         """Return combined due date + time as datetime object."""
         from datetime import datetime
@@ -66,7 +116,35 @@ class Task(db.Model):
         else:
             return datetime.combine(self.due_date, time(11, 59))
 
+class TaskTransition(db.Model):
+    """
+    One workflow status change of a task. task_id is deliberately not a
+    foreign key so history survives task deletion.
+    """
+    __tablename__ = 'task_transition'
+    __table_args__ = (
+        db.Index('ix_task_transition_user_changed', 'user_id', 'changed_at'),
+        db.Index('ix_task_transition_task_changed', 'task_id', 'changed_at'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    task_id = db.Column(db.Integer, nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    from_status = db.Column(db.String(20), nullable=False)
+    to_status = db.Column(db.String(20), nullable=False)
+    changed_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<TaskTransition Task {self.task_id}: {self.from_status} -> {self.to_status}>"
+
 class ActivityLog(db.Model):
+    # Raw rows are kept for ACTIVITY_RETENTION_DAYS, then rolled up into ActivityDaily
+    __table_args__ = (
+        db.Index('ix_activity_log_user_timestamp', 'user_id', 'timestamp'),
+        db.Index('ix_activity_log_timestamp', 'timestamp'),
+        db.Index('ix_activity_log_user_id', 'user_id', 'id'),  # /activity?since= polls
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     action = db.Column(db.String(255), nullable=False)
     timestamp = db.Column(db.DateTime, default=datetime.utcnow)
@@ -75,6 +153,35 @@ class ActivityLog(db.Model):
     def __repr__(self):
         return f"<ActivityLog {self.action} at {self.timestamp}>"
 
+class ActivityDaily(db.Model):
+    """Number of audit events per user per day, for days past the raw-log retention window."""
+    __tablename__ = 'activity_daily'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<ActivityDaily User {self.user_id} {self.day}: {self.count}>"
+
+class TaskProgressDaily(db.Model):
+    """
+    Per-user, per-day (Pacific) task progress, updated alongside every task
+    mutation. open_tasks is the backlog size at the last change that day.
+    """
+    __tablename__ = 'task_progress_daily'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    created = db.Column(db.Integer, nullable=False, default=0)
+    completed = db.Column(db.Integer, nullable=False, default=0)
+    completed_on_time = db.Column(db.Integer, nullable=False, default=0)
+    completed_late = db.Column(db.Integer, nullable=False, default=0)
+    open_tasks = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<TaskProgressDaily User {self.user_id} {self.day}: {self.completed} completed, {self.open_tasks} open>"
+
 class OnboardingPreferences(db.Model):
     __tablename__ = 'onboarding_preferences'
 
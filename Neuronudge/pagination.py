@@ -0,0 +1,75 @@
+# Neuronudge/pagination.py
+import base64
+import json
+from datetime import datetime
+from sqlalchemy import tuple_
+from .models import Task
+
+# Task list order: priority, then due date with undated tasks last, then id.
+# The sort_* columns are NULL-free copies, so ix_task_user_priority_due
+# (user_id, sort_priority, sort_due_date, id) returns rows in this order.
+TASK_LIST_ORDER = (Task.sort_priority.asc(), Task.sort_due_date.asc(), Task.id.asc())
+
+
+class KeysetPage:
+    """
+    Cursor-based page of tasks in TASK_LIST_ORDER.
+
+    Exposes the same `items` / `has_next` / `per_page` attributes templates
+    read from Flask-SQLAlchemy's Pagination, but never issues a COUNT query.
+    """
+
+    def __init__(self, items, per_page, cursor=None, next_cursor=None):
+        self.items = items
+        self.per_page = per_page
+        self.cursor = cursor
+        self.next_cursor = next_cursor
+        self.has_next = next_cursor is not None
+        # Going backwards needs a reverse seek; callers restart from the top instead
+        self.has_prev = cursor is not None
+        self.is_keyset = True
+
+    def __iter__(self):
+        return iter(self.items)
+
+
+def wants_keyset(args):
+    """Cursor paging is opt-in: ?paging=cursor or an explicit ?cursor=..."""
+    return args.get('paging') == 'cursor' or bool(args.get('cursor'))
+
+
+def encode_cursor(task):
+    raw = json.dumps([task.sort_priority, task.sort_due_date.isoformat(), task.id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Return (sort_priority, sort_due_date, id) or None if the cursor is malformed."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        priority, due, task_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return int(priority), datetime.fromisoformat(due), int(task_id)
+    except (ValueError, TypeError):
+        return None
+
+
+def _after(priority, due_date, task_id):
+    """WHERE clause selecting rows strictly after the cursor position."""
+    # A row-value comparison is a single range seek on ix_task_user_priority_due
+    return tuple_(Task.sort_priority, Task.sort_due_date, Task.id) > (priority, due_date, task_id)
+
+
+def keyset_paginate(query, cursor=None, per_page=10):
+    """
+    Seek-paginate a filtered Task query. Each page costs one indexed range
+    read of per_page + 1 rows regardless of how deep the user has paged.
+    """
+    position = decode_cursor(cursor) if cursor else None
+    if position is not None:
+        query = query.filter(_after(*position))
+
+    rows = query.order_by(*TASK_LIST_ORDER).limit(per_page + 1).all()
+
+    items = rows[:per_page]
+    next_cursor = encode_cursor(items[-1]) if len(rows) > per_page else None
+    return KeysetPage(items, per_page, cursor=cursor if position else None, next_cursor=next_cursor)
@@ -0,0 +1,192 @@
+# Neuronudge/progress.py
+from collections import defaultdict
+from datetime import datetime, timedelta
+import click
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from . import db
+from .models import Task, TaskProgressDaily, User
+from .timeutils import pacific_today, utc_to_pacific_date
+
+PROGRESS_BUCKETS = ('day', 'week')
+
+# Longest range the series endpoint will return, in days
+MAX_SERIES_DAYS = 3660
+
+_COUNTERS = ('created', 'completed', 'completed_on_time', 'completed_late')
+
+
+def _open_task_count(user_id):
+    return db.session.execute(
+        select(func.count(Task.id)).where(Task.user_id == user_id, Task.completed == False)
+    ).scalar()
+
+
+def record_progress(user_id, created=0, completed=0, late=0):
+    """
+    Add to today's progress row for a user and snapshot their backlog.
+    Call after the task change has been made on db.session but before the
+    commit, so the rollup is written in the same transaction.
+    """
+    table = TaskProgressDaily.__table__
+    values = {
+        'user_id': user_id,
+        'day': pacific_today(),
+        'created': created,
+        'completed': completed,
+        'completed_on_time': completed - late,
+        'completed_late': late,
+        'open_tasks': _open_task_count(user_id),
+    }
+    insert = pg_insert if db.engine.dialect.name == 'postgresql' else sqlite_insert
+    stmt = insert(table).values(**values)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['user_id', 'day'],
+        set_={
+            **{name: table.c[name] + stmt.excluded[name] for name in _COUNTERS},
+            'open_tasks': stmt.excluded.open_tasks,
+        },
+    )
+    db.session.execute(stmt)
+
+
+def record_completion(user_id, task, now=None):
+    """record_progress for a single task that was just marked completed."""
+    now = now or datetime.utcnow()
+    is_late = task.due_date is not None and task.due_date < now
+    record_progress(user_id, completed=1, late=int(is_late))
+
+
+def record_reopen(user_id, completed_at, due_date):
+    """
+    Take a task that was just marked not completed back out of the day it
+    was completed on, then snapshot today's backlog. Pass the completed_at
+    and due_date the task had before the change (set_completed(False)
+    clears completed_at); tasks completed before completed_at was recorded
+    have no known day to correct.
+    """
+    if completed_at is not None:
+        late = int(due_date is not None and due_date < completed_at)
+        db.session.execute(
+            update(TaskProgressDaily)
+            .where(
+                TaskProgressDaily.user_id == user_id,
+                TaskProgressDaily.day == utc_to_pacific_date(completed_at)
+            )
+            .values(
+                completed=TaskProgressDaily.completed - 1,
+                completed_on_time=TaskProgressDaily.completed_on_time - (1 - late),
+                completed_late=TaskProgressDaily.completed_late - late,
+            )
+        )
+    record_progress(user_id)
+
+
+def backfill_progress(user_id):
+    """
+    Rebuild a user's rollup from their current tasks, using completed_at
+    (or updated_at where it is unknown); deleted tasks are not reflected.
+    """
+    days = defaultdict(lambda: dict.fromkeys(_COUNTERS, 0))
+    backlog_delta = defaultdict(int)
+    rows = db.session.execute(
+        select(Task.created_at, func.coalesce(Task.completed_at, Task.updated_at), Task.completed, Task.due_date)
+        .where(Task.user_id == user_id)
+    )
+    for created_at, finished_at, completed, due_date in rows:
+        created_at = created_at or finished_at or datetime.utcnow()
+        created_day = utc_to_pacific_date(created_at)
+        days[created_day]['created'] += 1
+        backlog_delta[created_day] += 1
+        if completed:
+            completed_at = finished_at or created_at
+            done_day = utc_to_pacific_date(completed_at)
+            bucket = days[done_day]
+            bucket['completed'] += 1
+            if due_date is not None and due_date < completed_at:
+                bucket['completed_late'] += 1
+            else:
+                bucket['completed_on_time'] += 1
+            backlog_delta[done_day] -= 1
+
+    open_tasks = 0
+    records = []
+    for day in sorted(days):
+        open_tasks += backlog_delta[day]
+        records.append({'user_id': user_id, 'day': day, 'open_tasks': open_tasks, **days[day]})
+
+    db.session.execute(delete(TaskProgressDaily).where(TaskProgressDaily.user_id == user_id))
+    if records:
+        db.session.execute(TaskProgressDaily.__table__.insert(), records)
+    db.session.commit()
+    return len(records)
+
+
+def progress_series(user_id, start, end, bucket='day'):
+    """
+    Completions, on-time/late counts, on-time rate and backlog per day or
+    ISO week between start and end (inclusive), from one range scan over
+    task_progress_daily. Days without a row carry the previous backlog.
+    """
+    # Start from the last row on or before `start` so the backlog is known on day one
+    anchor = select(func.max(TaskProgressDaily.day)).where(
+        TaskProgressDaily.user_id == user_id,
+        TaskProgressDaily.day <= start
+    ).scalar_subquery()
+    rows = db.session.execute(
+        select(TaskProgressDaily)
+        .where(
+            TaskProgressDaily.user_id == user_id,
+            TaskProgressDaily.day <= end,
+            TaskProgressDaily.day >= func.coalesce(anchor, start)
+        )
+        .order_by(TaskProgressDaily.day)
+    ).scalars().all()
+
+    by_day = {row.day: row for row in rows}
+    backlog = 0
+    for row in rows:
+        if row.day < start:
+            backlog = row.open_tasks
+
+    buckets = []
+    day = start
+    while day <= end:
+        key = day if bucket == 'day' else day - timedelta(days=day.weekday())
+        if not buckets or buckets[-1]['label'] != key:
+            buckets.append({'label': key, 'completed': 0, 'on_time': 0, 'late': 0, 'created': 0})
+        row = by_day.get(day)
+        if row is not None:
+            buckets[-1]['completed'] += row.completed
+            buckets[-1]['on_time'] += row.completed_on_time
+            buckets[-1]['late'] += row.completed_late
+            buckets[-1]['created'] += row.created
+            backlog = row.open_tasks
+        buckets[-1]['backlog'] = backlog
+        day += timedelta(days=1)
+
+    return {
+        'labels': [b['label'].isoformat() for b in buckets],
+        'created': [b['created'] for b in buckets],
+        'completed': [b['completed'] for b in buckets],
+        'on_time': [b['on_time'] for b in buckets],
+        'late': [b['late'] for b in buckets],
+        'on_time_rate': [round(b['on_time'] / b['completed'], 3) if b['completed'] else None for b in buckets],
+        'backlog': [b['backlog'] for b in buckets],
+    }
+
+
+def init_progress(app):
+    @app.cli.command('backfill-progress')
+    @click.option('--email', default=None, help="Only rebuild this user's rollup.")
+    def backfill_progress_command(email):
+        """Rebuild task_progress_daily from existing tasks."""
+        query = User.query
+        if email:
+            query = query.filter_by(email=email)
+        users = 0
+        for user_id, in query.with_entities(User.id).all():
+            backfill_progress(user_id)
+            users += 1
+        print(f"Rebuilt progress rollups for {users} users.")
@@ -0,0 +1,205 @@
+# Neuronudge/reminders.py
+from datetime import datetime, timedelta
+import json
+import logging
+import threading
+import urllib.request
+import click
+from flask import current_app, has_app_context
+from sqlalchemy import bindparam, event, func, inspect, select
+from . import db
+from .models import OnboardingPreferences, Task, User
+
+logger = logging.getLogger('neuronudge.reminders')
+
+DEFAULT_LEAD_MINUTES = 60
+
+# Task attributes that decide whether and when a reminder fires
+_SCHEDULE_FIELDS = ('due_date', 'reminder_set', 'completed')
+
+
+def reminder_time(due_date, reminder_set, completed, now=None):
+    """
+    When a reminder should fire for a task: REMINDER_LEAD_MINUTES before it
+    is due, or None if it has no reminder, is done, or is already overdue.
+    """
+    now = now or datetime.utcnow()
+    if not reminder_set or completed or due_date is None or due_date <= now:
+        return None
+    lead = current_app.config.get('REMINDER_LEAD_MINUTES', DEFAULT_LEAD_MINUTES) \
+        if has_app_context() else DEFAULT_LEAD_MINUTES
+    return max(due_date - timedelta(minutes=lead), now)
+
+
+# Keep Task.remind_at current for every ORM write. Set-based writes
+# (bulk_complete, the importer) fill it in themselves.
+
+@event.listens_for(Task, 'before_insert')
+def _schedule_new_task(mapper, connection, task):
+    task.remind_at = reminder_time(task.due_date, task.reminder_set, task.completed)
+
+
+@event.listens_for(Task, 'before_update')
+def _reschedule_task(mapper, connection, task):
+    state = inspect(task)
+    if any(state.attrs[name].history.has_changes() for name in _SCHEDULE_FIELDS):
+        task.remind_at = reminder_time(task.due_date, task.reminder_set, task.completed)
+
+
+# --- Notifiers ---
+
+class LogNotifier:
+    """Write reminders to the neuronudge.reminders logger."""
+
+    def send(self, reminder):
+        logger.info("Reminder for %s: '%s' is due at %s", reminder['email'], reminder['title'], reminder['due_date'])
+
+
+class FileNotifier:
+    """Append reminders to a file as JSON lines (handy for local testing)."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def send(self, reminder):
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(reminder) + '\n')
+
+
+class WebhookNotifier:
+    """POST each reminder as JSON to a URL."""
+
+    def __init__(self, url, timeout=5):
+        self.url = url
+        self.timeout = timeout
+
+    def send(self, reminder):
+        req = urllib.request.Request(
+            self.url,
+            data=json.dumps(reminder).encode('utf-8'),
+            headers={'Content-Type': 'application/json'},
+            method='POST'
+        )
+        with urllib.request.urlopen(req, timeout=self.timeout):
+            pass
+
+
+def make_notifier(app):
+    kind = app.config.get('REMINDER_NOTIFIER', 'log')
+    target = app.config.get('REMINDER_NOTIFIER_TARGET')
+    if kind == 'log':
+        return LogNotifier()
+    if kind == 'file':
+        return FileNotifier(target or 'reminders.jsonl')
+    if kind == 'webhook':
+        if not target:
+            raise ValueError("REMINDER_NOTIFIER='webhook' requires REMINDER_NOTIFIER_TARGET")
+        return WebhookNotifier(target)
+    raise ValueError(f"Unknown REMINDER_NOTIFIER: {kind}")
+
+
+# --- Scheduler ---
+
+class ReminderScheduler:
+    """
+    Fires reminders in remind_at order. Each pass is an index seek on
+    ix_task_remind_at: fetch up to batch_size due reminders, deliver them,
+    clear their remind_at, then sleep until the next remind_at (capped at
+    max_sleep so reminders scheduled meanwhile by the web app are noticed).
+    A reminder the notifier fails on is retried retry_delay seconds later,
+    until the task comes due. Run a single scheduler process per database.
+    """
+
+    def __init__(self, notifier, batch_size=500, max_sleep=30, retry_delay=300):
+        self.notifier = notifier
+        self.batch_size = batch_size
+        self.max_sleep = max_sleep
+        self.retry_delay = retry_delay
+        self._stop = threading.Event()
+
+    def next_due(self):
+        return db.session.execute(select(func.min(Task.remind_at))).scalar()
+
+    def fire_due(self, now=None):
+        """Deliver every reminder due by `now`. Returns the number sent."""
+        now = now or datetime.utcnow()
+        retry_at = now + timedelta(seconds=self.retry_delay)
+        sent = 0
+        while True:
+            rows = db.session.execute(
+                select(Task.id, Task.user_id, Task.title, Task.due_date, Task.remind_at, User.email,
+                       OnboardingPreferences.notifications_enabled)
+                .join(User, User.id == Task.user_id)
+                .outerjoin(OnboardingPreferences, OnboardingPreferences.user_id == Task.user_id)
+                .where(Task.remind_at <= now)
+                .order_by(Task.remind_at)
+                .limit(self.batch_size)
+            ).all()
+            if not rows:
+                return sent
+            done, retry = [], []
+            for row in rows:
+                if row.notifications_enabled is False:
+                    done.append(row)
+                    continue
+                try:
+                    self.notifier.send({
+                        'task_id': row.id,
+                        'user_id': row.user_id,
+                        'email': row.email,
+                        'title': row.title,
+                        'due_date': row.due_date.isoformat(),
+                    })
+                    sent += 1
+                    done.append(row)
+                except Exception:
+                    logger.exception("Failed to deliver reminder for task %s", row.id)
+                    if row.due_date is not None and retry_at < row.due_date:
+                        retry.append(row)
+                    else:
+                        done.append(row)
+            # Only touch reminders that were not rescheduled while we were sending
+            task = Task.__table__
+            reschedule = task.update() \
+                .where(task.c.id == bindparam('task_id'), task.c.remind_at == bindparam('fired_at')) \
+                .values(remind_at=bindparam('next_at'))
+            db.session.execute(reschedule, [
+                {'task_id': row.id, 'fired_at': row.remind_at, 'next_at': None} for row in done
+            ] + [
+                {'task_id': row.id, 'fired_at': row.remind_at, 'next_at': retry_at} for row in retry
+            ])
+            db.session.commit()
+
+    def run(self):
+        while not self._stop.is_set():
+            self.fire_due()
+            next_due = self.next_due()
+            db.session.remove()
+            if next_due is None:
+                delay = self.max_sleep
+            else:
+                delay = min(max((next_due - datetime.utcnow()).total_seconds(), 0), self.max_sleep)
+            self._stop.wait(delay)
+
+    def stop(self):
+        self._stop.set()
+
+
+def init_reminders(app):
+    @app.cli.command('run-reminders')
+    @click.option('--once', is_flag=True, help="Fire reminders that are due now and exit.")
+    def run_reminders_command(once):
+        """Deliver task reminders as they come due."""
+        scheduler = ReminderScheduler(
+            make_notifier(app),
+            batch_size=app.config.get('REMINDER_BATCH_SIZE', 500),
+            max_sleep=app.config.get('REMINDER_MAX_SLEEP', 30),
+            retry_delay=app.config.get('REMINDER_RETRY_SECONDS', 300)
+        )
+        if once:
+            print(f"Sent {scheduler.fire_due()} reminders.")
+            return
+        try:
+            scheduler.run()
+        except KeyboardInterrupt:
+            scheduler.stop()
@@ -0,0 +1,74 @@
+# Neuronudge/routing.py
+import random
+import time
+from flask import current_app, g, has_request_context, request, session as flask_session
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.sql import Select
+
+# Bind keys for read replicas are REPLICA_BIND_PREFIX + n (see engine.configure_database)
+REPLICA_BIND_PREFIX = 'replica_'
+
+# Cookie-session key holding the time until which this browser reads from the primary
+_PRIMARY_UNTIL_KEY = '_db_primary_until'
+
+
+def read_only(view):
+    """Mark a view whose queries may be served by a read replica."""
+    view.db_read_only = True
+    return view
+
+
+def _replica_allowed(clause):
+    if not has_request_context() or g.get('db_wrote'):
+        return False
+    if clause is not None and not isinstance(clause, Select):
+        return False
+    view = current_app.view_functions.get(request.endpoint)
+    if not getattr(view, 'db_read_only', False):
+        return False
+    # Read-your-writes: stay on the primary for a while after this user wrote
+    return flask_session.get(_PRIMARY_UNTIL_KEY, 0) < time.time()
+
+
+class RoutingSession(Session):
+    """
+    Session that sends SELECTs issued by @read_only views to a replica bind,
+    and everything else (writes, flushes, non read-only views) to the primary.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and _replica_allowed(clause):
+            replicas = [
+                engine for key, engine in self._db.engines.items()
+                if isinstance(key, str) and key.startswith(REPLICA_BIND_PREFIX)
+            ]
+            if replicas:
+                return random.choice(replicas)
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def _mark_write():
+    if has_request_context():
+        g.db_wrote = True
+
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _after_flush(session, flush_context):
+    _mark_write()
+
+
+@event.listens_for(RoutingSession, 'do_orm_execute')
+def _on_execute(orm_execute_state):
+    if not orm_execute_state.is_select:
+        _mark_write()
+
+
+def init_routing(app):
+    """Keep a browser on the primary for a few seconds after it wrote, so it reads its own writes."""
+
+    @app.after_request
+    def remember_write(response):
+        if g.get('db_wrote'):
+            flask_session[_PRIMARY_UNTIL_KEY] = time.time() + app.config.get('REPLICA_STICKY_SECONDS', 5)
+        return response
@@ -0,0 +1,164 @@
+# Neuronudge/search.py
+import re
+from contextlib import contextmanager
+from flask import current_app
+from sqlalchemy import table, column, literal_column, select, text
+from sqlalchemy.exc import OperationalError
+from . import db
+from .models import Task
+
+# External-content FTS5 index over task.title / task.description.
+# The rowid of task_fts is the Task.id it indexes.
+task_fts = table('task_fts', column('rowid'), column('rank'))
+
+# fts_bulk_insert() drops this trigger for the length of a bulk insert
+_FTS_INSERT_TRIGGER = (
+    "CREATE TRIGGER IF NOT EXISTS task_fts_ai AFTER INSERT ON task BEGIN "
+    "INSERT INTO task_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END"
+)
+
+_FTS_SETUP = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS task_fts USING fts5("
+    "title, description, content='task', content_rowid='id', tokenize='unicode61')",
+    _FTS_INSERT_TRIGGER,
+    "CREATE TRIGGER IF NOT EXISTS task_fts_ad AFTER DELETE ON task BEGIN "
+    "INSERT INTO task_fts(task_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); END",
+    "CREATE TRIGGER IF NOT EXISTS task_fts_au AFTER UPDATE OF title, description ON task BEGIN "
+    "INSERT INTO task_fts(task_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); "
+    "INSERT INTO task_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+]
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def exclude_fts_tables(name, type_, parent_names):
+    """Alembic include_name hook: keep autogenerate from dropping the FTS tables."""
+    return not (type_ == 'table' and name.startswith('task_fts'))
+
+
+def rebuild_search_index():
+    """Repopulate task_fts from the task table."""
+    db.session.execute(text("INSERT INTO task_fts(task_fts) VALUES ('rebuild')"))
+    db.session.commit()
+
+
+def setup_search_index(app):
+    """
+    Create the FTS5 table and sync triggers if the database supports them.
+    Returns False (and search falls back to LIKE) on other engines or
+    SQLite builds compiled without FTS5.
+    """
+    if not app.config.get('SEARCH_FTS_ENABLED', True) or db.engine.dialect.name != 'sqlite':
+        return False
+
+    try:
+        with db.engine.begin() as conn:
+            existed = conn.execute(text(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'task_fts'"
+            )).first() is not None
+            for statement in _FTS_SETUP:
+                conn.execute(text(statement))
+            if not existed:
+                # First run on an existing database: index the tasks already there
+                conn.execute(text("INSERT INTO task_fts(task_fts) VALUES ('rebuild')"))
+    except OperationalError as e:
+        app.logger.warning("Full-text search disabled, falling back to LIKE: %s", e)
+        return False
+    return True
+
+
+def init_search(app):
+    app.extensions['task_fts'] = setup_search_index(app)
+
+    @app.cli.command('rebuild-search-index')
+    def rebuild_search_index_command():
+        """Rebuild the full-text task search index."""
+        if not app.extensions.get('task_fts'):
+            print("Full-text search is not available on this database.")
+            return
+        rebuild_search_index()
+        print("Search index rebuilt.")
+
+
+def fts_enabled():
+    return bool(current_app.extensions.get('task_fts'))
+
+
+@contextmanager
+def fts_bulk_insert(conn):
+    """
+    Drop the per-row FTS insert trigger for tasks inserted inside this
+    block, then index them with one set-based INSERT ... SELECT. Must run
+    inside the same transaction as the inserts. SQLite's DDL is
+    transactional, so other connections never see the trigger missing.
+    """
+    if not fts_enabled():
+        yield
+        return
+    # pysqlite only opens a transaction before DML; the DROP must be part of ours
+    if not conn.connection.dbapi_connection.in_transaction:
+        conn.exec_driver_sql("BEGIN")
+    # The DROP takes SQLite's write lock, so no other connection can insert
+    # tasks until we commit and every id above max_id is ours
+    conn.execute(text("DROP TRIGGER IF EXISTS task_fts_ai"))
+    try:
+        max_id = conn.execute(text("SELECT COALESCE(MAX(id), 0) FROM task")).scalar()
+        yield
+        conn.execute(text(
+            "INSERT INTO task_fts(rowid, title, description) "
+            "SELECT id, title, description FROM task WHERE id > :max_id"
+        ), {'max_id': max_id})
+    finally:
+        # Also on error: the caller may commit part of the work, and per-row
+        # indexing must not stay switched off
+        conn.execute(text(_FTS_INSERT_TRIGGER))
+
+
+def build_match_query(term, column_name=None):
+    """
+    Turn free text into an FTS5 MATCH expression where every word is a
+    prefix term ("wor"* matches "work"), optionally scoped to one column.
+    """
+    tokens = _TOKEN_RE.findall(term)
+    if not tokens:
+        return None
+    expression = ' '.join(f'"{token}"*' for token in tokens)
+    if column_name:
+        return f'{column_name} : ({expression})'
+    return expression
+
+
+def search_tasks(query, title=None, description=None, ranked=False):
+    """
+    Filter a Task query by title and/or description terms.
+
+    Uses the FTS5 index when available (optionally ordering by bm25 rank),
+    otherwise falls back to case-insensitive substring matching.
+    """
+    if not fts_enabled():
+        if title:
+            query = query.filter(Task.title.ilike(f'%{title}%'))
+        if description:
+            query = query.filter(Task.description.ilike(f'%{description}%'))
+        return query
+
+    parts = [
+        build_match_query(title, 'title') if title else None,
+        build_match_query(description, 'description') if description else None,
+    ]
+    parts = [p for p in parts if p]
+    if not parts:
+        # Only punctuation was entered; nothing can match a token
+        return query.filter(db.false())
+    match = ' AND '.join(parts)
+
+    # Evaluate MATCH once, as its own step. Joined directly, SQLite may loop
+    # over the user's tasks and rerun the full-text query for every row.
+    hits = select(task_fts.c.rowid, task_fts.c.rank) \
+        .where(literal_column('task_fts').op('MATCH')(match))
+    if not ranked:
+        return query.filter(Task.id.in_(hits.with_only_columns(task_fts.c.rowid)))
+    hits = hits.cte('task_hits').prefix_with('MATERIALIZED')
+    return query.join(hits, hits.c.rowid == Task.id).order_by(hits.c.rank)
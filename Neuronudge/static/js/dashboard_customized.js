@@ -0,0 +1,657 @@
+// Neuronudge/static/js/dashboard_customized.js
+// Scripts for dashboard_customized.html. Values that used to be rendered
+// into the inline scripts come from the #dashboardConfig JSON element.
+const dashboardConfig = JSON.parse(document.getElementById('dashboardConfig').textContent);
+
+document.addEventListener('DOMContentLoaded', function () {
+
+  // --------------------------
+  // Feature set (safe Jinja -> JS)
+  // Use default([]) so the template always emits a valid JSON array even if `features` is undefined.
+  // --------------------------
+  const enabledFeatures = new Set(dashboardConfig.features);
+  function hasFeature(name) { return enabledFeatures.has(name); }
+  window.dashboardFeatures = Array.from(enabledFeatures); // for debugging in browser console
+
+  // --------------------------
+  // CSRF helper (safe fallback)
+  // --------------------------
+  function getCsrfToken() {
+    const csrfInput = document.querySelector('input[name="csrf_token"]');
+    if (csrfInput && csrfInput.value) return csrfInput.value;
+    const meta = document.querySelector('meta[name="csrf-token"]');
+    if (meta) return meta.getAttribute('content');
+    // sometimes Flask-WTF exposes csrf_token() as a global; avoid using template function in JS
+    return null;
+  }
+  const CSRF_TOKEN = getCsrfToken();
+
+  // --------------------------
+  // Generic POST JSON helper
+  // --------------------------
+  function postJSON(url, payload) {
+    const headers = { 'Content-Type': 'application/json' };
+    if (CSRF_TOKEN) headers['X-CSRFToken'] = CSRF_TOKEN;
+    return fetch(url, {
+      method: 'POST',
+      headers,
+      body: JSON.stringify(payload)
+    });
+  }
+
+  // --------------------------
+  // EXPORT TASKS
+  // --------------------------
+  (function setupExport() {
+    const btn = document.getElementById('exportTasksBtn');
+    if (!btn) return;
+    if (!hasFeature('task_export')) {
+      btn.classList.add('d-none');
+      return;
+    }
+    btn.addEventListener('click', function () {
+      fetch(dashboardConfig.urls.exportTasks)
+        .then(r => {
+          if (!r.ok) throw new Error('Export failed');
+          return r.blob();
+        })
+        .then(blob => {
+          const url = window.URL.createObjectURL(blob);
+          const a = document.createElement('a');
+          a.href = url;
+          a.download = 'tasks.json';
+          document.body.appendChild(a);
+          a.click();
+          a.remove();
+          window.URL.revokeObjectURL(url);
+        })
+        .catch(err => console.error('Export error:', err));
+    });
+  })();
+
+  // --------------------------
+  // INLINE TIMER / START / FINISH
+  // --------------------------
+  (function setupInlineTimer() {
+    // If feature disabled, hide start buttons and ensure overlay hidden
+    if (!hasFeature('task_timer')) {
+      document.querySelectorAll('.scroll-to-timer').forEach(b => b.classList.add('d-none'));
+      const overlayEl = document.getElementById('inlineTimerOverlay');
+      if (overlayEl) overlayEl.classList.add('d-none');
+      return;
+    }
+
+    const overlay = document.getElementById('inlineTimerOverlay');
+    const countdownDisplay = document.getElementById('countdownDisplay');
+    const inlineForm = document.getElementById('inlineTimerForm');
+    const minutesInput = document.getElementById('inlineTimerMinutes');
+    const taskIdInput = document.getElementById('inlineTaskId');
+    const titleElem = document.getElementById('inlineTimerTitle');
+
+    // create "Task finished" button inside overlay if not present
+    let finishBtn = document.getElementById('finishTaskBtn');
+    if (!finishBtn && overlay) {
+      finishBtn = document.createElement('button');
+      finishBtn.type = 'button';
+      finishBtn.id = 'finishTaskBtn';
+      finishBtn.className = 'btn btn-outline-primary w-100 mt-2';
+      finishBtn.textContent = 'Task finished';
+      const form = overlay.querySelector('#inlineTimerForm');
+      if (form) form.appendChild(finishBtn);
+    }
+
+    let countdownInterval = null;
+    let secondsRemaining = 0;
+
+    // Update the status badge in the task row for immediate UI feedback
+    function updateStatusBadgeOnRow(taskId, status) {
+      if (!taskId) return;
+      const triggerBtn = document.querySelector(`button.scroll-to-timer[data-task-id="${taskId}"]`);
+      if (!triggerBtn) return;
+      const tr = triggerBtn.closest('tr');
+      if (!tr) return;
+      const statusCell = tr.querySelector('td:nth-child(4)');
+      if (!statusCell) return;
+
+      let badgeClasses = 'badge bg-secondary';
+      let badgeText = status;
+      if (status === 'completed') { badgeClasses = 'badge bg-success'; badgeText = 'Completed'; }
+      else if (status === 'in progress') { badgeClasses = 'badge bg-info text-dark'; badgeText = 'In Progress'; }
+      else if (status === 'not started') { badgeClasses = 'badge bg-secondary'; badgeText = 'Not Started'; }
+      else if (status === 'overdue') { badgeClasses = 'badge bg-danger'; badgeText = 'Overdue'; }
+      else { badgeClasses = 'badge bg-secondary'; badgeText = status; }
+
+      statusCell.innerHTML = `<span class="${badgeClasses}">${badgeText}</span>`;
+    }
+
+    // Server update for status; returns a promise
+    function updateTaskStatus(taskId, newStatus) {
+      if (!taskId) return Promise.reject('missing taskId');
+      const urlTemplate = dashboardConfig.urls.updateStatus;
+      const url = urlTemplate.replace('0', taskId);
+      return postJSON(url, { status: newStatus })
+        .then(resp => {
+          if (!resp.ok) throw new Error('update failed');
+          updateStatusBadgeOnRow(taskId, newStatus);
+          return resp;
+        })
+        .catch(err => {
+          console.error('Status update failed', err);
+          throw err;
+        });
+    }
+
+    // open overlay for a task and set in-progress on server (best-effort)
+    function openOverlayFor(taskId, taskTitle) {
+      if (!overlay) return;
+      taskIdInput.value = taskId;
+      titleElem.textContent = taskTitle || 'Task Timer';
+      countdownDisplay.textContent = '00:00';
+      // reset any existing timer
+      clearInterval(countdownInterval);
+      countdownInterval = null;
+      secondsRemaining = 0;
+      overlay.classList.remove('d-none');
+
+      // set 'in progress' immediately (best-effort update)
+      updateTaskStatus(taskId, 'in progress').catch(() => {
+        // ignored; UI already shows overlay
+      });
+    }
+
+    // hook start buttons
+    document.querySelectorAll('.scroll-to-timer').forEach(btn => {
+      btn.addEventListener('click', function () {
+        const tId = this.dataset.taskId;
+        const tTitle = this.dataset.taskTitle;
+        openOverlayFor(tId, tTitle);
+      });
+    });
+
+    // finish button (user marks task finished early)
+    if (finishBtn) {
+      finishBtn.addEventListener('click', function () {
+        const tid = taskIdInput.value;
+        if (!tid) return;
+        clearInterval(countdownInterval);
+        countdownInterval = null;
+        secondsRemaining = 0;
+        updateTaskStatus(tid, 'completed')
+          .finally(() => {
+            if (overlay) overlay.classList.add('d-none');
+          });
+      });
+    }
+
+    // close overlay button
+    const closeInline = document.getElementById('closeInlineTimer');
+    if (closeInline) {
+      closeInline.addEventListener('click', function () {
+        clearInterval(countdownInterval);
+        countdownInterval = null;
+        if (overlay) overlay.classList.add('d-none');
+      });
+    }
+
+    // modal that asks Yes/No when timer ends
+    function showTimerEndModal(taskId) {
+      const MID = 'inlineTimerEndModal';
+      let modalEl = document.getElementById(MID);
+      if (!modalEl) {
+        modalEl = document.createElement('div');
+        modalEl.className = 'modal fade';
+        modalEl.id = MID;
+        modalEl.tabIndex = -1;
+        modalEl.innerHTML = `
+          <div class="modal-dialog modal-dialog-centered">
+            <div class="modal-content border-warning">
+              <div class="modal-header bg-warning">
+                <h5 class="modal-title">Time is up</h5>
+                <button type="button" class="btn-close" data-bs-dismiss="modal" aria-label="Close"></button>
+              </div>
+              <div class="modal-body">
+                <p class="mb-0">Did you finish the task?</p>
+              </div>
+              <div class="modal-footer">
+                <button type="button" class="btn btn-outline-secondary" id="${MID}-no">No</button>
+                <button type="button" class="btn btn-warning" id="${MID}-yes">Yes</button>
+              </div>
+            </div>
+          </div>`;
+        document.body.appendChild(modalEl);
+      }
+
+      const bsModal = new bootstrap.Modal(modalEl);
+      bsModal.show();
+
+      const yesBtn = modalEl.querySelector(`#${MID}-yes`);
+      const noBtn = modalEl.querySelector(`#${MID}-no`);
+
+      function doYes() {
+        updateTaskStatus(taskId, 'completed').finally(() => bsModal.hide());
+        cleanup();
+      }
+      function doNo() {
+        updateTaskStatus(taskId, 'in progress').finally(() => bsModal.hide());
+        cleanup();
+      }
+      function cleanup() {
+        if (yesBtn) yesBtn.removeEventListener('click', doYes);
+        if (noBtn) noBtn.removeEventListener('click', doNo);
+      }
+
+      if (yesBtn) yesBtn.addEventListener('click', doYes);
+      if (noBtn) noBtn.addEventListener('click', doNo);
+    }
+
+    // start countdown when inline form is submitted
+    if (inlineForm) {
+      inlineForm.addEventListener('submit', function (e) {
+        e.preventDefault();
+        let minutes = parseInt(minutesInput.value || '1', 10);
+        if (!minutes || minutes <= 0) minutes = 1;
+        secondsRemaining = minutes * 60;
+
+        clearInterval(countdownInterval);
+        countdownInterval = setInterval(() => {
+          const m = Math.floor(secondsRemaining / 60);
+          const s = secondsRemaining % 60;
+          countdownDisplay.textContent = `${String(m).padStart(2, '0')}:${String(s).padStart(2, '0')}`;
+
+          if (secondsRemaining <= 0) {
+            clearInterval(countdownInterval);
+            countdownInterval = null;
+            const tid = taskIdInput.value;
+            if (overlay) overlay.classList.add('d-none');
+            // show yes/no modal
+            showTimerEndModal(tid);
+          }
+          secondsRemaining--;
+        }, 1000);
+      });
+    }
+  })();
+
+  // --------------------------
+  // DELETE TASK modal (red popup)
+  // --------------------------
+  (function setupDeleteModal() {
+    const deleteModalEl = document.getElementById('deleteTaskModal');
+    const confirmDeleteBtn = document.getElementById('confirmDeleteTaskBtn');
+    let deleteTaskId = null;
+
+    // capture which task id to delete when delete button clicked
+    document.querySelectorAll('.delete-task-btn').forEach(btn => {
+      btn.addEventListener('click', function () {
+        deleteTaskId = this.dataset.taskId;
+      });
+    });
+
+    if (!deleteModalEl || !confirmDeleteBtn) return;
+
+    confirmDeleteBtn.addEventListener('click', function () {
+      if (!deleteTaskId) {
+        // try fallback: find delete button currently triggering the modal
+        const possible = document.querySelector('.delete-task-btn[data-bs-toggle="modal"][data-bs-target="#deleteTaskModal"]');
+        if (possible) deleteTaskId = possible.dataset.taskId;
+      }
+      if (!deleteTaskId) return;
+
+      const deleteUrl = dashboardConfig.urls.deleteTask.replace('0', deleteTaskId);
+      // prefer POST JSON, but fallback to plain fetch if necessary
+      postJSON(deleteUrl, {})
+        .then(resp => {
+          if (!resp.ok) {
+            return fetch(deleteUrl, { method: 'POST' }); // fallback
+          }
+          return resp;
+        })
+        .then(() => {
+          // remove the row from the table
+          const row = document.querySelector(`.delete-task-btn[data-task-id="${deleteTaskId}"]`)?.closest('tr');
+          if (row) row.remove();
+          // close modal
+          const bsModal = bootstrap.Modal.getInstance(deleteModalEl);
+          if (bsModal) bsModal.hide();
+        })
+        .catch(err => console.error('Delete failed:', err));
+    });
+  })(); // end setupDeleteModal
+
+  // --------------------------
+  // FILTER DROPDOWNS
+  // --------------------------
+  (function setupFilters() {
+    const statusFilter = document.getElementById('clientFilterStatus');
+    const priorityFilter = document.getElementById('clientFilterPriority');
+
+    if (statusFilter) {
+      statusFilter.addEventListener('change', function () {
+        const params = new URLSearchParams(window.location.search);
+        if (this.value) params.set('status', this.value); else params.delete('status');
+        window.location.search = params.toString();
+      });
+    }
+    if (priorityFilter) {
+      priorityFilter.addEventListener('change', function () {
+        const params = new URLSearchParams(window.location.search);
+        if (this.value) params.set('priority', this.value); else params.delete('priority');
+        window.location.search = params.toString();
+      });
+    }
+  })();
+
+  // --------------------------
+  // PROGRESS BARS / GAMIFICATION
+  // --------------------------
+  (function setupProgressBars() {
+    if (!hasFeature('gamification')) {
+      // hide gamification card if present
+      document.querySelectorAll('.card').forEach(card => {
+        const header = card.querySelector('.card-header');
+        if (header && header.textContent && header.textContent.trim().toLowerCase().includes('gamification')) {
+          card.classList.add('d-none');
+        }
+      });
+      return;
+    }
+    document.querySelectorAll('.progress-bar[data-points]').forEach(bar => {
+      const value = parseInt(bar.dataset.points || '0', 10);
+      bar.style.width = Math.max(0, Math.min(100, value)) + '%';
+      bar.setAttribute('aria-valuenow', String(Math.max(0, Math.min(100, value))));
+    });
+  })();
+
+  // --------------------------
+  // HIDE SERVER-RENDERED BLOCKS IF DISABLED (defensive)
+  // --------------------------
+  (function defensiveHide() {
+    if (!hasFeature('task_timer')) {
+      const overlay = document.getElementById('inlineTimerOverlay');
+      if (overlay) overlay.classList.add('d-none');
+      document.querySelectorAll('.scroll-to-timer').forEach(b => b.classList.add('d-none'));
+    }
+    if (!hasFeature('task_export')) {
+      document.querySelectorAll('#exportTasksBtn').forEach(b => b.classList.add('d-none'));
+    }
+    if (!hasFeature('tips')) {
+      document.querySelectorAll('.card').forEach(card => {
+        const header = card.querySelector('.card-header');
+        if (header && /daily tips/i.test(header.textContent || '')) card.classList.add('d-none');
+      });
+    }
+    if (!hasFeature('reminders')) {
+      document.querySelectorAll('.card').forEach(card => {
+        const header = card.querySelector('.card-header');
+        if (header && /upcoming reminders/i.test(header.textContent || '')) card.classList.add('d-none');
+      });
+    }
+  })();
+
+}); // DOMContentLoaded
+
+  // Summary card navigation (safe: uses data-href to avoid quote problems)
+  (function setupSummaryCards() {
+    const cards = document.querySelectorAll('.summary-card-btn');
+    if (!cards || !cards.length) return;
+
+    cards.forEach(card => {
+      // click -> go to exact URL (data-href), fallback to craft query param
+      card.addEventListener('click', () => {
+        const href = card.dataset.href;
+        if (href && href.length) {
+          window.location.href = href;
+          return;
+        } 
+        // fallback: use status param and keep other query params
+        const status = card.dataset.status || 'all';
+        const params = new URLSearchParams(window.location.search);
+        if (status && status !== 'all') params.set('status', status);
+        else params.delete('status');
+        params.delete('page'); // reset pagination when switching view
+        window.location.search = params.toString();
+      });
+
+      // keyboard activation for accessibility
+      card.addEventListener('keydown', (e) => {
+        if (e.key === 'Enter' || e.key === ' ') {
+          e.preventDefault();
+          card.click();
+        }
+      });
+    });
+  })();
+
+  document.addEventListener('DOMContentLoaded', function () {
+  // select only the summary buttons we just added
+  const summaryBtns = document.querySelectorAll('.summary-card-btn');
+  if (!summaryBtns || summaryBtns.length === 0) return;
+
+  // find a suitable heading to update on click.
+  // we'll try a few common selectors so this works across your templates.
+  const headingSelectors = [
+    '#dashboardHeading',        // explicit id if you have it
+    'h1.display-5',             // dashboard_general / customized header
+    'h1.display-4',             // dyslexia header versions
+    'h1'                        // fallback to any H1
+  ];
+  let headerEl = null;
+  for (const sel of headingSelectors) {
+    const el = document.querySelector(sel);
+    if (el) { headerEl = el; break; }
+  }
+
+  const titleMap = {
+    all: 'All Tasks',
+    pending: 'Pending',
+    completed: 'Completed',
+    overdue: 'Overdue'
+  };
+
+  function setActive(btn) {
+    summaryBtns.forEach(b => b.classList.remove('active-summary'));
+    btn.classList.add('active-summary');
+  }
+
+  // attach handlers
+  summaryBtns.forEach(btn => {
+    // keyboard accessibility
+    btn.setAttribute('tabindex', '0');
+
+    btn.addEventListener('click', function (e) {
+      // prevent other delegated handlers from firing (you had problems with status toggles)
+      e.preventDefault();
+      e.stopPropagation();
+      const href = btn.dataset.href;
+      const status = btn.dataset.status;
+
+      // immediate visual feedback: change heading
+      if (headerEl && titleMap[status]) {
+        headerEl.textContent = titleMap[status];
+      }
+
+      setActive(btn);
+
+      // small delay so user sees change (optional) then navigate
+      // You can remove the timeout if you want instant navigation.
+      setTimeout(() => {
+        if (href) window.location.href = href;
+      }, 60);
+    });
+
+    // keyboard activation
+    btn.addEventListener('keydown', function (e) {
+      if (e.key === 'Enter' || e.key === ' ') {
+        e.preventDefault();
+        btn.click();
+      }
+    });
+  });
+
+  // highlight currently active based on URL status param
+  (function highlightCurrentFromQuery() {
+    const params = new URLSearchParams(window.location.search);
+    const current = (params.get('status') || 'all').toLowerCase();
+    summaryBtns.forEach(b => {
+      if ((b.dataset.status || '').toLowerCase() === current) {
+        setActive(b);
+      }
+    });
+  })();
+});
+
+document.addEventListener('DOMContentLoaded', function () {
+
+  // --------------------------
+  // Feature set (safe Jinja -> JS)
+  // --------------------------
+  const enabledFeatures = new Set(dashboardConfig.features);
+  function hasFeature(name) { return enabledFeatures.has(name); }
+  window.dashboardFeatures = Array.from(enabledFeatures); // for debugging in browser console
+
+  // --------------------------
+  // CSRF helper (safe fallback)
+  // --------------------------
+  function getCsrfToken() {
+    const csrfInput = document.querySelector('input[name="csrf_token"]');
+    if (csrfInput && csrfInput.value) return csrfInput.value;
+    const meta = document.querySelector('meta[name="csrf-token"]');
+    if (meta) return meta.getAttribute('content');
+    return null;
+  }
+  const CSRF_TOKEN = getCsrfToken();  
+
+  // --------------------------
+  // Generic POST JSON helper
+  // --------------------------
+  function postJSON(url, payload) {
+    const headers = { 'Content-Type': 'application/json' };
+    if (CSRF_TOKEN) headers['X-CSRFToken'] = CSRF_TOKEN;
+    return fetch(url, { method: 'POST', headers, body: JSON.stringify(payload) });
+  }
+
+  // --------------------------
+  // (rest of export/timer/delete/filter/progress unchanged…)
+  // --------------------------
+  // ...
+
+  // --------------------------
+  // SUMMARY CARDS (FIXED: no default active)
+  // --------------------------
+  (function setupSummaryCardsFixed() {
+    const summaryBtns = Array.from(document.querySelectorAll('.summary-card-btn'));
+    if (!summaryBtns.length) return;
+
+    // Always clear server-added classes first
+    summaryBtns.forEach(b => b.classList.remove('active', 'active-summary'));
+
+    // Then only apply based on ?status=
+    const params = new URLSearchParams(window.location.search);
+    const statusParam = params.get('status');
+    if (statusParam) {
+      const match = summaryBtns.find(b => (b.dataset.status || '').toLowerCase() === statusParam.toLowerCase());
+      if (match) match.classList.add('active-summary');
+    }
+
+    function setActive(btn) {
+      summaryBtns.forEach(b => b.classList.remove('active-summary'));
+      if (btn) btn.classList.add('active-summary');
+    }
+
+    summaryBtns.forEach(btn => {
+      if (btn.dataset.wired === '1') return;
+      btn.dataset.wired = '1';
+      if (!btn.hasAttribute('tabindex')) btn.setAttribute('tabindex', '0');
+
+      btn.addEventListener('click', function (e) {
+        e.preventDefault();
+        e.stopPropagation();
+
+        const status = (this.dataset.status || '').toLowerCase();
+        setActive(this);
+
+        const href = this.dataset.href;
+        setTimeout(() => {
+          if (href) {
+            window.location.assign(href);
+          } else {
+            const p = new URLSearchParams(window.location.search);
+            if (status) p.set('status', status); else p.delete('status');
+            p.delete('page');
+            window.location.assign(window.location.pathname + '?' + p.toString());
+          }
+        }, 50);
+      });
+
+      btn.addEventListener('keydown', function (ev) {
+        if (ev.key === 'Enter' || ev.key === ' ') { ev.preventDefault(); this.click(); }
+      });
+    });
+  })();
+
+
+// --------------------------
+// SUMMARY CARDS CLICK HANDLER
+// --------------------------
+(function setupSummaryCards() {
+  document.querySelectorAll('.summary-card-btn').forEach(btn => {
+    btn.addEventListener('click', function (e) {
+      e.preventDefault(); // stop default navigation first
+      const card = this.closest('.summary-card');
+
+      if (card) {
+        // Temporary flash animation
+        card.classList.add('clicked');
+        setTimeout(() => {
+          card.classList.remove('clicked'); // remove before navigating
+          window.location.href = this.dataset.href;
+        }, 150);
+      } else {
+        window.location.href = this.dataset.href;
+      }
+    });
+  });
+  });
+})();
+
+  // Live updates: patch counts and task rows from the /events stream instead of reloading
+  (function () {
+    if (!window.EventSource) return;
+    const source = new EventSource(dashboardConfig.urls.taskEvents);
+    const badges = {
+      late: '<span class="badge bg-danger">Late</span>',
+      completed: '<span class="badge bg-success">Completed</span>',
+      pending: '<span class="badge bg-warning text-dark">Pending</span>'
+    };
+
+    source.addEventListener('counts', function (e) {
+      const counts = JSON.parse(e.data);
+      document.querySelectorAll('[data-count]').forEach(el => {
+        const value = counts[el.dataset.count];
+        if (value !== undefined) el.textContent = value;
+      });
+    });
+
+    source.addEventListener('task', function (e) {
+      const delta = JSON.parse(e.data);
+      delta.ids.forEach(id => {
+        const row = document.querySelector(`tr[data-task-row="${id}"]`);
+        if (!row) return;
+        if (delta.op === 'deleted') {
+          row.remove();
+          return;
+        }
+        const cell = row.querySelector('[data-task-status]');
+        if (!cell) return;
+        if (delta.op === 'completed' || delta.completed) cell.innerHTML = badges.completed;
+        else cell.innerHTML = delta.overdue ? badges.late : badges.pending;
+      });
+    });
+  })();
+
+  // When user comes back via back button, remove all highlights
+  window.addEventListener("pageshow", function (event) {
+    document.querySelectorAll('.summary-card.active').forEach(card => {
+      card.classList.remove('active');
+    });
+  });
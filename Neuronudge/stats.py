@@ -0,0 +1,156 @@
+# Neuronudge/stats.py
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from threading import Lock
+import json
+import time
+from flask import current_app
+from sqlalchemy import func, select
+from . import db
+from .models import Task
+
+
+@dataclass(frozen=True)
+class TaskCounts:
+    total: int = 0
+    completed: int = 0
+    pending: int = 0
+    overdue: int = 0
+
+    def as_dict(self):
+        """Return the counts in the shape the dashboard templates expect."""
+        return {
+            'total': self.total,
+            'pending': self.pending,
+            'completed': self.completed,
+            'overdue': self.overdue
+        }
+
+
+def _task_counts_query(user_id, now):
+    def count(*criteria):
+        return select(func.count()).select_from(Task).where(Task.user_id == user_id, *criteria).scalar_subquery()
+
+    return select(
+        count(Task.completed.is_(None)),
+        count(Task.completed == True),
+        count(Task.completed == False),
+        count(Task.completed == False, Task.due_date < now),
+    )
+
+
+def compute_task_counts(user_id, now=None):
+    """
+    Compute total / completed / pending / overdue task counts for a user in
+    one statement. Each bucket is a COUNT over its own range of the covering
+    index ix_task_user_completed_due, so no table rows are read and nothing
+    is evaluated per row. Total adds up the completed, pending and (normally
+    empty) unset ranges instead of counting every row again.
+    """
+    unset, completed, pending, overdue = db.session.execute(
+        _task_counts_query(user_id, now or datetime.utcnow())
+    ).one()
+    return TaskCounts(
+        total=unset + completed + pending,
+        completed=completed,
+        pending=pending,
+        overdue=overdue
+    )
+
+
+# --- Per-user stats cache ---
+
+class MemoryStatsCache:
+    """In-process LRU cache with a per-entry TTL (one per worker)."""
+
+    def __init__(self, maxsize=1024, ttl=60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, user_id):
+        with self._lock:
+            entry = self._data.get(user_id)
+            if entry is None:
+                return None
+            expires_at, counts = entry
+            if expires_at < time.monotonic():
+                del self._data[user_id]
+                return None
+            self._data.move_to_end(user_id)
+            return counts
+
+    def set(self, user_id, counts):
+        with self._lock:
+            self._data[user_id] = (time.monotonic() + self.ttl, counts)
+            self._data.move_to_end(user_id)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, user_id):
+        with self._lock:
+            self._data.pop(user_id, None)
+
+
+class RedisStatsCache:
+    """Shared cache so several gunicorn workers see the same entries and invalidations."""
+
+    def __init__(self, url, ttl=60, prefix='neuronudge:task_counts:'):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("STATS_CACHE_BACKEND='redis' requires the 'redis' package")
+        self._client = redis.Redis.from_url(url)
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def get(self, user_id):
+        raw = self._client.get(f"{self.prefix}{user_id}")
+        if raw is None:
+            return None
+        return TaskCounts(**json.loads(raw))
+
+    def set(self, user_id, counts):
+        self._client.set(f"{self.prefix}{user_id}", json.dumps(asdict(counts)), ex=self.ttl)
+
+    def delete(self, user_id):
+        self._client.delete(f"{self.prefix}{user_id}")
+
+
+def init_stats_cache(app):
+    """Create the task stats cache configured for this app."""
+    backend = app.config.get('STATS_CACHE_BACKEND', 'memory')
+    ttl = app.config.get('STATS_CACHE_TTL', 60)
+    if backend == 'redis':
+        cache = RedisStatsCache(app.config['STATS_CACHE_URL'], ttl=ttl)
+    elif backend == 'memory':
+        cache = MemoryStatsCache(maxsize=app.config.get('STATS_CACHE_SIZE', 1024), ttl=ttl)
+    else:
+        raise ValueError(f"Unknown STATS_CACHE_BACKEND: {backend}")
+    app.extensions['task_stats_cache'] = cache
+    return cache
+
+
+def _cache():
+    return current_app.extensions.get('task_stats_cache')
+
+
+def get_task_counts(user_id, now=None):
+    """Return cached task counts for a user, computing them on a miss."""
+    cache = _cache()
+    if cache is None:
+        return compute_task_counts(user_id, now)
+    counts = cache.get(user_id)
+    if counts is None:
+        counts = compute_task_counts(user_id, now)
+        cache.set(user_id, counts)
+    return counts
+
+
+def invalidate_task_counts(user_id):
+    """Drop a user's cached counts. Call after any commit that changes their tasks."""
+    cache = _cache()
+    if cache is not None:
+        cache.delete(user_id)
@@ -0,0 +1,23 @@
+# Neuronudge/timeutils.py
+from datetime import datetime, time
+import pytz
+
+PACIFIC = pytz.timezone('US/Pacific')
+
+
+def pacific_due_to_utc(due_date):
+    """
+    Treat a date as 23:59 Pacific local time and return it as a naive UTC
+    datetime for storage in Task.due_date.
+    """
+    local_due = PACIFIC.localize(datetime.combine(due_date, time(23, 59)))
+    return local_due.astimezone(pytz.UTC).replace(tzinfo=None)
+
+
+def pacific_today():
+    return datetime.now(PACIFIC).date()
+
+
+def utc_to_pacific_date(value):
+    """Pacific calendar date of a naive UTC datetime."""
+    return pytz.UTC.localize(value).astimezone(PACIFIC).date()
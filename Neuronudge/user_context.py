@@ -0,0 +1,52 @@
+# Neuronudge/user_context.py
+from flask import g
+from flask_login import current_user
+from sqlalchemy.orm import joinedload
+from . import db
+from .models import User
+
+
+class UserContext:
+    """The logged-in user plus their preferences, loaded once per request."""
+
+    def __init__(self, user):
+        self.user = user
+
+    @property
+    def preferences(self):
+        # Already populated by the joined load in load_user_context
+        return self.user.preferences
+
+    @property
+    def features(self):
+        # Precomputed at registration / profile save, see User.feature_mask
+        return self.user.features
+
+    def has_feature(self, name):
+        return self.user.has_feature(name)
+
+
+def load_user_context(user_id):
+    """
+    Fetch a user and their OnboardingPreferences in one joined query and
+    memoize the result on flask.g for the rest of the request.
+    """
+    ctx = g.get('user_context')
+    if ctx is not None and ctx.user.id == user_id:
+        return ctx
+    user = db.session.execute(
+        db.select(User).options(joinedload(User.preferences)).where(User.id == user_id)
+    ).scalar_one_or_none()
+    if user is None:
+        return None
+    g.user_context = UserContext(user)
+    return g.user_context
+
+
+def get_user_context():
+    """Context for current_user (who may have just logged in during this request)."""
+    ctx = g.get('user_context')
+    user = current_user._get_current_object()
+    if ctx is None or ctx.user is not user:
+        ctx = g.user_context = UserContext(user)
+    return ctx
@@ -1,18 +1,31 @@
-from flask import Blueprint, render_template, redirect, url_for, request, flash, jsonify, abort, current_app
+from flask import Blueprint, render_template, redirect, url_for, request, flash, jsonify, abort, current_app, Response, stream_with_context
 from flask_login import login_required, current_user
 from .models import Task, OnboardingPreferences, User
 from . import db
 from .forms import OnboardingForm, TaskForm, ProfileUpdateForm, RegisterForm, ChangePasswordForm
-from datetime import datetime, time
+from .stats import get_task_counts, invalidate_task_counts
+from .fragments import DeferredList, bump_fragment_version
+from .search import search_tasks
+from .pagination import TASK_LIST_ORDER, wants_keyset, keyset_paginate
+from .export import EXPORT_FORMATS, parse_export_fields, stream_export
+from .timeutils import PACIFIC, pacific_due_to_utc
+from .importer import IMPORT_FORMATS, import_tasks, guess_format
+from .user_context import get_user_context
+from .routing import read_only
+from .activity import get_recent_activity, get_activity_since
+from .audit import log_action
+from .caching import conditional_on_tasks
+from .live import event_stream, publish_task_change
+from .history import record_transition, record_bulk_completion
+from .progress import PROGRESS_BUCKETS, MAX_SERIES_DAYS, record_progress, record_completion, record_reopen, progress_series
+from datetime import datetime
 from werkzeug.security import check_password_hash, generate_password_hash
 from werkzeug.utils import secure_filename
-import logging
 import pytz
 from datetime import timedelta
+import io
 import os
-import json
 
-PACIFIC = pytz.timezone('US/Pacific')
 
 main = Blueprint("main", __name__)
 
@@ -25,25 +38,30 @@ priority_map = {
 
 reverse_priority_map = {v: k for k, v in priority_map.items()}
 
-# Set up a logger for audit trail (simple console logging here)
-logger = logging.getLogger('neuronudge.audit')
-if not logger.hasHandlers():
-    handler = logging.StreamHandler()
-    formatter = logging.Formatter('%(asctime)s %(levelname)s: %(message)s')
-    handler.setFormatter(formatter)
-    logger.addHandler(handler)
-logger.setLevel(logging.INFO)
-
-def log_action(user_id, action):
-    logger.info(f'User {user_id} performed action: {action}')
-
 def allowed_file(filename):
     return '.' in filename and \
            filename.rsplit('.', 1)[1].lower() in current_app.config['ALLOWED_EXTENSIONS']
 
 
+def _mark_display_status(tasks, now):
+    """
+    Set task.display_status to the Late / Completed / Pending label the
+    dashboards show. Not Task.status: changing a column would flush an UPDATE
+    from a read-only view and pin the browser to the primary database.
+    """
+    for task in tasks:
+        if task.due_date and task.due_date < now and not task.completed:
+            task.display_status = "Late"
+        elif task.completed:
+            task.display_status = "Completed"
+        else:
+            task.display_status = "Pending"
+    return tasks
+
+
 @main.route('/dashboard')
 @login_required
+@read_only
 def dashboard():
     page = request.args.get('page', 1, type=int)
     per_page = 10
@@ -74,73 +92,33 @@ def dashboard():
 
     # Apply search filter
     if search_term:
-        base_query = base_query.filter(Task.title.ilike(f'%{search_term}%'))
-
-    # Pagination and ordering
-    paginated_tasks = base_query.order_by(
-        Task.priority.asc(),
-        Task.due_date.asc().nulls_last()
-    ).paginate(page=page, per_page=per_page, error_out=False)
-
-    # Only show 3 tasks in the preview section
-    dashboard_preview_tasks = Task.query.filter_by(user_id=current_user.id).order_by(
-        Task.priority.asc(),
-        Task.due_date.asc().nulls_last()
-    ).limit(3).all()
-
-    # Counts
-    tasks_all = Task.query.filter_by(user_id=current_user.id)
-    total_tasks = Task.query.filter_by(user_id=current_user.id).count()
-    completed_tasks = Task.query.filter_by(user_id=current_user.id, completed=True).count()
-    pending_tasks = Task.query.filter_by(user_id=current_user.id, completed=False).count()
-    overdue_tasks = Task.query.filter(
-        Task.user_id == current_user.id,
-        Task.completed == False,
-        Task.due_date != None,
-        Task.due_date < now
-    ).count()
+        base_query = search_tasks(base_query, title=search_term)
 
-    task_counts = {
-        'total': total_tasks,
-        'pending': pending_tasks,
-        'completed': completed_tasks,
-        'overdue': overdue_tasks
-    }
+    # Pagination and ordering (opt-in cursor paging skips OFFSET and COUNT)
+    if wants_keyset(request.args):
+        paginated_tasks = keyset_paginate(base_query, request.args.get('cursor'), per_page)
+    else:
+        paginated_tasks = base_query.order_by(*TASK_LIST_ORDER).paginate(
+            page=page, per_page=per_page, error_out=False)
+
+    # Only show 3 tasks in the preview section. The widget lists are loaded
+    # only if their {% cache %} block misses.
+    dashboard_preview_tasks = DeferredList(lambda: _mark_display_status(
+        Task.query.filter_by(user_id=current_user.id).order_by(*TASK_LIST_ORDER).limit(3).all(), now))
+
+    # Counts (single aggregate query)
+    counts = get_task_counts(current_user.id, now)
+    task_counts = counts.as_dict()
 
     # Recent tasks for the small table (always last 10)
-    recent_tasks = Task.query.filter_by(user_id=current_user.id).order_by(
-        Task.priority.asc(),
-        Task.due_date.asc().nulls_last()
-    ).limit(10).all()
-
-    # Mark task.status for display
-    tasks_for_status = paginated_tasks.items
-    for task in tasks_for_status:
-        if task.due_date and task.due_date < now and not task.completed:
-            task.status = "Late"
-        elif task.completed:
-            task.status = "Completed"
-        else:
-            task.status = "Pending"
-
-    # Recent activity (simplified)
-    class _SimpleActivity:
-        __slots__ = ("description", "timestamp")
-        def __init__(self, description, timestamp):
-            self.description = description
-            self.timestamp = timestamp
-
-    task_feed = Task.query.filter_by(user_id=current_user.id) \
-        .order_by(Task.updated_at.desc().nulls_last(), Task.created_at.desc().nulls_last()) \
-        .limit(10).all()
-
-    recent_activity = [
-        _SimpleActivity(
-            f"Task “{t.title}” — status: {t.status or ('Completed' if t.completed else 'Pending')}",
-            (t.updated_at or t.created_at or datetime.utcnow())
-        )
-        for t in task_feed
-    ]
+    recent_tasks = DeferredList(lambda: _mark_display_status(
+        Task.query.filter_by(user_id=current_user.id).order_by(*TASK_LIST_ORDER).limit(10).all(), now))
+
+    # Mark task.display_status for the badges
+    tasks_for_status = _mark_display_status(paginated_tasks.items, now)
+
+    # Recent activity from the audit trail (bounded, indexed)
+    recent_activity = get_recent_activity(current_user.id)
 
     # Select template based on profile
     profile_type = getattr(current_user, "profile_type", "general").lower()
@@ -154,23 +132,24 @@ def dashboard():
         dashboard_template = "dashboard_general.html"
 
     task_form = TaskForm()
-    
+    ctx = get_user_context()
+
     return render_template(
         dashboard_template,
         tasks=tasks_for_status,
         recent_tasks=recent_tasks,
         dashboard_preview_tasks=dashboard_preview_tasks,
         recent_activity=recent_activity,
-        onboarding=OnboardingPreferences.query.filter_by(user_id=current_user.id).first(),
+        onboarding=ctx.preferences,
         filter_status=filter_status,
         filter_priority=filter_priority,
         search_term=search_term,
         task_counts=task_counts,
         task_form=task_form,
         paginated_tasks=paginated_tasks,
-        features=current_user.dashboard_features or [],
+        features=ctx.features,
         now=now,
-        total_tasks=total_tasks
+        total_tasks=counts.total
     )
 
 
@@ -183,46 +162,30 @@ def dashboard_customized():
     - Shows paginated task table
     - Handles inline 'Add Task' form (TaskForm) POST
     - Computes task_counts, recent_tasks, paginated_tasks
-    - Builds features list from booleans + dashboard_features JSON
+    - Reads preferences and features from the request's user context
     """
     # --- Forms ---
     task_form = TaskForm()
 
-    # Import json locally so callers that only change this function don't need to modify top imports
-    import json
+    # User, preferences and features were loaded once for this request
+    ctx = get_user_context()
 
-    # --- Load user preferences safely ---
+    # --- Load user preferences ---
     preferences = {}
-    try:
-        # current_user.preferences is normally a relationship (OnboardingPreferences) object.
-        prefs_obj = getattr(current_user, 'preferences', None)
-        if prefs_obj:
-            # Map the OnboardingPreferences object into a dictionary of expected preference keys.
-            preferences = {
-                "focus_time": getattr(prefs_obj, 'focus_time', 25),
-                "break_time": getattr(prefs_obj, 'break_time', 5),
-                "long_break_time": getattr(prefs_obj, 'long_break_time', 15),
-                "session_goal": getattr(prefs_obj, 'session_goal', 4),
-                "notifications_enabled": bool(getattr(prefs_obj, 'notifications_enabled', True)),
-                "dark_mode_enabled": bool(getattr(prefs_obj, 'dark_mode_enabled', False)),
-                "theme_color": getattr(prefs_obj, 'theme_color', 'blue'),
-                "font_size": getattr(prefs_obj, 'font_size', 'medium'),
-                "sound_enabled": bool(getattr(prefs_obj, 'sound_enabled', True))
-            }
-        else:
-            # Fallback: If preferences were stored as JSON string on the user (legacy), attempt to parse.
-            raw_pref = getattr(current_user, 'preferences', None)
-            if isinstance(raw_pref, str) and raw_pref.strip():
-                try:
-                    parsed = json.loads(raw_pref)
-                    if isinstance(parsed, dict):
-                        preferences = parsed
-                except Exception:
-                    preferences = {}
-    except Exception as e:
-        # Keep behaviour robust: log and fall back to empty dict
-        current_app.logger.exception(f"Error loading preferences for user {getattr(current_user, 'id', 'unknown')}: {e}")
-        preferences = {}
+    prefs_obj = ctx.preferences
+    if prefs_obj:
+        # Map the OnboardingPreferences object into a dictionary of expected preference keys.
+        preferences = {
+            "focus_time": prefs_obj.focus_time,
+            "break_time": prefs_obj.break_time,
+            "long_break_time": prefs_obj.long_break_time,
+            "session_goal": prefs_obj.session_goal,
+            "notifications_enabled": bool(prefs_obj.notifications_enabled),
+            "dark_mode_enabled": bool(prefs_obj.dark_mode_enabled),
+            "theme_color": prefs_obj.theme_color,
+            "font_size": prefs_obj.font_size,
+            "sound_enabled": bool(prefs_obj.sound_enabled)
+        }
 
     # Default shallow preference map used by templates/UI when keys are missing
     default_preferences = {
@@ -247,12 +210,10 @@ def dashboard_customized():
         # compute due_date: treat date as PACIFIC end of day (23:59) and store UTC naive
         computed_due = None
         if getattr(task_form, 'due_date', None) and task_form.due_date.data:
-            local_due = datetime.combine(task_form.due_date.data, time(23, 59))
-            local_due = PACIFIC.localize(local_due)
-            computed_due = local_due.astimezone(pytz.UTC).replace(tzinfo=None)
+            computed_due = pacific_due_to_utc(task_form.due_date.data)
         else:
             # fallback: use onboarding focus time or default 25 minutes from now (pacific)
-            prefs = OnboardingPreferences.query.filter_by(user_id=current_user.id).first()
+            prefs = ctx.preferences
             focus_minutes = int(prefs.focus_time) if prefs and prefs.focus_time else 25
             now_local = datetime.now(PACIFIC)
             local_due = now_local + timedelta(minutes=focus_minutes)
@@ -269,7 +230,11 @@ def dashboard_customized():
                 user_id = current_user.id
             )
             db.session.add(new_task)
+            record_progress(current_user.id, created=1)
             db.session.commit()
+            invalidate_task_counts(current_user.id)
+            bump_fragment_version(current_user.id)
+            log_action(current_user.id, f"Created task: {new_task.title}, date: {computed_due}")
             flash("Task created", category='success')
             return redirect(url_for('main.dashboard_customized'))
         except Exception as e:
@@ -297,215 +262,30 @@ def dashboard_customized():
         base_query = base_query.filter_by(priority=int(filter_priority))
 
     if search_term:
-        # use ilike if supported; fallback to like in SQLite
-        try:
-            base_query = base_query.filter(Task.title.ilike(f'%{search_term}%'))
-        except Exception:
-            base_query = base_query.filter(Task.title.like(f'%{search_term}%'))
+        # full-text index when available, substring match otherwise
+        base_query = search_tasks(base_query, title=search_term)
 
-    # ordering: priority asc, then due_date ascending (nulls last)
-    try:
-        ordered_query = base_query.order_by(Task.priority.asc(), Task.due_date.asc().nulls_last())
-    except Exception:
-        # if `.nulls_last()` not available, just order by due_date asc
-        ordered_query = base_query.order_by(Task.priority.asc(), Task.due_date.asc())
+    # ordering: priority asc, then due_date ascending with undated tasks last (see TASK_LIST_ORDER)
+    ordered_query = base_query.order_by(*TASK_LIST_ORDER)
 
-    paginated_tasks = ordered_query.paginate(page=page, per_page=per_page, error_out=False)
+    if wants_keyset(request.args):
+        paginated_tasks = keyset_paginate(base_query, request.args.get('cursor'), per_page)
+    else:
+        paginated_tasks = ordered_query.paginate(page=page, per_page=per_page, error_out=False)
 
     # full list for some widgets (non-paginated)
     tasks_all = Task.query.filter_by(user_id=current_user.id).all()
 
-    # --- recent tasks and counts ---
-    recent_tasks = Task.query.filter_by(user_id=current_user.id).order_by(Task.created_at.desc()).limit(10).all()
-
-    total_tasks = Task.query.filter_by(user_id=current_user.id).count()
-    pending_tasks = Task.query.filter_by(user_id=current_user.id, completed=False).count()
-    completed_tasks = Task.query.filter_by(user_id=current_user.id, completed=True).count()
-    overdue_tasks = Task.query.filter(
-        Task.user_id == current_user.id,
-        Task.completed == False,
-        Task.due_date != None,
-        Task.due_date < datetime.utcnow()
-    ).count()
-
-    task_counts = {
-        'total': total_tasks,
-        'pending': pending_tasks,
-        'completed': completed_tasks,
-        'overdue': overdue_tasks
-    }
-
-    onboarding = OnboardingPreferences.query.filter_by(user_id=current_user.id).first()
-
-    # --- Build features list ---
-    features = set()
-    # If you store a JSON array in current_user.dashboard_features use it
-    try:
-        if current_user.dashboard_features:
-            # if it's stored as JSON list already, it should be usable; otherwise guard
-            if isinstance(current_user.dashboard_features, (list, tuple, set)):
-                features.update(current_user.dashboard_features)
-            else:
-                # if it's a JSON string, try to parse
-                try:
-                    parsed = json.loads(current_user.dashboard_features)
-                    if isinstance(parsed, (list, tuple, set)):
-                        features.update(parsed)
-                except Exception:
-                    # ignore parsing errors
-                    pass
-    except Exception:
-        pass
-
-    # Map boolean user flags to feature keys used by template
-    # NOTE: We add canonical keys (the ones templates/JS expect), and also add aliases where helpful.
-    try:
-        if getattr(current_user, 'feature_timer', False):
-            features.add('timer')
-            # legacy name -> add the more explicit name too
-            features.add('task_timer')
-    except Exception:
-        pass
-
-    try:
-        if getattr(current_user, 'feature_task_timer', False):
-            features.add('task_timer')
-            features.add('timer')
-    except Exception:
-        pass
-
-    try:
-        if getattr(current_user, 'feature_focus_mode', False):
-            features.add('focus_mode')
-    except Exception:
-        pass
-
-    try:
-        if getattr(current_user, 'feature_scroll_autostart', False):
-            features.add('scroll_autostart')
-    except Exception:
-        pass
-
-    try:
-        if getattr(current_user, 'feature_task_stats', False):
-            features.add('task_stats')
-    except Exception:
-        pass
-
-    try:
-        if getattr(current_user, 'feature_deadline_tracker', False):
-            features.add('deadline_tracker')
-    except Exception:
-        pass
-
-    try:
-        if getattr(current_user, 'feature_custom_colors', False):
-            features.add('custom_colors')
-    except Exception:
-        pass
-
-    try:
-        if getattr(current_user, 'feature_auto_reminders', False):
-            # registration stores this as feature_auto_reminders; templates check 'reminders'
-            features.add('auto_reminders')
-            features.add('reminders')
-    except Exception:
-        pass
-
-    try:
-        if getattr(current_user, 'feature_priority_sort', False):
-            features.add('priority_sort')
-    except Exception:
-        pass
-
-    try:
-        if getattr(current_user, 'feature_task_export', False):
-            features.add('task_export')
-    except Exception:
-        pass
-
-    try:
-        if getattr(current_user, 'feature_progress_graphs', False):
-            features.add('progress_graphs')
-            features.add('graphs')
-    except Exception:
-        pass
-
-    # Normalize any raw names that may have been stored by forms (e.g. "timer", "auto_reminders", etc.)
-    normalized = set()
-    for f in features:
-        if not isinstance(f, str):
-            continue
-        key = f.strip().lower()
-        # map common aliases to canonical keys used in templates/JS
-        if key in ('timer', 'task_timer'):
-            normalized.add('task_timer')
-            normalized.add('timer')
-        elif key in ('auto_reminders', 'auto-reminders', 'auto reminders', 'auto_reminder'):
-            normalized.add('reminders')
-            normalized.add('auto_reminders')
-        elif key in ('progress_graphs', 'progress-graphs', 'graphs', 'graph'):
-            normalized.add('progress_graphs')
-            normalized.add('graphs')
-        elif key in ('task_stats', 'stats'):
-            normalized.add('task_stats')
-        elif key in ('focus_mode', 'focusmode', 'focus'):
-            normalized.add('focus_mode')
-        elif key in ('scroll_autostart', 'scrollautostart', 'autoscroll'):
-            normalized.add('scroll_autostart')
-        elif key in ('custom_colors', 'colors'):
-            normalized.add('custom_colors')
-        elif key in ('task_export', 'export'):
-            normalized.add('task_export')
-        elif key in ('gamification', 'game'):
-            normalized.add('gamification')
-        elif key in ('tips', 'daily_tips'):
-            normalized.add('tips')
-        elif key in ('reminders',):
-            normalized.add('reminders')
-        else:
-            normalized.add(key)
-
-    # final features list (sorted for deterministic order in templates)
-    features = sorted(list(normalized))
-
-    # --- Map form-style feature keys (feature_*) to dashboard keys ---
-    feature_map = {
-        "feature_timer": "timer",
-        "feature_focus_mode": "focus_mode",
-        "feature_scroll_autostart": "scroll_autostart",
-        "feature_task_stats": "task_stats",
-        "feature_task_timer": "task_timer",
-        "feature_deadline_tracker": "deadline_tracker",
-        "feature_custom_colors": "custom_colors",
-        "feature_auto_reminders": "reminders",     # << maps to reminders card
-        "feature_priority_sort": "priority_sort",
-        "feature_task_export": "task_export",
-        "feature_progress_graphs": "graphs",       # << maps to graphs
-    }
-
-    features = set()
-
-    # Add toggles from current_user
-    for fkey, short in feature_map.items():
-        if getattr(current_user, fkey, False):
-            features.add(short)
-
-    # Merge any JSON-based stored features
-    if current_user.dashboard_features:
-        try:
-            parsed = json.loads(current_user.dashboard_features)
-            if isinstance(parsed, (list, tuple, set)):
-                features.update(parsed)
-        except Exception:
-            pass
+    # --- recent tasks and counts (lists load only if their {% cache %} block misses) ---
+    recent_tasks = DeferredList(
+        Task.query.filter_by(user_id=current_user.id).order_by(Task.created_at.desc()).limit(10).all
+    )
 
-    features = sorted(list(features))
+    task_counts = get_task_counts(current_user.id).as_dict()
 
-    dashboard_preview_tasks = Task.query.filter_by(user_id=current_user.id).order_by(
-        Task.priority.asc(),
-        Task.due_date.asc().nulls_last()
-    ).limit(3).all()
+    dashboard_preview_tasks = DeferredList(
+        Task.query.filter_by(user_id=current_user.id).order_by(*TASK_LIST_ORDER).limit(3).all
+    )
 
     # --- Render dashboard with preferences passed in ---
     return render_template(
@@ -519,8 +299,8 @@ def dashboard_customized():
         filter_priority=filter_priority,
         search_term=search_term,
         paginated_tasks=paginated_tasks,
-        onboarding=onboarding,
-        features=features,
+        onboarding=ctx.preferences,
+        features=ctx.features,
         preferences=preferences,
         task_form=task_form
     )
@@ -529,31 +309,98 @@ def dashboard_customized():
 
 @main.route('/dashboard/graphs')
 @login_required
+@read_only
 def dashboard_graphs():
-    completed = Task.query.filter_by(user_id=current_user.id, completed=True).count()
-    pending   = Task.query.filter_by(user_id=current_user.id, completed=False).count()
-    overdue   = Task.query.filter(
-        Task.user_id == current_user.id,
-        Task.completed == False,
-        Task.due_date != None,
-        Task.due_date < datetime.utcnow()
-    ).count()
+    counts = get_task_counts(current_user.id)
 
     task_stats = {
-        "completed": completed,
-        "pending": pending,
-        "overdue": overdue
+        "completed": counts.completed,
+        "pending": counts.pending,
+        "overdue": counts.overdue
     }
 
     return render_template("dashboard_graphs.html", task_stats=task_stats)
 
 
 
+@main.route('/dashboard/graphs/data')
+@login_required
+@read_only
+@conditional_on_tasks
+def dashboard_graphs_data():
+    """
+    Progress series as JSON: ?start=YYYY-MM-DD&end=YYYY-MM-DD&bucket=day|week
+    (defaults to the last 30 days, daily).
+    """
+    bucket = request.args.get('bucket', 'day')
+    try:
+        end = datetime.strptime(request.args['end'], '%Y-%m-%d').date() if request.args.get('end') \
+            else datetime.now(PACIFIC).date()
+        start = datetime.strptime(request.args['start'], '%Y-%m-%d').date() if request.args.get('start') \
+            else end - timedelta(days=29)
+    except ValueError:
+        return jsonify({'error': 'start and end must be YYYY-MM-DD dates'}), 400
+    if bucket not in PROGRESS_BUCKETS:
+        return jsonify({'error': f"bucket must be one of: {', '.join(PROGRESS_BUCKETS)}"}), 400
+    if start > end or (end - start).days >= MAX_SERIES_DAYS:
+        return jsonify({'error': f'Date range must be between 1 and {MAX_SERIES_DAYS} days'}), 400
+
+    return jsonify({
+        'start': start.isoformat(),
+        'end': end.isoformat(),
+        'bucket': bucket,
+        'series': progress_series(current_user.id, start, end, bucket)
+    })
+
+
+@main.route('/events')
+@login_required
+def task_events():
+    """
+    Server-Sent Events stream of the user's task changes ('task' deltas and
+    'counts'), used by dashboard_customized.html to patch the page in place.
+    """
+    hub = current_app.extensions['live_hub']
+    stream = event_stream(
+        hub, current_user.id,
+        heartbeat=current_app.config.get('LIVE_HEARTBEAT_SECONDS', 15),
+        max_age=current_app.config.get('LIVE_STREAM_MAX_SECONDS', 300)
+    )
+    return Response(stream, mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'  # stop nginx from buffering the stream
+    })
+
+
+@main.route('/activity')
+@login_required
+@read_only
+def activity_feed():
+    """
+    Recent activity as JSON. Pass ?since=<cursor> (the previous response's
+    `cursor`) to poll for new events. Polls repeat the last few seconds of
+    events (see get_activity_since), so skip event ids already shown.
+    """
+    since = request.args.get('since')
+    if since:
+        if not since.isdigit():
+            return jsonify({'error': 'since must be the cursor from a previous response'}), 400
+        since = int(since)
+    else:
+        since = None
+    events = get_activity_since(current_user.id, since)
+
+    return jsonify({
+        'events': [event.as_dict() for event in events],
+        'cursor': max([since or 0] + [event.id for event in events]) if events else since
+    })
+
+
 @main.route('/onboarding', methods=['GET', 'POST'])
 @login_required
 def onboarding():
     form = OnboardingForm()
-    existing = OnboardingPreferences.query.filter_by(user_id=current_user.id).first()
+    existing = get_user_context().preferences
     
     if form.validate_on_submit():
         if existing:
@@ -587,17 +434,13 @@ def onboarding():
 def create_task():
     form = TaskForm()
     if form.validate_on_submit():
-        prefs = OnboardingPreferences.query.filter_by(user_id=current_user.id).first()
+        prefs = get_user_context().preferences
 
         computed_due = None
 
         if form.due_date.data:
-            # Treat the input date as Pacific local date at 23:59
-            local_due = datetime.combine(form.due_date.data, time(23, 59))
-            local_due = PACIFIC.localize(local_due)
-
-            # Convert to UTC for storage in DB
-            computed_due = local_due.astimezone(pytz.UTC).replace(tzinfo=None)
+            # Treat the input date as Pacific local date at 23:59, stored as UTC
+            computed_due = pacific_due_to_utc(form.due_date.data)
         else:
             # No due date provided, use onboarding focus time if available
             now_local = datetime.now(PACIFIC)
@@ -609,15 +452,20 @@ def create_task():
         new_task = Task(
             title=form.title.data,
             description=form.description.data,
-            completed=(form.status.data == "completed"),
             due_date=computed_due,
             priority=int(form.priority.data),
             reminder_set=form.reminder_set.data,
             user_id=current_user.id
         )
+        new_task.set_completed(form.status.data == "completed")
 
         db.session.add(new_task)
+        record_progress(current_user.id, created=1)
+        if new_task.completed:
+            record_completion(current_user.id, new_task)
         db.session.commit()
+        invalidate_task_counts(current_user.id)
+        bump_fragment_version(current_user.id)
 
         flash("Task added successfully!", category='success')
         log_action(current_user.id, f"Created task: {new_task.title}, date: {computed_due}")
@@ -644,23 +492,29 @@ def edit_task(id):
 
     if form.validate_on_submit():
         old_title = task.title
+        was_completed = task.completed
+        completed_at, due_date = task.completed_at, task.due_date
+        old_status = task.workflow_status
         task.title = form.title.data
         task.description = form.description.data
-        task.completed = (form.status.data == "completed")
+        task.set_completed(form.status.data == "completed")
 
         if form.due_date.data:
-            # Treat the input date as Pacific local date at 23:59
-            local_due = datetime.combine(form.due_date.data, time(23, 59))
-            local_due = PACIFIC.localize(local_due)
-
-            # Convert to UTC for storage
-            task.due_date = local_due.astimezone(pytz.UTC).replace(tzinfo=None)
+            # Treat the input date as Pacific local date at 23:59, stored as UTC
+            task.due_date = pacific_due_to_utc(form.due_date.data)
 
         # Store priority as integer and update reminder
         task.priority = int(form.priority.data)
         task.reminder_set = form.reminder_set.data
 
+        if task.completed and not was_completed:
+            record_completion(current_user.id, task)
+        elif was_completed and not task.completed:
+            record_reopen(current_user.id, completed_at, due_date)
+        record_transition(task, old_status)
         db.session.commit()
+        invalidate_task_counts(current_user.id)
+        bump_fragment_version(current_user.id)
 
         flash("Task updated successfully!", category='success')
         log_action(current_user.id, f"Edited task from '{old_title}' to '{task.title}'")
@@ -674,6 +528,7 @@ def edit_task(id):
 @login_required
 def delete_task(id):
     task = Task.query.get_or_404(id)
+    task_id = task.id
 
     # make sure user owns the task
     if task.user_id != current_user.id:
@@ -682,7 +537,12 @@ def delete_task(id):
 
     try:
         db.session.delete(task)
+        record_progress(current_user.id)
         db.session.commit()
+        invalidate_task_counts(current_user.id)
+        bump_fragment_version(current_user.id)
+        log_action(current_user.id, f"Deleted task: {task.title}")
+        publish_task_change(current_user.id, 'deleted', task_ids=[task_id])
         flash("Task deleted successfully!", category='success')
     except Exception as e:
         db.session.rollback()
@@ -694,18 +554,51 @@ def delete_task(id):
 
 @main.route('/tasks/export')
 @login_required
+@read_only
+@conditional_on_tasks
 def export_tasks():
-    tasks = Task.query.filter_by(user_id=current_user.id).all()
-    task_data = [{
-        'title': t.title,
-        'description': t.description,
-        'completed': t.completed,
-        'due_date': t.due_date.strftime('%Y-%m-%d') if t.due_date else None,
-        'priority': t.priority,
-        'reminder_set': t.reminder_set
-    } for t in tasks]
-    log_action(current_user.id, "Exported tasks as JSON")
-    return jsonify({'tasks': task_data})
+    """
+    Stream the user's tasks without loading them all into memory.
+    Query params: format=json|ndjson|csv, fields=title,due_date,..., gzip=1
+    Repeat requests with If-None-Match get a 304 while the tasks are unchanged.
+    """
+    fmt = request.args.get('format', 'json').lower()
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({"error": f"Unsupported export format: {fmt}"}), 400
+    fields = parse_export_fields(request.args.get('fields'))
+    use_gzip = request.args.get('gzip') in ('1', 'true', 'yes')
+
+    body = stream_export(current_user.id, fmt, fields, gzip=use_gzip)
+    filename = f"tasks.{fmt}" + (".gz" if use_gzip else "")
+    mimetype = 'application/gzip' if use_gzip else EXPORT_FORMATS[fmt]
+
+    log_action(current_user.id, f"Exported tasks as {fmt.upper()}")
+    response = Response(stream_with_context(body), mimetype=mimetype)
+    if use_gzip or fmt != 'json':
+        response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+
+@main.route('/tasks/import', methods=['POST'])
+@login_required
+def import_tasks_upload():
+    """
+    Bulk import tasks from an uploaded CSV or NDJSON file (form field `file`).
+    Rows are validated like TaskForm; returns a JSON report of rejected rows.
+    """
+    upload = request.files.get('file')
+    if upload is None or upload.filename == '':
+        return jsonify({"error": "No file uploaded"}), 400
+
+    fmt = request.args.get('format') or guess_format(upload.filename)
+    if fmt not in IMPORT_FORMATS:
+        return jsonify({"error": f"Unsupported import format: {fmt}"}), 400
+
+    stream = io.TextIOWrapper(upload.stream, encoding='utf-8', newline='')
+    report = import_tasks(current_user.id, stream, fmt)
+    log_action(current_user.id, f"Imported {report['imported']} tasks ({report['failed']} rejected)")
+    return jsonify(report)
 
 
 
@@ -726,7 +619,9 @@ def profile():
             current_user.email = form.email.data
             current_user.username = form.username.data
             current_user.profile_type = form.profile_type.data
+            current_user.refresh_feature_mask()
             db.session.commit()
+            bump_fragment_version(current_user.id)  # profile type and features feed the dashboard widgets
             flash("Profile updated successfully.", category='success')
             log_action(current_user.id, f"Updated profile from username '{old_username}' to '{current_user.username}'")
             return redirect(url_for('main.profile'))
@@ -758,9 +653,19 @@ def toggle_task_completion(id):
     task = Task.query.get_or_404(id)
     if task.user_id != current_user.id:
         return jsonify({"error": "Unauthorized"}), 403
-    task.completed = not task.completed
+    old_status = task.workflow_status
+    completed_at = task.completed_at
+    task.set_completed(not task.completed)
+    if task.completed:
+        record_completion(current_user.id, task)
+    else:
+        record_reopen(current_user.id, completed_at, task.due_date)
+    record_transition(task, old_status)
     db.session.commit()
+    invalidate_task_counts(current_user.id)
+    bump_fragment_version(current_user.id)
     log_action(current_user.id, f"Toggled task completion for '{task.title}' to {task.completed}")
+    publish_task_change(current_user.id, 'updated', task)
     return jsonify({"success": True, "completed": task.completed})
 
 
@@ -773,25 +678,71 @@ def toggle_task_reminder(id):
         return jsonify({"error": "Unauthorized"}), 403
     task.reminder_set = not task.reminder_set
     db.session.commit()
+    bump_fragment_version(current_user.id)
     log_action(current_user.id, f"Toggled reminder for task '{task.title}' to {task.reminder_set}")
     return jsonify({"success": True, "reminder_set": task.reminder_set})
 
 
 
 # Bulk task operations
+# Keep each IN (...) list well under SQLite's bound-variable limit
+BULK_CHUNK_SIZE = 500
+
+
+def _requested_task_ids():
+    """Task ids from a form post (task_ids=1&task_ids=2) or a JSON body ({"task_ids": [1, 2]})."""
+    if request.is_json:
+        raw_ids = (request.get_json(silent=True) or {}).get('task_ids') or []
+    else:
+        raw_ids = request.form.getlist('task_ids')
+    task_ids = set()
+    for tid in raw_ids:
+        try:
+            task_ids.add(int(tid))
+        except (TypeError, ValueError):
+            continue
+    return sorted(task_ids)
+
+
+def _chunked(ids, size=BULK_CHUNK_SIZE):
+    for i in range(0, len(ids), size):
+        yield ids[i:i + size]
+
+
+def _wants_json():
+    return request.is_json or request.accept_mimetypes.best == 'application/json'
+
+
 @main.route('/tasks/bulk-complete', methods=['POST'])
 @login_required
 def bulk_complete():
-    task_ids = request.form.getlist('task_ids')
+    task_ids = _requested_task_ids()
     updated = 0
-    for tid in task_ids:
-        task = Task.query.get(tid)
-        if task and task.user_id == current_user.id and not task.completed:
-            task.completed = True
-            updated += 1
+    late = 0
+    now = datetime.utcnow()
+    # One ownership-checked UPDATE per chunk instead of a SELECT per id
+    for chunk in _chunked(task_ids):
+        pending = Task.query.filter(
+            Task.id.in_(chunk),
+            Task.user_id == current_user.id,
+            Task.completed == False
+        )
+        late += pending.filter(Task.due_date < now).count()
+        record_bulk_completion(current_user.id, chunk, now)
+        updated += pending.update(
+            {Task.completed: True, Task.completed_at: now, Task.remind_at: None},
+            synchronize_session=False
+        )
+    if updated:
+        record_progress(current_user.id, completed=updated, late=late)
     db.session.commit()
-    flash(f"Marked {updated} tasks as completed.", category='success')
+    invalidate_task_counts(current_user.id)
+    bump_fragment_version(current_user.id)
     log_action(current_user.id, f"Bulk marked {updated} tasks as completed")
+    publish_task_change(current_user.id, 'completed', task_ids=task_ids)
+    if _wants_json():
+        return jsonify({"success": True, "updated": updated})
+    flash(f"Marked {updated} tasks as completed.", category='success')
     return redirect(url_for('main.dashboard'))
 
 
@@ -799,21 +750,29 @@ def bulk_complete():
 @main.route('/tasks/bulk-delete', methods=['POST'])
 @login_required
 def bulk_delete():
-    task_ids = request.form.getlist('task_ids')
+    task_ids = _requested_task_ids()
     deleted = 0
-    for tid in task_ids:
-        task = Task.query.get(tid)
-        if task and task.user_id == current_user.id:
-            db.session.delete(task)
-            deleted += 1
+    for chunk in _chunked(task_ids):
+        deleted += Task.query.filter(
+            Task.id.in_(chunk),
+            Task.user_id == current_user.id
+        ).delete(synchronize_session=False)
+    if deleted:
+        record_progress(current_user.id)
     db.session.commit()
-    flash(f"Deleted {deleted} tasks.", category='info')
+    invalidate_task_counts(current_user.id)
+    bump_fragment_version(current_user.id)
     log_action(current_user.id, f"Bulk deleted {deleted} tasks")
+    publish_task_change(current_user.id, 'deleted', task_ids=task_ids)
+    if _wants_json():
+        return jsonify({"success": True, "deleted": deleted})
+    flash(f"Deleted {deleted} tasks.", category='info')
     return redirect(url_for('main.dashboard'))
 
 # Advanced search page with detailed filters
 @main.route('/tasks/search', methods=['GET', 'POST'])
 @login_required
+@read_only
 def task_search():
     title = request.args.get('title', '').strip()
     description = request.args.get('description', '').strip()
@@ -822,16 +781,15 @@ def task_search():
 
     query = Task.query.filter_by(user_id=current_user.id)
 
-    if title:
-        query = query.filter(Task.title.ilike(f'%{title}%'))
-    if description:
-        query = query.filter(Task.description.ilike(f'%{description}%'))
+    if title or description:
+        # ranked by relevance first when the full-text index is available
+        query = search_tasks(query, title=title, description=description, ranked=True)
     if completed in ['true', 'false']:
         query = query.filter_by(completed=(completed == 'true'))
     if priority in ['1', '2', '3']:
         query = query.filter_by(priority=int(priority))
 
-    results = query.order_by(Task.priority.asc(), Task.due_date.asc().nulls_last()).all()
+    results = query.order_by(*TASK_LIST_ORDER).all()
 
     return render_template('task_search.html', results=results)
 
@@ -839,6 +797,7 @@ def task_search():
 
 @main.route('/tasks')
 @login_required
+@read_only
 def all_tasks():
     """
     Route for 'Tasks' page, used in ADHD, Dyslexia, and general dashboards.
@@ -849,8 +808,8 @@ def all_tasks():
     - Supported filter values: 'all', 'pending', 'completed', 'overdue' (also accepts 'late' as alias).
     - Pagination via ?page=<n>.
     - Search via ?search=<term> and priority via ?priority=1|2|3.
-    - Sets task.status for each returned task to one of: 'completed', 'overdue', 'pending'
-      so your template (which checks task.status) will show correct badges.
+    - Sets task.display_status for each returned task to one of: 'completed', 'overdue', 'pending'
+      so your template (which checks task.display_status) will show correct badges.
     """
     # Pagination
     page = request.args.get('page', 1, type=int)
@@ -888,50 +847,38 @@ def all_tasks():
 
     # Apply search
     if search_term:
-        try:
-            query = query.filter(Task.title.ilike(f"%{search_term}%"))
-        except Exception:
-            # fallback for DBs that do not support ilike
-            query = query.filter(Task.title.like(f"%{search_term}%"))
+        query = search_tasks(query, title=search_term)
 
-    # Ordering (priority asc, due_date asc) with fallback if nulls_last not supported
-    try:
-        ordered_query = query.order_by(Task.priority.asc(), Task.due_date.asc().nulls_last())
-    except Exception:
-        ordered_query = query.order_by(Task.priority.asc(), Task.due_date.asc())
+    # Ordering (priority asc, due_date asc nulls last)
+    ordered_query = query.order_by(*TASK_LIST_ORDER)
 
-    # Paginate
-    paginated_tasks = ordered_query.paginate(page=page, per_page=per_page, error_out=False)
+    # Paginate (?paging=cursor opts into keyset paging without OFFSET/COUNT)
+    if wants_keyset(request.args):
+        paginated_tasks = keyset_paginate(query, request.args.get('cursor'), per_page)
+    else:
+        paginated_tasks = ordered_query.paginate(page=page, per_page=per_page, error_out=False)
     tasks = paginated_tasks.items
 
-    # Compute counts (use DB counts for accuracy)
-    total_count = Task.query.filter_by(user_id=current_user.id).count()
-    completed_count = Task.query.filter_by(user_id=current_user.id, completed=True).count()
-    pending_count = Task.query.filter_by(user_id=current_user.id, completed=False).count()
-    overdue_count = Task.query.filter(
-        Task.user_id == current_user.id,
-        Task.completed == False,
-        Task.due_date != None,
-        Task.due_date < datetime.utcnow()
-    ).count()
+    # Compute counts (one aggregate query for every bucket)
+    counts = get_task_counts(current_user.id)
 
     task_counts = {
-        'all': total_count,
-        'completed': completed_count,
-        'pending': pending_count,
-        'overdue': overdue_count
+        'all': counts.total,
+        'completed': counts.completed,
+        'pending': counts.pending,
+        'overdue': counts.overdue
     }
 
     # Normalize status for each returned task so template rendering is deterministic.
     now = datetime.utcnow()
     for t in tasks:
         if getattr(t, 'completed', False):
-            t.status = 'completed'
+            t.display_status = 'completed'
         elif getattr(t, 'due_date', None) and t.due_date < now:
             # Mark overdue tasks consistently as 'overdue' so your template badge logic works
-            t.status = 'overdue'
+            t.display_status = 'overdue'
         else:
-            t.status = 'pending'
+            t.display_status = 'pending'
 
     # Render with the variable names your template expects:
     #  - template uses `filter` in many places, so pass both `filter` and `filter_status` for compatibility
@@ -976,6 +923,7 @@ def upload_avatar():
         # Save relative path to DB (so templates can use it)
         current_user.avatar = f"uploads/avatars/{filename}"
         db.session.commit()
+        log_action(current_user.id, "Uploaded a new avatar")
 
         flash("Avatar uploaded successfully!", "success")
     return redirect(url_for("main.profile"))
@@ -989,10 +937,17 @@ def update_status(id):
     data = request.get_json()
     new_status = data.get('status')
     if new_status in ['not started', 'in progress', 'completed']:
+        old_status = task.workflow_status
         task.status = new_status
-        if new_status == 'completed':
-            task.completed = True
+        if new_status == 'completed' and not task.completed:
+            task.set_completed(True)
+            record_completion(task.user_id, task)
+        record_transition(task, old_status)
         db.session.commit()
+        invalidate_task_counts(task.user_id)
+        bump_fragment_version(task.user_id)
+        log_action(current_user.id, f"Changed status of '{task.title}' to {new_status}")
+        publish_task_change(task.user_id, 'updated', task)
         return jsonify({'success': True})
     return jsonify({'success': False}), 400
 
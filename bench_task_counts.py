@@ -0,0 +1,92 @@
+# bench_task_counts.py
+"""
+Time the dashboard task counts for one user with many tasks.
+
+    python bench_task_counts.py [--tasks 50000] [--calls 200]
+
+Runs against a throwaway SQLite file, or against BENCH_DATABASE_URL (e.g. a
+scratch PostgreSQL database; the benchmark user and tasks are deleted after).
+Compares the four separate COUNTs the dashboard used to run, a single
+SUM(CASE ...) aggregate, and compute_task_counts().
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+parser = argparse.ArgumentParser()
+parser.add_argument('--tasks', type=int, default=50000)
+parser.add_argument('--calls', type=int, default=200)
+parser.add_argument('--runs', type=int, default=5)
+args = parser.parse_args()
+
+os.environ['DATABASE_URL'] = os.environ.get('BENCH_DATABASE_URL') or \
+    f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.sqlite')}"
+os.environ.pop('DATABASE_REPLICA_URLS', None)
+os.environ['TEMPLATE_PRELOAD'] = '0'
+
+from sqlalchemy import and_, case, func
+from Neuronudge import create_app, db
+from Neuronudge.models import Task, User
+from Neuronudge.stats import compute_task_counts
+
+
+def separate_counts(user_id, now):
+    tasks = Task.query.filter_by(user_id=user_id)
+    return (
+        tasks.count(),
+        tasks.filter_by(completed=True).count(),
+        tasks.filter_by(completed=False).count(),
+        tasks.filter(Task.completed == False, Task.due_date != None, Task.due_date < now).count(),
+    )
+
+
+def sum_case(user_id, now):
+    is_overdue = and_(Task.completed == False, Task.due_date != None, Task.due_date < now)
+    return db.session.query(
+        func.count(Task.id),
+        func.sum(case((Task.completed == True, 1), else_=0)),
+        func.sum(case((Task.completed == False, 1), else_=0)),
+        func.sum(case((is_overdue, 1), else_=0))
+    ).filter(Task.user_id == user_id).one()
+
+
+def add_tasks(user_id, count):
+    # Half completed, due dates spread over 30 days around today
+    now = datetime.utcnow()
+    for start in range(0, count, 5000):
+        db.session.execute(Task.__table__.insert(), [{
+            'title': f'Task {i}', 'description': '', 'completed': i % 2 == 0, 'priority': 1 + i % 3,
+            'due_date': now + timedelta(days=i % 30 - 10), 'status': 'not started', 'reminder_set': False,
+            'user_id': user_id, 'created_at': now, 'updated_at': now,
+        } for i in range(start, min(start + 5000, count))])
+    db.session.commit()
+
+
+app = create_app()
+with app.app_context():
+    user = User(name='Benchmark', username='bench_task_counts', email='bench_task_counts@example.com')
+    user.set_password('unused')
+    db.session.add(user)
+    db.session.commit()
+    try:
+        add_tasks(user.id, args.tasks)
+        now = datetime.utcnow()
+        print(f"{db.engine.dialect.name}, {args.tasks} tasks, {args.calls} calls per run, best of {args.runs}")
+        for name, counts in (('4 x COUNT', separate_counts), ('SUM(CASE)', sum_case),
+                             ('compute_task_counts', compute_task_counts)):
+            counts(user.id, now)  # warm up
+            timings = []
+            for _ in range(args.runs):
+                started = time.perf_counter()
+                for _ in range(args.calls):
+                    counts(user.id, now)
+                timings.append((time.perf_counter() - started) / args.calls * 1000)
+            print(f"  {name:<20} {min(timings):6.2f} ms/call (median {sorted(timings)[len(timings) // 2]:.2f})")
+    finally:
+        db.session.rollback()
+        Task.query.filter_by(user_id=user.id).delete()
+        db.session.delete(user)
+        db.session.commit()
+app.extensions['audit'].stop()
@@ -0,0 +1,31 @@
+# gunicorn.conf.py (loaded by startup.sh)
+import os
+
+# /events streams stay open, so a worker has to hold many idle connections.
+# The gevent worker does that cheaply, but only while every blocking call
+# yields to its hub. psycopg2 is made cooperative below with psycogreen.
+# sqlite3 can't be: a slow query or a busy_timeout lock wait would stall
+# every greenlet in the worker, including streams, the audit writer and
+# other requests. So SQLite deployments run threaded workers, where each
+# open stream holds one of GUNICORN_THREADS.
+
+
+def _uses_only_postgresql():
+    urls = [os.environ.get('DATABASE_URL', 'sqlite:///db.sqlite')]
+    urls += [u for u in os.environ.get('DATABASE_REPLICA_URLS', '').split(',') if u.strip()]
+    return all(u.strip().split(':', 1)[0].split('+', 1)[0] in ('postgres', 'postgresql') for u in urls)
+
+
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS') or ('gevent' if _uses_only_postgresql() else 'gthread')
+if worker_class == 'gevent' and not _uses_only_postgresql():
+    raise RuntimeError("The gevent worker needs PostgreSQL; SQLite calls would block every greenlet in the worker")
+
+worker_connections = int(os.environ.get('GUNICORN_WORKER_CONNECTIONS', 1000))  # gevent
+threads = int(os.environ.get('GUNICORN_THREADS', 32))  # gthread
+
+
+def post_fork(server, worker):
+    if worker_class == 'gevent':
+        # Let psycopg2 wait on the gevent hub instead of blocking the worker
+        from psycogreen.gevent import patch_psycopg
+        patch_psycopg()
@@ -1,10 +1,8 @@
-from flask_migrate import MigrateCommand
 from flask.cli import FlaskGroup
-from Neuronudge import create_app, db
+from Neuronudge import create_app
 
-app = create_app()
-
-cli = FlaskGroup(app)
+# python manage.py <command> runs the app's CLI (db, import-tasks, ...) like `flask --app run:app`
+cli = FlaskGroup(create_app=create_app)
 
 if __name__ == "__main__":
     cli()
@@ -0,0 +1,38 @@
+"""Add NULL-free sort columns to Task and index the task list order
+
+Revision ID: 3d9f6b2e8c71
+Revises: 0a5c9e7d2f18
+Create Date: 2026-10-19 09:41:27.118630
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3d9f6b2e8c71'
+down_revision = '0a5c9e7d2f18'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Generated columns, STORED like the model declares them, except on SQLite:
+    # ALTER TABLE can only add VIRTUAL ones there (SQLite 3.31+). Added outside
+    # batch mode so SQLite does not copy the table.
+    persisted = None if op.get_bind().dialect.name == 'sqlite' else True
+    op.add_column('task', sa.Column('sort_priority', sa.Integer(),
+                                    sa.Computed('coalesce(priority, 99)', persisted=persisted)))
+    op.add_column('task', sa.Column('sort_due_date', sa.DateTime(),
+                                    sa.Computed("coalesce(due_date, '9999-12-31 23:59:59.999999')", persisted=persisted)))
+    with op.batch_alter_table('task', schema=None) as batch_op:
+        batch_op.drop_index('ix_task_user_priority_due')
+        batch_op.create_index('ix_task_user_priority_due', ['user_id', 'sort_priority', 'sort_due_date', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('task', schema=None) as batch_op:
+        batch_op.drop_index('ix_task_user_priority_due')
+        batch_op.create_index('ix_task_user_priority_due', ['user_id', 'priority', 'due_date'], unique=False)
+    op.drop_column('task', 'sort_due_date')
+    op.drop_column('task', 'sort_priority')
@@ -0,0 +1,113 @@
+"""Add feature_mask to User and backfill it
+
+Revision ID: 8f3b2d6c1a90
+Revises: 5c1e7a9d3b42
+Create Date: 2026-10-18 13:47:22.904115
+
+"""
+import json
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8f3b2d6c1a90'
+down_revision = '5c1e7a9d3b42'
+branch_labels = None
+depends_on = None
+
+# Frozen copy of Neuronudge.features as of this revision, so the backfill keeps
+# producing the same masks whatever happens to the app code later.
+FEATURES = [
+    'task_timer', 'focus_mode', 'scroll_autostart', 'task_stats', 'deadline_tracker', 'custom_colors',
+    'reminders', 'priority_sort', 'task_export', 'graphs', 'gamification', 'tips',
+]
+FEATURE_BITS = {name: 1 << i for i, name in enumerate(FEATURES)}
+FEATURE_ALIASES = {
+    'timer': 'task_timer',
+    'auto_reminders': 'reminders',
+    'auto-reminders': 'reminders',
+    'auto reminders': 'reminders',
+    'auto_reminder': 'reminders',
+    'progress_graphs': 'graphs',
+    'progress-graphs': 'graphs',
+    'graph': 'graphs',
+    'stats': 'task_stats',
+    'focusmode': 'focus_mode',
+    'focus': 'focus_mode',
+    'scrollautostart': 'scroll_autostart',
+    'autoscroll': 'scroll_autostart',
+    'colors': 'custom_colors',
+    'export': 'task_export',
+    'game': 'gamification',
+    'daily_tips': 'tips',
+}
+FEATURE_FLAGS = {
+    'feature_timer': 'task_timer',
+    'feature_task_timer': 'task_timer',
+    'feature_focus_mode': 'focus_mode',
+    'feature_scroll_autostart': 'scroll_autostart',
+    'feature_task_stats': 'task_stats',
+    'feature_deadline_tracker': 'deadline_tracker',
+    'feature_custom_colors': 'custom_colors',
+    'feature_auto_reminders': 'reminders',
+    'feature_priority_sort': 'priority_sort',
+    'feature_task_export': 'task_export',
+    'feature_progress_graphs': 'graphs',
+}
+
+
+def compute_feature_mask(row):
+    mask = 0
+    for flag, name in FEATURE_FLAGS.items():
+        if getattr(row, flag, False):
+            mask |= FEATURE_BITS[name]
+
+    stored = row.dashboard_features
+    if isinstance(stored, str):
+        try:
+            stored = json.loads(stored)
+        except ValueError:
+            stored = None
+    if isinstance(stored, (list, tuple, set)):
+        for raw in stored:
+            if isinstance(raw, str):
+                key = raw.strip().lower()
+                key = FEATURE_ALIASES.get(key, key)
+                mask |= FEATURE_BITS.get(key, 0)
+    return mask
+
+
+def upgrade():
+    # ### commands auto generated by Alembic - please adjust! ###
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('feature_mask', sa.Integer(), server_default='0', nullable=False))
+
+    # ### end Alembic commands ###
+
+    # Backfill from the existing feature_* flags and dashboard_features
+    conn = op.get_bind()
+    existing = {c['name'] for c in sa.inspect(conn).get_columns('user')}
+    flag_columns = [name for name in FEATURE_FLAGS if name in existing]
+    user_table = sa.table(
+        'user',
+        sa.column('id', sa.Integer),
+        sa.column('dashboard_features', sa.JSON),
+        sa.column('feature_mask', sa.Integer),
+        *[sa.column(name, sa.Boolean) for name in flag_columns]
+    )
+    rows = conn.execute(sa.select(user_table)).fetchall()
+    for row in rows:
+        conn.execute(
+            user_table.update().where(user_table.c.id == row.id)
+            .values(feature_mask=compute_feature_mask(row))
+        )
+
+
+def downgrade():
+    # ### commands auto generated by Alembic - please adjust! ###
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.drop_column('feature_mask')
+
+    # ### end Alembic commands ###
@@ -0,0 +1,40 @@
+"""Use JSONB for User.dashboard_features on PostgreSQL
+
+Revision ID: b7d41e0c9f27
+Revises: 8f3b2d6c1a90
+Create Date: 2026-10-18 15:02:51.337610
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7d41e0c9f27'
+down_revision = '8f3b2d6c1a90'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # SQLite has no JSONB; its JSON column is already what the model expects
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.alter_column('dashboard_features',
+               existing_type=sa.JSON(),
+               type_=postgresql.JSONB(),
+               existing_nullable=False,
+               postgresql_using='dashboard_features::jsonb')
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.alter_column('dashboard_features',
+               existing_type=postgresql.JSONB(),
+               type_=sa.JSON(),
+               existing_nullable=False,
+               postgresql_using='dashboard_features::json')
@@ -1,10 +1,8 @@
 import os
-from Neuronudge import create_app, db
-from flask_migrate import Migrate
+from Neuronudge import create_app
 
 # Create the Flask app using your factory pattern
-app = create_app()
-migrate = Migrate(app, db)
+app = create_app()  # also sets up Flask-Migrate (`flask db ...`)
 
 
 if __name__ == "__main__":
@@ -8,5 +8,10 @@ elif [ -d "venv" ]; then
     source venv/bin/activate
 fi
 
-# Start Gunicorn with binding to all interfaces and increased timeout
-exec gunicorn --bind=0.0.0.0 --timeout 600 run:app
+# Minify, fingerprint and precompress static bundles (see Neuronudge/assets.py)
+flask --app run:app build-assets
+
+# Start Gunicorn with binding to all interfaces and increased timeout.
+# gunicorn.conf.py picks the worker: gevent on PostgreSQL (one cheap greenlet
+# per open /events stream), threads on SQLite, whose calls would block gevent
+exec gunicorn --bind=0.0.0.0 --timeout 600 --config gunicorn.conf.py run:app
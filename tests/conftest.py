@@ -0,0 +1,106 @@
+# tests/conftest.py
+"""
+Shared fixtures. Tests run against a throwaway SQLite file, or against the
+database in TEST_DATABASE_URL (e.g. a local PostgreSQL created just for the
+run: its tables are dropped afterwards).
+"""
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+import os
+import threading
+import pytest
+from sqlalchemy import event
+
+TEST_DATABASE_URL = os.environ.get('TEST_DATABASE_URL')
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    monkeypatch.setenv('DATABASE_URL', TEST_DATABASE_URL or f"sqlite:///{tmp_path / 'test.sqlite'}")
+    monkeypatch.delenv('DATABASE_REPLICA_URLS', raising=False)
+    monkeypatch.setenv('TEMPLATE_BYTECODE_CACHE_DIR', '')
+    monkeypatch.setenv('TEMPLATE_PRELOAD', '0')
+    from Neuronudge import create_app, db
+    app = create_app()
+    app.config.update(TESTING=True, WTF_CSRF_ENABLED=False)
+    yield app
+    app.extensions['audit'].stop()
+    with app.app_context():
+        db.session.remove()
+        if TEST_DATABASE_URL:
+            db.drop_all(bind_key=None)
+            with db.engine.begin() as conn:
+                conn.exec_driver_sql('DROP TABLE IF EXISTS alembic_version')
+        db.engine.dispose()
+
+
+@pytest.fixture
+def db(app):
+    from Neuronudge import db
+    with app.app_context():
+        yield db
+
+
+@pytest.fixture
+def user_id(db):
+    from Neuronudge.models import User
+    user = User(name='Test User', username='tester', email='tester@example.com', profile_type='general')
+    user.set_password('password123')
+    db.session.add(user)
+    db.session.commit()
+    return user.id
+
+
+@pytest.fixture
+def client(app, user_id):
+    """A test client logged in as user_id."""
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['_user_id'] = str(user_id)
+        session['_fresh'] = True
+    return client
+
+
+def add_tasks(db, user_id, count, **values):
+    """Bulk insert `count` tasks (set-based, like the importer). Returns their ids."""
+    from Neuronudge.models import Task
+    now = datetime.utcnow()
+    rows = [{
+        'title': f'Task {i}',
+        'description': '',
+        'completed': False,
+        'priority': 1 + i % 3,
+        'due_date': now + timedelta(days=i % 30 - 10),
+        'status': 'not started',
+        'reminder_set': False,
+        'user_id': user_id,
+        'created_at': now,
+        'updated_at': now,
+        **values,
+    } for i in range(count)]
+    db.session.execute(Task.__table__.insert(), rows)
+    db.session.commit()
+    return db.session.execute(
+        db.select(Task.id).where(Task.user_id == user_id).order_by(Task.id)
+    ).scalars().all()
+
+
+@contextmanager
+def count_queries(engine):
+    """Collect the SQL statements this thread sends (the audit writer thread is ignored)."""
+    statements = []
+    thread = threading.get_ident()
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if threading.get_ident() == thread:
+            statements.append(statement)
+
+    event.listen(engine, 'before_cursor_execute', record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, 'before_cursor_execute', record)
+
+
+def is_sqlite(db):
+    return db.engine.dialect.name == 'sqlite'
@@ -0,0 +1,71 @@
+# tests/test_activity.py
+"""Polling /activity?since=<cursor> must return every event once, whichever worker wrote it and when."""
+from datetime import datetime, timedelta
+import pytest
+from Neuronudge.activity import get_activity_since, get_recent_activity
+from Neuronudge.models import ActivityLog
+
+
+def store(db, user_id, action, timestamp=None, id=None):
+    """Write an event straight to ActivityLog, as another worker's audit writer would."""
+    row = ActivityLog(id=id, user_id=user_id, action=action, timestamp=timestamp or datetime.utcnow())
+    db.session.add(row)
+    db.session.commit()
+    return row.id
+
+
+def poll(client, since=None):
+    response = client.get('/activity' if since is None else f'/activity?since={since}')
+    assert response.status_code == 200
+    body = response.get_json()
+    return [event['action'] for event in body['events']], body['cursor']
+
+
+def test_events_from_other_workers_are_not_skipped(client, db, user_id):
+    store(db, user_id, 'first')
+    assert [e.action for e in get_recent_activity(user_id)] == ['first']  # this worker's buffer is now seeded
+    actions, cursor = poll(client)
+    assert actions == ['first']
+
+    # Written elsewhere, so this worker's buffer never hears of it
+    store(db, user_id, 'second')
+    actions, cursor = poll(client, cursor)
+    assert actions[-1] == 'second'
+    # Recent events are sent again; the cursor does not move back
+    assert poll(client, cursor)[1] == cursor
+
+
+def test_a_lower_id_committed_late_is_still_delivered(db, user_id):
+    store(db, user_id, 'first', id=10)
+    cursor = store(db, user_id, 'took id 12, committed first', id=12)
+    assert [e.id for e in get_activity_since(user_id, 10)] == [10, 12]
+
+    # Another worker's batch that took id 11 earlier commits only now
+    store(db, user_id, 'took id 11, committed last', id=11)
+    assert 11 in [e.id for e in get_activity_since(user_id, cursor)]
+
+
+def test_events_older_than_the_lag_are_not_resent(app, db, user_id):
+    old = datetime.utcnow() - timedelta(seconds=app.config['ACTIVITY_POLL_LAG_SECONDS'] + 5)
+    cursor = store(db, user_id, 'old', old)
+    assert get_activity_since(user_id, cursor) == []
+
+
+def test_late_flushed_events_are_not_skipped(db, user_id):
+    now = datetime.utcnow()
+    cursor = store(db, user_id, 'newer', now)
+    # Recorded before `newer` but stored after it, like a batch the audit writer flushed late
+    store(db, user_id, 'older', now - timedelta(seconds=5))
+    assert 'older' in [e.action for e in get_activity_since(user_id, cursor)]
+
+
+def test_first_page_is_the_latest_events_oldest_first(db, user_id):
+    for i in range(15):
+        store(db, user_id, f'event {i}')
+    events = get_activity_since(user_id)
+    assert [e.action for e in events] == [f'event {i}' for i in range(5, 15)]
+
+
+@pytest.mark.parametrize('since', ['2026-10-18T12:00:00', '-1', 'abc'])
+def test_malformed_cursor_is_rejected(client, since):
+    assert client.get(f'/activity?since={since}').status_code == 400
@@ -0,0 +1,47 @@
+# tests/test_assets.py
+import sys
+import pytest
+from Neuronudge.assets import _minify_css, _minify_js
+
+
+@pytest.fixture
+def no_rcssmin(monkeypatch):
+    """Make `import rcssmin` fail so the built-in fallback runs."""
+    monkeypatch.setitem(sys.modules, 'rcssmin', None)
+
+
+@pytest.fixture
+def no_rjsmin(monkeypatch):
+    monkeypatch.setitem(sys.modules, 'rjsmin', None)
+
+
+def test_fallback_keeps_descendant_pseudo_class_selectors(no_rcssmin):
+    assert _minify_css("nav a :hover { color : red ; }") == "nav a :hover{color :red;}"
+    assert _minify_css("nav a:hover { color: red; }") == "nav a:hover{color:red;}"
+
+
+def test_fallback_leaves_strings_alone(no_rcssmin):
+    css = """/* it's a comment */ a[title="x /* y */"] > b { content: "a  :  b" ; font-family: 'A  B' }"""
+    assert _minify_css(css) == """a[title="x /* y */"]>b{content:"a  :  b";font-family:'A  B'}"""
+
+
+def test_fallback_squeezes_rules(no_rcssmin):
+    css = """
+    @media (min-width: 600px) {
+        .card   .title ,
+        .card > p {
+            margin : 0   auto;
+        }
+    }
+    """
+    assert _minify_css(css) == "@media (min-width:600px){.card .title,.card>p{margin :0 auto;}}"
+
+
+def test_js_fallback_keeps_template_literals(no_rjsmin):
+    js = """const row = `
+    <li>
+        // not a comment
+    </li>`;
+    const url = 'http://example.com';  // trailing
+"""
+    assert _minify_js(js) == js
@@ -0,0 +1,83 @@
+# tests/test_audit.py
+import threading
+import time
+import pytest
+from Neuronudge import audit
+from Neuronudge.audit import AuditPipeline, init_audit
+from Neuronudge.models import ActivityLog
+
+
+@pytest.fixture
+def batches(monkeypatch):
+    """Sizes of the batches the writer thread hands to _write, in order."""
+    sizes = []
+    write = AuditPipeline._write
+
+    def spy(self, batch):
+        sizes.append(len(batch))
+        write(self, batch)
+    monkeypatch.setattr(AuditPipeline, '_write', spy)
+    return sizes
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_events_are_written_in_batches(app, db, user_id, batches):
+    pipeline = AuditPipeline(app, batch_size=3, flush_interval=60)
+    for i in range(7):
+        pipeline.record(user_id, f'action {i}')
+    wait_for(lambda: pipeline.stats()['written'] == 6)
+    assert batches == [3, 3]
+
+    # The last, partial batch waits for the interval or for stop()
+    pipeline.stop()
+    assert batches == [3, 3, 1]
+    assert pipeline.stats() == {'enqueued': 7, 'written': 7, 'dropped': 0, 'failed': 0, 'pending': 0}
+    assert sorted(a.action for a in ActivityLog.query.filter_by(user_id=user_id)) == [f'action {i}' for i in range(7)]
+
+
+def test_partial_batches_are_flushed_on_the_interval(app, db, user_id, batches):
+    pipeline = AuditPipeline(app, batch_size=100, flush_interval=0.05)
+    pipeline.record(user_id, 'only one')
+    wait_for(lambda: pipeline.stats()['written'] == 1)
+    assert batches == [1]
+    pipeline.stop()
+
+
+def test_stop_flushes_what_is_queued(app, db, user_id):
+    pipeline = AuditPipeline(app, batch_size=100, flush_interval=60)
+    for i in range(5):
+        pipeline.record(user_id, f'action {i}')
+    pipeline.stop()
+    assert ActivityLog.query.filter_by(user_id=user_id).count() == 5
+    assert not pipeline._thread.is_alive()
+
+
+def test_pipeline_is_stopped_at_exit(app, monkeypatch):
+    registered = []
+    monkeypatch.setattr(audit.atexit, 'register', registered.append)
+    pipeline = init_audit(app)
+    assert registered == [pipeline.stop]
+
+
+def test_a_full_queue_drops_and_counts_events(app, monkeypatch):
+    pipeline = AuditPipeline(app, max_queue=100)
+    monkeypatch.setattr(pipeline, '_ensure_started', lambda: None)  # nothing drains the queue
+
+    def record_many():
+        for i in range(1000):
+            pipeline.record(1, 'action')
+    threads = [threading.Thread(target=record_many) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats = pipeline.stats()
+    assert stats['enqueued'] == stats['pending'] == 100
+    assert stats['dropped'] == 8 * 1000 - 100
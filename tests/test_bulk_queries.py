@@ -0,0 +1,80 @@
+# tests/test_bulk_queries.py
+"""Bulk and status endpoints must issue a fixed number of statements, however many tasks they touch."""
+import pytest
+from Neuronudge.models import Task, TaskTransition
+from conftest import add_tasks, count_queries
+
+
+def post_and_count(client, db, url, **kwargs):
+    with count_queries(db.engine) as statements:
+        response = client.post(url, headers={'Accept': 'application/json'}, **kwargs)
+    assert response.status_code == 200, response.get_data(as_text=True)
+    return response.get_json(), statements
+
+
+@pytest.mark.parametrize('url, key', [('/tasks/bulk-complete', 'updated'), ('/tasks/bulk-delete', 'deleted')])
+def test_bulk_endpoints_do_not_query_per_task(client, db, user_id, url, key):
+    ids = add_tasks(db, user_id, 60)
+    post_and_count(client, db, url, json={'task_ids': ids[:1]})  # the first request also loads the user
+    few, few_statements = post_and_count(client, db, url, json={'task_ids': ids[1:4]})
+    many, many_statements = post_and_count(client, db, url, json={'task_ids': ids[4:]})
+
+    assert few[key] == 3
+    assert many[key] == 56
+    assert len(many_statements) == len(few_statements)
+
+
+def test_bulk_complete_records_transitions_set_based(client, db, user_id):
+    ids = add_tasks(db, user_id, 20)
+    _, statements = post_and_count(client, db, '/tasks/bulk-complete', json={'task_ids': ids})
+    assert sum(s.startswith('INSERT INTO task_transition') for s in statements) == 1
+    assert TaskTransition.query.filter_by(user_id=user_id, to_status='completed').count() == 20
+    assert Task.query.filter_by(user_id=user_id, completed=False).count() == 0
+
+
+def test_bulk_endpoints_skip_other_users_tasks(client, db, user_id):
+    from Neuronudge.models import User
+    other = User(username='other', email='other@example.com', password_hash='x')
+    db.session.add(other)
+    db.session.commit()
+    theirs = add_tasks(db, other.id, 3)
+
+    result, _ = post_and_count(client, db, '/tasks/bulk-delete', json={'task_ids': theirs})
+    assert result['deleted'] == 0
+    assert Task.query.filter_by(user_id=other.id).count() == 3
+
+
+def test_status_update_query_count_is_fixed(client, db, user_id):
+    ids = add_tasks(db, user_id, 50)
+    counts = []
+    for task_id in ids[:3]:
+        _, statements = post_and_count(client, db, f'/task/update_status/{task_id}', json={'status': 'in progress'})
+        counts.append(len(statements))
+    # Load the task, update it, insert the transition, reload it, plus the logged-in user
+    assert counts[1] == counts[2] <= 5, counts
+
+
+def test_large_id_lists_are_chunked(client, db, user_id):
+    from Neuronudge.views import BULK_CHUNK_SIZE
+    ids = add_tasks(db, user_id, BULK_CHUNK_SIZE * 2 + 10)
+    result, statements = post_and_count(client, db, '/tasks/bulk-complete', json={'task_ids': ids})
+    assert result['updated'] == len(ids)
+    assert sum(s.startswith('UPDATE task') for s in statements) == 3
+
+
+def test_bulk_complete_counts_only_tasks_it_changed(client, db, user_id):
+    ids = add_tasks(db, user_id, 4)
+    post_and_count(client, db, '/tasks/bulk-complete', json={'task_ids': ids[:2]})
+    # Already completed, repeated, unknown and malformed ids are not counted
+    body = {'task_ids': ids + [ids[3], 999999, 'abc', None]}
+    result, _ = post_and_count(client, db, '/tasks/bulk-complete', json=body)
+    assert result['updated'] == 2
+
+
+def test_form_posts_redirect_with_the_count(client, db, user_id):
+    ids = add_tasks(db, user_id, 3)
+    response = client.post('/tasks/bulk-delete', data={'task_ids': [str(i) for i in ids[:2]]})
+    assert response.status_code == 302
+    with client.session_transaction() as session:
+        assert ('info', 'Deleted 2 tasks.') in session['_flashes']
+    assert Task.query.filter_by(user_id=user_id).count() == 1
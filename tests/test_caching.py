@@ -0,0 +1,102 @@
+# tests/test_caching.py
+import os
+import pytest
+from flask import url_for
+from Neuronudge.caching import STATIC_IMMUTABLE, static_fingerprint
+from conftest import add_tasks
+
+GRAPHS = '/dashboard/graphs/data'
+
+
+def test_repeat_request_with_the_etag_is_not_modified(client, db, user_id):
+    add_tasks(db, user_id, 3)
+    first = client.get(GRAPHS)
+    assert first.status_code == 200 and first.headers['ETag']
+
+    again = client.get(GRAPHS, headers={'If-None-Match': first.headers['ETag']})
+    assert again.status_code == 304
+    assert again.data == b''
+    assert again.headers['ETag'] == first.headers['ETag']
+    # The compression middleware hands out weak ETags; those match too
+    weak = client.get(GRAPHS, headers={'If-None-Match': 'W/' + first.headers['ETag']})
+    assert weak.status_code == 304
+
+
+def etag(client, url=GRAPHS):
+    response = client.get(url)
+    assert response.status_code == 200
+    return response.headers['ETag']
+
+
+def test_a_task_write_changes_the_etag(client, db, user_id):
+    task_id = add_tasks(db, user_id, 3)[0]
+    before = etag(client)
+    assert client.post(f'/tasks/complete/{task_id}').status_code == 200
+    after = etag(client)
+    assert after != before
+    assert client.get(GRAPHS, headers={'If-None-Match': before}).status_code == 200
+
+
+def test_the_query_string_changes_the_etag(client, db, user_id):
+    add_tasks(db, user_id, 3)
+    assert etag(client, GRAPHS) != etag(client, GRAPHS + '?bucket=week')
+    assert etag(client, '/tasks/export?format=csv') != etag(client, '/tasks/export?format=json')
+
+
+def test_another_user_gets_a_different_etag(app, client, db, user_id):
+    from Neuronudge.models import User
+    other = User(username='other', email='other@example.com', password_hash='x')
+    db.session.add(other)
+    db.session.commit()
+    add_tasks(db, user_id, 3)
+    add_tasks(db, other.id, 3)
+
+    other_client = app.test_client()
+    with other_client.session_transaction() as session:
+        session['_user_id'] = str(other.id)
+        session['_fresh'] = True
+    mine = etag(client)
+    # A context of its own, so the login memoized on g by the first client is not reused
+    with app.app_context():
+        assert etag(other_client) != mine
+        assert other_client.get(GRAPHS, headers={'If-None-Match': mine}).status_code == 200
+
+
+@pytest.fixture
+def static_file(app, tmp_path):
+    app.static_folder = str(tmp_path)
+    path = tmp_path / 'probe.js'
+    path.write_text('console.log(1);')
+    return path
+
+
+def rewrite(path, text):
+    # A later mtime than the first write, however coarse the filesystem clock
+    stat = path.stat()
+    path.write_text(text)
+    os.utime(path, (stat.st_atime, stat.st_mtime + 10))
+
+
+def test_fingerprinted_url_changes_with_the_file(app, static_file):
+    app.debug = True
+    with app.test_request_context():
+        first = url_for('static', filename='probe.js')
+        assert first == url_for('static', filename='probe.js')
+        rewrite(static_file, 'console.log(2);')
+        second = url_for('static', filename='probe.js')
+    assert first.startswith('/static/probe.js?v=') and second.startswith('/static/probe.js?v=')
+    assert first != second
+
+
+def test_fingerprint_is_not_rechecked_outside_debug(app, static_file, monkeypatch):
+    with app.test_request_context():
+        first = static_fingerprint('probe.js')
+        monkeypatch.setattr(os, 'stat', None)  # any stat() call would now fail
+        assert static_fingerprint('probe.js') == first
+
+
+def test_fingerprinted_static_files_are_immutable(app, client, static_file):
+    with app.test_request_context():
+        url = url_for('static', filename='probe.js')
+    assert client.get(url).headers['Cache-Control'] == STATIC_IMMUTABLE
+    assert client.get('/static/probe.js?v=stale').headers['Cache-Control'] == 'public, no-cache'
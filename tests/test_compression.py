@@ -0,0 +1,120 @@
+# tests/test_compression.py
+import gzip
+import zlib
+import pytest
+from werkzeug.test import Client, create_environ
+from Neuronudge.compression import CompressionMiddleware
+
+BODY = b'<p>' + b'Water the plants. ' * 100 + b'</p>'
+
+
+def wsgi_app(body=BODY, content_type='text/html; charset=utf-8', **extra_headers):
+    def app(environ, start_response):
+        headers = [('Content-Type', content_type), ('Content-Length', str(len(body)))]
+        headers += [(name.replace('_', '-'), value) for name, value in extra_headers.items()]
+        start_response('200 OK', headers)
+        return [body]
+    return app
+
+
+def get(app, accept_encoding='gzip', **kwargs):
+    client = Client(CompressionMiddleware(app, **kwargs))
+    return client.get('/', headers={'Accept-Encoding': accept_encoding} if accept_encoding else {})
+
+
+@pytest.mark.parametrize('accept_encoding, compressed', [
+    ('gzip', True),
+    ('br;q=1.0, gzip;q=0.5', True),
+    ('gzip;q=0', False),
+    ('br', False),
+    (None, False),
+])
+def test_accept_encoding_negotiation(accept_encoding, compressed):
+    response = get(wsgi_app(), accept_encoding)
+    assert response.headers.get('Content-Encoding') == ('gzip' if compressed else None)
+    assert (gzip.decompress(response.data) if compressed else response.data) == BODY
+    # Either way the body depends on Accept-Encoding
+    assert response.headers['Vary'] == 'Accept-Encoding'
+
+
+def test_vary_is_added_to_existing_fields():
+    response = get(wsgi_app(Vary='Cookie'))
+    assert response.headers['Vary'] == 'Cookie, Accept-Encoding'
+
+
+def test_small_bodies_are_sent_as_is():
+    response = get(wsgi_app(b'<p>short</p>'), min_size=500)
+    assert 'Content-Encoding' not in response.headers
+    assert response.data == b'<p>short</p>'
+
+
+def test_no_transform_is_respected():
+    response = get(wsgi_app(Cache_Control='private, no-transform'))
+    assert 'Content-Encoding' not in response.headers
+    assert response.data == BODY
+
+
+@pytest.mark.parametrize('content_type', ['text/event-stream', 'image/png'])
+def test_other_types_pass_through(content_type):
+    response = get(wsgi_app(content_type=content_type))
+    assert 'Content-Encoding' not in response.headers
+    assert 'Vary' not in response.headers
+    assert response.data == BODY
+
+
+def test_strong_etags_are_weakened():
+    response = get(wsgi_app(ETag='"abc123"'))
+    assert response.headers['ETag'] == 'W/"abc123"'
+    assert get(wsgi_app(ETag='W/"abc123"')).headers['ETag'] == 'W/"abc123"'
+    assert get(wsgi_app(ETag='"abc123"'), accept_encoding=None).headers['ETag'] == '"abc123"'
+
+
+def streaming_app(chunks, pulled):
+    """A streamed body with no Content-Length; `pulled` counts the chunks taken from it."""
+    def app(environ, start_response):
+        start_response('200 OK', [('Content-Type', 'text/csv')])
+        for chunk in chunks:
+            pulled.append(chunk)
+            yield chunk
+    return app
+
+
+def test_streamed_bodies_are_read_ahead_only_to_min_size():
+    chunks = [b'%03d,' % i * 25 for i in range(10)]  # 100 bytes each
+    pulled = []
+    started = []
+    middleware = CompressionMiddleware(streaming_app(chunks, pulled), min_size=250, flush_size=250)
+    body = middleware(
+        create_environ('/', headers={'Accept-Encoding': 'gzip'}),
+        lambda status, headers, exc_info=None: started.append(dict(headers))
+    )
+
+    # Sync-flushed once flush_size bytes are in, so what arrived so far decodes on its own
+    decoder = zlib.decompressobj(31)
+    received = decoder.decompress(next(body))
+    assert len(pulled) == 3
+    assert started[0]['Content-Encoding'] == 'gzip' and 'Content-Length' not in started[0]
+    while len(received) < 300:
+        received += decoder.decompress(next(body))
+    assert received == b''.join(chunks[:3])
+    assert len(pulled) == 3
+
+    rest = b''.join(body)
+    assert decoder.decompress(rest) == b''.join(chunks[3:])
+    assert decoder.eof
+
+
+def test_short_streamed_bodies_get_a_content_length():
+    pulled = []
+    response = Client(CompressionMiddleware(streaming_app([b'a,b\n', b'1,2\n'], pulled), min_size=500)).get(
+        '/', headers={'Accept-Encoding': 'gzip'}
+    )
+    assert 'Content-Encoding' not in response.headers
+    assert response.headers['Content-Length'] == '8'
+    assert response.data == b'a,b\n1,2\n'
+
+
+def test_pages_are_compressed_in_the_app(client, db, user_id):
+    response = client.get('/tasks', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert b'</html>' in gzip.decompress(response.data)
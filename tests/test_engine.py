@@ -0,0 +1,82 @@
+# tests/test_engine.py
+import multiprocessing
+import pytest
+from sqlalchemy import create_engine, exc, text
+from Neuronudge.engine import engine_options, install_sqlite_pragmas
+from conftest import is_sqlite
+
+WORKERS = 6
+WRITES_PER_WORKER = 100
+
+
+def write_tasks(url, user_id, tuned):
+    """
+    One gunicorn-style worker: its own engine, many short write transactions,
+    each reading the table as well. Returns how many failed with a lock error.
+    """
+    if tuned:
+        engine = create_engine(url, **engine_options(url))
+        install_sqlite_pragmas(engine)
+    else:
+        engine = create_engine(url, connect_args={'timeout': 0})
+    locked = 0
+    for i in range(WRITES_PER_WORKER):
+        try:
+            with engine.begin() as conn:
+                conn.execute(text("SELECT count(*) FROM task WHERE user_id = :user_id"), {'user_id': user_id})
+                conn.execute(text(
+                    "INSERT INTO task (title, description, completed, priority, status, reminder_set, user_id) "
+                    "VALUES (:title, '', 0, 2, 'not started', 0, :user_id)"
+                ), {'title': f'Task {i}', 'user_id': user_id})
+        except exc.OperationalError as e:
+            if 'locked' not in str(e):
+                raise
+            locked += 1
+    engine.dispose()
+    return locked
+
+
+@pytest.fixture(scope='module')
+def workers():
+    # Separate processes, like gunicorn workers; spawned since the app runs threads
+    with multiprocessing.get_context('spawn').Pool(WORKERS) as pool:
+        yield pool
+
+
+def run_workers(pool, url, user_id, tuned):
+    return sum(pool.starmap(write_tasks, [(url, user_id, tuned)] * WORKERS))
+
+
+def test_concurrent_writers_do_not_hit_lock_errors(db, user_id, workers):
+    if not is_sqlite(db):
+        pytest.skip("SQLite locking only")
+    url = db.engine.url.render_as_string(hide_password=False)
+    db.session.remove()
+
+    # Without the busy timeout the same load fails with 'database is locked'
+    assert run_workers(workers, url, user_id, tuned=False) > 0
+    before = db.session.execute(text("SELECT count(*) FROM task WHERE user_id = :u"), {'u': user_id}).scalar()
+    db.session.remove()
+
+    assert run_workers(workers, url, user_id, tuned=True) == 0
+    after = db.session.execute(text("SELECT count(*) FROM task WHERE user_id = :u"), {'u': user_id}).scalar()
+    assert after - before == WORKERS * WRITES_PER_WORKER
+
+
+def test_server_databases_get_a_sized_pool(monkeypatch):
+    monkeypatch.setenv('DB_POOL_SIZE', '12')
+    monkeypatch.setenv('DB_MAX_OVERFLOW', '4')
+    options = engine_options('postgresql://app@db/neuronudge')
+    assert options['pool_size'] == 12
+    assert options['max_overflow'] == 4
+    assert options['pool_pre_ping'] is True
+    assert 'pool_size' not in engine_options('sqlite:///db.sqlite')
+
+
+def test_sqlite_connections_get_the_pragmas(db):
+    if not is_sqlite(db):
+        pytest.skip("SQLite pragmas only")
+    with db.engine.connect() as conn:
+        assert conn.exec_driver_sql('PRAGMA journal_mode').scalar() == 'wal'
+        assert conn.exec_driver_sql('PRAGMA synchronous').scalar() == 1  # NORMAL
+        assert conn.exec_driver_sql('PRAGMA busy_timeout').scalar() == 5000
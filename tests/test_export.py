@@ -0,0 +1,58 @@
+# tests/test_export.py
+import csv
+import gzip
+import io
+import json
+import tracemalloc
+import pytest
+from Neuronudge.export import stream_export
+from conftest import add_tasks
+
+
+def export_peak(user_id, fmt):
+    """Consume a whole export and return (bytes produced, peak traced memory)."""
+    tracemalloc.start()
+    try:
+        size = sum(len(chunk) for chunk in stream_export(user_id, fmt, ['title', 'description', 'due_date']))
+        return size, tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+@pytest.mark.parametrize('fmt', ['json', 'ndjson', 'csv'])
+def test_export_memory_does_not_grow_with_task_count(db, user_id, fmt):
+    add_tasks(db, user_id, 2000, description='x' * 200)
+    small_size, small_peak = export_peak(user_id, fmt)
+    add_tasks(db, user_id, 18000, description='x' * 200)
+    large_size, large_peak = export_peak(user_id, fmt)
+
+    assert large_size > 9 * small_size
+    # Buffering the export would need ~10x the memory; streaming stays flat
+    assert large_peak < 2 * small_peak
+
+
+def test_formats_round_trip(db, client, user_id):
+    add_tasks(db, user_id, 3)
+
+    document = client.get('/tasks/export?format=json&fields=title,priority').get_json()
+    assert [row['title'] for row in document['tasks']] == ['Task 0', 'Task 1', 'Task 2']
+    assert set(document['tasks'][0]) == {'title', 'priority'}
+
+    lines = client.get('/tasks/export?format=ndjson').get_data(as_text=True).splitlines()
+    assert [json.loads(line)['title'] for line in lines] == ['Task 0', 'Task 1', 'Task 2']
+
+    response = client.get('/tasks/export?format=csv&gzip=1')
+    assert response.headers['Content-Disposition'] == 'attachment; filename="tasks.csv.gz"'
+    rows = list(csv.DictReader(io.StringIO(gzip.decompress(response.data).decode())))
+    assert [row['title'] for row in rows] == ['Task 0', 'Task 1', 'Task 2']
+
+
+def test_export_response_is_streamed(db, client, user_id):
+    add_tasks(db, user_id, 3)
+    response = client.get('/tasks/export?format=ndjson', buffered=False)
+    assert response.is_streamed
+    response.close()
+
+
+def test_unknown_format_is_rejected(client):
+    assert client.get('/tasks/export?format=xml').status_code == 400
@@ -0,0 +1,55 @@
+# tests/test_features.py
+from types import SimpleNamespace
+from Neuronudge.features import FEATURE_BITS, compute_feature_mask, features_from_mask
+from Neuronudge.models import User
+
+
+def test_mask_folds_flags_and_stored_features():
+    user = SimpleNamespace(
+        feature_task_timer=True,
+        feature_progress_graphs=True,
+        feature_focus_mode=False,
+        dashboard_features=['auto_reminders', ' Focus ', 'no_such_feature', 7],
+    )
+    assert features_from_mask(compute_feature_mask(user)) == ('focus_mode', 'graphs', 'reminders', 'task_timer')
+
+
+def test_stored_features_may_be_json_text():
+    assert compute_feature_mask(SimpleNamespace(dashboard_features='["timer", "stats"]')) == \
+        FEATURE_BITS['task_timer'] | FEATURE_BITS['task_stats']
+    assert compute_feature_mask(SimpleNamespace(dashboard_features='{}')) == 0
+    assert compute_feature_mask(SimpleNamespace(dashboard_features='not json')) == 0
+
+
+def test_has_feature_accepts_any_spelling():
+    user = User(feature_mask=FEATURE_BITS['reminders'] | FEATURE_BITS['graphs'])
+    assert user.has_feature('reminders') and user.has_feature('auto-reminders')
+    assert user.has_feature('progress_graphs')
+    assert not user.has_feature('task_timer')
+    assert not user.has_feature('no_such_feature')
+    assert user.features == ('graphs', 'reminders')
+
+
+def test_registration_stores_the_mask(app, db):
+    response = app.test_client().post('/auth/register', data={
+        'name': 'New User', 'email': 'new@example.com', 'username': 'newuser',
+        'password': 'password123', 'confirm_password': 'password123', 'profile_type': 'general',
+        'feature_timer': 'y', 'feature_auto_reminders': 'y', 'feature_task_export': 'y',
+    })
+    assert response.status_code == 302
+    user = User.query.filter_by(email='new@example.com').one()
+    assert user.features == ('reminders', 'task_export', 'task_timer')
+
+
+def test_saving_the_profile_recomputes_the_mask(client, db, user_id):
+    user = db.session.get(User, user_id)
+    user.dashboard_features = ['focus_mode']  # changed without refreshing the mask
+    db.session.commit()
+    assert 'focus_mode' not in user.features
+
+    response = client.post('/profile', data={'email': 'tester@example.com', 'username': 'tester', 'profile_type': 'General'})
+    assert response.status_code == 302
+    db.session.expire_all()
+    user = db.session.get(User, user_id)
+    assert 'focus_mode' in user.features
+    assert user.feature_mask == compute_feature_mask(user)
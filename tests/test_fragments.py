@@ -0,0 +1,81 @@
+# tests/test_fragments.py
+import pytest
+from flask_login import login_user
+from Neuronudge.fragments import FragmentCache, bump_fragment_version
+from Neuronudge.models import User
+
+TEMPLATE = "{% cache 'greeting', page %}{{ load() }} on page {{ page }}{% endcache %}"
+
+
+@pytest.fixture
+def users(db, user_id):
+    other = User(name='Other User', username='other', email='other@example.com', password_hash='x')
+    db.session.add(other)
+    db.session.commit()
+    return db.session.get(User, user_id), other
+
+
+@pytest.fixture
+def render(app):
+    loads = []
+
+    def render(user, page=1):
+        def load():
+            loads.append(user.name if user else None)
+            return f"Hello {user.name if user else 'guest'}"
+        # A fresh context per render, like a new request
+        with app.app_context(), app.test_request_context('/dashboard'):
+            if user is not None:
+                login_user(user)
+            return app.jinja_env.from_string(TEMPLATE).render(load=load, page=page)
+    render.loads = loads
+    return render
+
+
+def test_fragment_is_reused_across_renders(render, users):
+    me, _ = users
+    assert render(me) == render(me) == 'Hello Test User on page 1'
+    assert render.loads == ['Test User']
+
+
+def test_bumping_the_version_renders_it_again(render, users):
+    me, _ = users
+    render(me)
+    bump_fragment_version(me.id)
+    render(me)
+    assert render.loads == ['Test User', 'Test User']
+
+
+def test_another_user_never_gets_the_fragment(render, users):
+    me, other = users
+    render(me)
+    assert render(other) == 'Hello Other User on page 1'
+    assert render.loads == ['Test User', 'Other User']
+
+
+def test_vary_values_are_cached_separately(render, users):
+    me, _ = users
+    assert render(me, page=1) == 'Hello Test User on page 1'
+    assert render(me, page=2) == 'Hello Test User on page 2'
+    render(me, page=1)
+    assert render.loads == ['Test User', 'Test User']
+
+
+def test_anonymous_requests_are_not_cached(render):
+    render(None)
+    render(None)
+    assert render.loads == [None, None]
+
+
+def test_cache_evicts_least_recently_used_and_expires():
+    cache = FragmentCache(maxsize=2, ttl=60)
+    cache.set('a', 'A')
+    cache.set('b', 'B')
+    assert cache.get('a') == 'A'
+    cache.set('c', 'C')
+    assert cache.get('b') is None and cache.get('a') == 'A'
+    assert cache.stats()['evictions'] == 1
+
+    expired = FragmentCache(ttl=-1)
+    expired.set('a', 'A')
+    assert expired.get('a') is None
@@ -0,0 +1,65 @@
+# tests/test_history.py
+"""completed_at and TaskTransition rows must follow every way a task changes status."""
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import func, select, text
+from Neuronudge.models import Task, TaskTransition
+from conftest import add_tasks, is_sqlite
+
+EDIT = {'title': 'Edited', 'description': '', 'due_date': '2030-01-01', 'priority': '2'}
+
+
+def transitions(db, task_id):
+    db.session.expire_all()
+    return [(t.from_status, t.to_status) for t in
+            TaskTransition.query.filter_by(task_id=task_id).order_by(TaskTransition.id)]
+
+
+def test_toggling_sets_and_clears_completed_at(client, db, user_id):
+    task_id, = add_tasks(db, user_id, 1)
+    before = datetime.utcnow()
+    client.post(f'/tasks/complete/{task_id}')
+    task = db.session.get(Task, task_id)
+    assert task.completed and task.completed_at >= before
+
+    client.post(f'/tasks/complete/{task_id}')
+    db.session.expire_all()
+    assert db.session.get(Task, task_id).completed_at is None
+    assert transitions(db, task_id) == [('not started', 'completed'), ('completed', 'not started')]
+
+
+def test_status_updates_record_each_step(client, db, user_id):
+    task_id, = add_tasks(db, user_id, 1)
+    for status in ('in progress', 'in progress', 'completed'):
+        assert client.post(f'/task/update_status/{task_id}', json={'status': status}).status_code == 200
+    assert transitions(db, task_id) == [('not started', 'in progress'), ('in progress', 'completed')]
+    assert db.session.get(Task, task_id).completed_at is not None
+
+
+def test_edits_record_only_status_changes(client, db, user_id):
+    task_id, = add_tasks(db, user_id, 1)
+    client.post(f'/task/edit/{task_id}', data={**EDIT, 'status': 'not_started'})
+    assert transitions(db, task_id) == []
+    client.post(f'/task/edit/{task_id}', data={**EDIT, 'status': 'completed'})
+    assert transitions(db, task_id) == [('not started', 'completed')]
+    assert db.session.get(Task, task_id).completed_at is not None
+
+
+def test_bulk_complete_records_where_each_task_came_from(client, db, user_id):
+    started, fresh = add_tasks(db, user_id, 2)
+    client.post(f'/task/update_status/{started}', json={'status': 'in progress'})
+    client.post('/tasks/bulk-complete', json={'task_ids': [started, fresh]})
+    assert transitions(db, started) == [('not started', 'in progress'), ('in progress', 'completed')]
+    assert transitions(db, fresh) == [('not started', 'completed')]
+    assert all(t.completed_at is not None for t in Task.query.filter_by(user_id=user_id))
+
+
+def test_per_user_range_queries_use_the_index(db, user_id):
+    if not is_sqlite(db):
+        pytest.skip("EXPLAIN QUERY PLAN output is SQLite-specific")
+    since = datetime.utcnow() - timedelta(days=7)
+    query = select(func.count()).select_from(TaskTransition) \
+        .where(TaskTransition.user_id == user_id, TaskTransition.changed_at >= since)
+    sql = query.compile(db.engine, compile_kwargs={'literal_binds': True})
+    plan = ' | '.join(row[-1] for row in db.session.execute(text(f"EXPLAIN QUERY PLAN {sql}")).all())
+    assert 'ix_task_transition_user_changed (user_id=? AND changed_at>?)' in plan
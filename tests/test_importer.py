@@ -0,0 +1,62 @@
+# tests/test_importer.py
+import io
+import pytest
+from sqlalchemy import text
+from Neuronudge.importer import import_tasks
+from Neuronudge.models import Task
+from Neuronudge.search import fts_bulk_insert, fts_enabled, search_tasks
+
+CSV = """title,description,due_date,priority,status,reminder_set
+Pay rent,before the 5th,2026-11-01,1,not_started,yes
+,missing title,2026-11-02,2,not_started,no
+Call plumber,kitchen sink,2026-11-03,3,in_progress,0
+"""
+
+
+def insert_trigger_sql(db):
+    return db.session.execute(text(
+        "SELECT sql FROM sqlite_master WHERE type = 'trigger' AND name = 'task_fts_ai'"
+    )).scalar()
+
+
+def test_import_reports_rejected_rows(db, user_id):
+    report = import_tasks(user_id, io.StringIO(CSV), 'csv')
+    assert report['imported'] == 2
+    assert report['failed'] == 1
+    assert report['errors'] == [{'row': 2, 'errors': ['title: This field is required.']}]
+    assert sorted(t.title for t in Task.query.filter_by(user_id=user_id)) == ['Call plumber', 'Pay rent']
+
+
+def test_imported_tasks_are_searchable(db, user_id):
+    import_tasks(user_id, io.StringIO(CSV), 'csv')
+    query = search_tasks(Task.query.filter_by(user_id=user_id), title='plumb')
+    assert [t.title for t in query] == ['Call plumber']
+    if fts_enabled():
+        assert insert_trigger_sql(db) is not None
+
+
+def test_failed_bulk_insert_keeps_the_index_trigger(db, user_id):
+    if not fts_enabled():
+        pytest.skip("no full-text index on this database")
+    with pytest.raises(RuntimeError):
+        with fts_bulk_insert(db.session.connection()):
+            raise RuntimeError("batch failed")
+    db.session.rollback()
+    assert insert_trigger_sql(db) is not None
+
+    db.session.add(Task(title='Water plants', description='', user_id=user_id))
+    db.session.commit()
+    assert [t.title for t in search_tasks(Task.query, title='water')] == ['Water plants']
+
+
+def test_imported_status_and_completed_at_match_the_row(db, user_id):
+    rows = CSV + "File taxes,,2026-04-15,1,completed,no\n"
+    import_tasks(user_id, io.StringIO(rows), 'csv')
+    tasks = {t.title: t for t in Task.query.filter_by(user_id=user_id)}
+
+    assert tasks['Pay rent'].status == 'not started'
+    assert tasks['Call plumber'].status == 'in progress'
+    assert tasks['File taxes'].status == 'completed'
+    assert tasks['File taxes'].completed and tasks['File taxes'].completed_at is not None
+    assert tasks['Pay rent'].completed_at is None
+    assert tasks['Call plumber'].workflow_status == 'in progress'
@@ -0,0 +1,89 @@
+# tests/test_live.py
+import json
+import os
+import runpy
+import pytest
+from Neuronudge.live import SUBSCRIBER_QUEUE_SIZE, LiveHub, format_sse
+from conftest import add_tasks
+
+GUNICORN_CONF = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'gunicorn.conf.py')
+
+
+def test_dispatch_reaches_only_that_users_streams():
+    hub = LiveHub()
+    first, second, other = hub.subscribe(1), hub.subscribe(1), hub.subscribe(2)
+    hub.publish(1, 'counts', {'all': 3})
+
+    message = format_sse('counts', {'all': 3})
+    assert first.get_nowait() == message
+    assert second.get_nowait() == message
+    assert other.empty()
+
+
+def test_unsubscribed_streams_get_nothing():
+    hub = LiveHub()
+    q = hub.subscribe(1)
+    assert hub.has_listeners(1)
+    hub.unsubscribe(1, q)
+    assert not hub.has_listeners(1)
+    hub.publish(1, 'counts', {})
+    assert q.empty()
+
+
+def test_a_full_stream_drops_new_events_instead_of_blocking():
+    hub = LiveHub()
+    q = hub.subscribe(1)
+    for i in range(SUBSCRIBER_QUEUE_SIZE + 5):
+        hub.publish(1, 'task', {'n': i})
+    assert q.qsize() == SUBSCRIBER_QUEUE_SIZE
+    assert json.loads(q.get_nowait().split('data: ', 1)[1]) == {'n': 0}
+
+
+def frames(chunks, count):
+    return [next(chunks).decode() for _ in range(count)]
+
+
+def test_events_stream_framing(app, client, db, user_id):
+    app.config.update(LIVE_HEARTBEAT_SECONDS=0.05, LIVE_STREAM_MAX_SECONDS=0.5)
+    task_id = add_tasks(db, user_id, 1)[0]
+    response = client.get('/events', buffered=False)
+    assert response.mimetype == 'text/event-stream'
+    assert 'Content-Encoding' not in response.headers
+    chunks = iter(response.response)
+    assert frames(chunks, 1) == ['retry: 3000\n\n']  # the stream is subscribed from here on
+
+    assert client.post(f'/tasks/complete/{task_id}').status_code == 200
+    task_frame, counts_frame = frames(chunks, 2)
+    event, data = task_frame.rstrip('\n').split('\n')
+    assert event == 'event: task'
+    delta = json.loads(data[len('data: '):])
+    assert delta['op'] == 'updated' and delta['ids'] == [task_id] and delta['completed'] is True
+    assert counts_frame.startswith('event: counts\ndata: ')
+    assert counts_frame.endswith('\n\n')
+
+    # Idle streams get comments, then end so the browser reconnects
+    rest = [chunk.decode() for chunk in chunks]
+    assert rest and set(rest) == {': keepalive\n\n'}
+    response.close()
+    assert not app.extensions['live_hub'].has_listeners(user_id)
+
+
+@pytest.mark.parametrize('env, worker_class', [
+    ({'DATABASE_URL': 'postgresql://app@db/neuronudge'}, 'gevent'),
+    ({'DATABASE_URL': 'postgres://app@db/neuronudge'}, 'gevent'),
+    ({'DATABASE_URL': 'sqlite:///db.sqlite'}, 'gthread'),
+    ({'DATABASE_URL': 'postgresql://app@db/neuronudge', 'DATABASE_REPLICA_URLS': 'sqlite:///r.sqlite'}, 'gthread'),
+])
+def test_gunicorn_uses_gevent_only_on_postgresql(monkeypatch, env, worker_class):
+    monkeypatch.delenv('DATABASE_REPLICA_URLS', raising=False)
+    monkeypatch.delenv('GUNICORN_WORKER_CLASS', raising=False)
+    for name, value in env.items():
+        monkeypatch.setenv(name, value)
+    assert runpy.run_path(GUNICORN_CONF)['worker_class'] == worker_class
+
+
+def test_gunicorn_refuses_gevent_on_sqlite(monkeypatch):
+    monkeypatch.setenv('DATABASE_URL', 'sqlite:///db.sqlite')
+    monkeypatch.setenv('GUNICORN_WORKER_CLASS', 'gevent')
+    with pytest.raises(RuntimeError):
+        runpy.run_path(GUNICORN_CONF)
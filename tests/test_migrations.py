@@ -0,0 +1,88 @@
+# tests/test_migrations.py
+"""`flask db upgrade` must reach head from the database shipped in instance/ and from an empty one."""
+import os
+import shutil
+import pytest
+import sqlalchemy as sa
+from alembic.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from flask_migrate import downgrade, upgrade
+from conftest import TEST_DATABASE_URL
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MIGRATIONS = os.path.join(ROOT, 'migrations')
+SHIPPED_DB = os.path.join(ROOT, 'instance', 'db.sqlite')
+HEAD = ScriptDirectory(MIGRATIONS).get_current_head()
+
+
+def current_revision(db):
+    with db.engine.connect() as conn:
+        return MigrationContext.configure(conn).get_current_revision()
+
+
+def columns(db, table):
+    return {column['name'] for column in sa.inspect(db.engine).get_columns(table)}
+
+
+def assert_at_head(db):
+    assert current_revision(db) == HEAD
+    assert {'completed_at', 'remind_at', 'sort_priority', 'sort_due_date'} <= columns(db, 'task')
+    assert 'feature_mask' in columns(db, 'user')
+    assert {'activity_daily', 'task_progress_daily', 'task_transition'} <= set(sa.inspect(db.engine).get_table_names())
+
+
+@pytest.fixture
+def shipped_app(tmp_path, monkeypatch):
+    """The app on a copy of instance/db.sqlite, which predates the newer revisions."""
+    if TEST_DATABASE_URL:
+        pytest.skip("the shipped database is SQLite")
+    shutil.copy(SHIPPED_DB, tmp_path / 'shipped.sqlite')
+    monkeypatch.setenv('DATABASE_URL', f"sqlite:///{tmp_path / 'shipped.sqlite'}")
+    monkeypatch.delenv('DATABASE_REPLICA_URLS', raising=False)
+    monkeypatch.setenv('TEMPLATE_BYTECODE_CACHE_DIR', '')
+    monkeypatch.setenv('TEMPLATE_PRELOAD', '0')
+    from Neuronudge import create_app, db
+    app = create_app()
+    yield app
+    app.extensions['audit'].stop()
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+
+
+def test_upgrade_from_the_shipped_database(shipped_app):
+    from Neuronudge import db
+    with shipped_app.app_context():
+        # create_app() has already run create_all(), which adds the newer tables
+        assert current_revision(db) != HEAD
+        completed = db.session.execute(sa.text("SELECT count(*) FROM task WHERE completed")).scalar()
+        upgrade(directory=MIGRATIONS)
+        assert_at_head(db)
+        assert db.session.execute(
+            sa.text("SELECT count(*) FROM task WHERE completed_at IS NOT NULL")
+        ).scalar() == completed
+
+
+def test_upgrade_backfills_feature_masks(shipped_app):
+    from Neuronudge import db
+    from Neuronudge.features import compute_feature_mask
+    with shipped_app.app_context():
+        upgrade(directory=MIGRATIONS)
+        users = db.session.execute(sa.text("SELECT * FROM user")).all()
+    assert any(user.feature_mask for user in users)
+    assert [user.feature_mask for user in users] == [compute_feature_mask(user) for user in users]
+
+
+def test_new_database_starts_at_head(db):
+    assert_at_head(db)
+    upgrade(directory=MIGRATIONS)
+    assert_at_head(db)
+
+
+def test_newer_revisions_round_trip(db):
+    # Back to the shipped database's revision and up again, with create_all()
+    # having left the newer tables in place as it does on every start
+    downgrade(directory=MIGRATIONS, revision='2bb3bd252005')
+    db.create_all()
+    upgrade(directory=MIGRATIONS)
+    assert_at_head(db)
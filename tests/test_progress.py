@@ -0,0 +1,117 @@
+# tests/test_progress.py
+from datetime import date, datetime, timedelta
+import pytest
+from Neuronudge.models import Task, TaskProgressDaily
+from Neuronudge.progress import backfill_progress, progress_series, record_progress
+from Neuronudge.timeutils import pacific_today, utc_to_pacific_date
+from conftest import add_tasks
+
+
+def progress_row(db, user_id, day):
+    db.session.expire_all()
+    return db.session.get(TaskProgressDaily, (user_id, day))
+
+
+def counters(row):
+    return row.created, row.completed, row.completed_on_time, row.completed_late, row.open_tasks
+
+
+def test_record_progress_adds_to_todays_row(db, user_id):
+    add_tasks(db, user_id, 3)
+    record_progress(user_id, created=3)
+    record_progress(user_id, completed=2, late=1)
+    db.session.commit()
+    assert counters(progress_row(db, user_id, pacific_today())) == (3, 2, 1, 1, 3)
+
+
+def completed_task(db, user_id, days_ago, late):
+    """A task completed `days_ago` days back, on time or late, with the rollup rebuilt from it."""
+    completed_at = datetime.utcnow().replace(hour=20) - timedelta(days=days_ago)
+    due_date = completed_at + timedelta(days=-1 if late else 1)
+    task_id, = add_tasks(db, user_id, 1, completed=True, completed_at=completed_at, due_date=due_date)
+    backfill_progress(user_id)
+    return task_id, utc_to_pacific_date(completed_at)
+
+
+@pytest.mark.parametrize('late', [False, True])
+def test_reopening_takes_the_completion_off_the_day_it_was_made(client, db, user_id, late):
+    task_id, day = completed_task(db, user_id, days_ago=3, late=late)
+    assert progress_row(db, user_id, day).completed == 1
+
+    assert client.post(f'/tasks/complete/{task_id}').get_json()['completed'] is False
+    row = progress_row(db, user_id, day)
+    assert (row.completed, row.completed_on_time, row.completed_late) == (0, 0, 0)
+    assert progress_row(db, user_id, pacific_today()).open_tasks == 1
+
+
+def test_reopening_through_the_edit_form(client, db, user_id):
+    task_id, day = completed_task(db, user_id, days_ago=3, late=True)
+    response = client.post(f'/task/edit/{task_id}', data={
+        'title': 'Reopened', 'description': '', 'due_date': '2030-01-01', 'priority': '2', 'status': 'not_started'
+    })
+    assert response.status_code == 302
+    assert not db.session.get(Task, task_id).completed
+    # Judged against the due date the task had when it was completed
+    row = progress_row(db, user_id, day)
+    assert (row.completed, row.completed_on_time, row.completed_late) == (0, 0, 0)
+
+
+def test_backfill_rebuilds_from_tasks(db, user_id):
+    created = datetime(2026, 3, 2, 20)
+    done = datetime(2026, 3, 4, 20)
+    add_tasks(db, user_id, 2, created_at=created)
+    add_tasks(db, user_id, 1, created_at=created, completed=True, completed_at=done, due_date=done + timedelta(days=1))
+    add_tasks(db, user_id, 1, created_at=created, completed=True, completed_at=done, due_date=done - timedelta(days=1))
+    db.session.add(TaskProgressDaily(user_id=user_id, day=date(2026, 1, 1), completed=9))  # replaced by the rebuild
+    db.session.commit()
+
+    assert backfill_progress(user_id) == 2
+    rows = TaskProgressDaily.query.filter_by(user_id=user_id).order_by(TaskProgressDaily.day).all()
+    assert [(row.day, *counters(row)) for row in rows] == [
+        (date(2026, 3, 2), 4, 0, 0, 0, 4),
+        (date(2026, 3, 4), 0, 2, 1, 1, 2),
+    ]
+
+
+@pytest.fixture
+def history(db, user_id):
+    # 2026-10-05 and 2026-10-12 are Mondays
+    for day, created, completed, late, open_tasks in [
+        (date(2026, 10, 1), 5, 0, 0, 5),
+        (date(2026, 10, 6), 0, 2, 1, 4),
+        (date(2026, 10, 8), 3, 0, 0, 7),
+        (date(2026, 10, 13), 0, 1, 0, 6),
+    ]:
+        db.session.add(TaskProgressDaily(
+            user_id=user_id, day=day, created=created, completed=completed,
+            completed_on_time=completed - late, completed_late=late, open_tasks=open_tasks
+        ))
+    db.session.commit()
+
+
+def test_series_buckets_by_iso_week(user_id, history):
+    series = progress_series(user_id, date(2026, 10, 5), date(2026, 10, 18), 'week')
+    assert series == {
+        'labels': ['2026-10-05', '2026-10-12'],
+        'created': [3, 0],
+        'completed': [2, 1],
+        'on_time': [1, 1],
+        'late': [1, 0],
+        'on_time_rate': [0.5, 1.0],
+        'backlog': [7, 6],
+    }
+
+
+def test_series_starting_mid_week_counts_only_days_in_range(user_id, history):
+    series = progress_series(user_id, date(2026, 10, 7), date(2026, 10, 11), 'week')
+    assert series['labels'] == ['2026-10-05']
+    assert series['completed'] == [0]
+    assert series['created'] == [3]
+    assert series['on_time_rate'] == [None]
+
+
+def test_daily_series_carries_the_backlog_over_empty_days(user_id, history):
+    series = progress_series(user_id, date(2026, 10, 5), date(2026, 10, 7))
+    assert series['labels'] == ['2026-10-05', '2026-10-06', '2026-10-07']
+    assert series['backlog'] == [5, 4, 4]
+    assert series['completed'] == [0, 2, 0]
@@ -0,0 +1,73 @@
+# tests/test_query_plans.py
+"""The dashboard queries must be answered from their composite indexes without a sort step."""
+from datetime import datetime
+import pytest
+from sqlalchemy import select, text, union
+from Neuronudge.models import ActivityLog, Task
+from Neuronudge.pagination import TASK_LIST_ORDER
+from Neuronudge.stats import _task_counts_query
+from conftest import is_sqlite
+
+
+def query_plan(db, query):
+    sql = getattr(query, 'statement', query).compile(db.engine, compile_kwargs={'literal_binds': True})
+    rows = db.session.execute(text(f"EXPLAIN QUERY PLAN {sql}")).all()
+    return ' | '.join(row[-1] for row in rows)
+
+
+@pytest.fixture(autouse=True)
+def sqlite_only(db):
+    if not is_sqlite(db):
+        pytest.skip("EXPLAIN QUERY PLAN output is SQLite-specific")
+
+
+def test_task_list_reads_index_in_order(db, user_id):
+    plan = query_plan(db, Task.query.filter_by(user_id=user_id).order_by(*TASK_LIST_ORDER).limit(11))
+    assert 'USING INDEX ix_task_user_priority_due (user_id=?)' in plan
+    assert 'TEMP B-TREE' not in plan
+
+
+def test_filtered_task_list_reads_index_in_order(db, user_id):
+    query = Task.query.filter_by(user_id=user_id, completed=False).order_by(*TASK_LIST_ORDER).limit(11)
+    plan = query_plan(db, query)
+    assert 'ix_task_user_priority_due' in plan
+    assert 'TEMP B-TREE' not in plan
+
+
+def test_overdue_filter_uses_index(db, user_id):
+    query = Task.query.filter(
+        Task.user_id == user_id,
+        Task.completed == False,
+        Task.due_date != None,
+        Task.due_date < datetime.utcnow()
+    )
+    assert 'USING INDEX ix_task_user_completed_due (user_id=? AND completed=? AND due_date>? AND due_date<?)' \
+        in query_plan(db, query)
+
+
+def test_recently_updated_uses_index(db, user_id):
+    query = Task.query.filter_by(user_id=user_id).order_by(Task.updated_at.desc()).limit(10)
+    plan = query_plan(db, query)
+    assert 'ix_task_user_updated' in plan
+    assert 'TEMP B-TREE' not in plan
+
+
+def test_activity_poll_seeks_both_indexes(db, user_id):
+    wanted = union(
+        select(ActivityLog.id).where(ActivityLog.user_id == user_id, ActivityLog.id > 100),
+        select(ActivityLog.id).where(ActivityLog.user_id == user_id, ActivityLog.timestamp > datetime(2026, 1, 1)),
+    )
+    query = ActivityLog.query.filter(ActivityLog.id.in_(wanted)).order_by(ActivityLog.id.asc()).limit(100)
+    plan = query_plan(db, query)
+    # New ids and the lag window are each one index range
+    assert 'ix_activity_log_user_id (user_id=? AND id>?)' in plan
+    assert 'ix_activity_log_user_timestamp (user_id=? AND timestamp>?)' in plan
+    assert 'SCAN' not in plan
+
+
+def test_task_counts_are_index_range_counts(db, user_id):
+    plan = query_plan(db, _task_counts_query(user_id, datetime(2026, 1, 1)))
+    # Unset, completed and pending (SQLite prints IS NULL as completed=?), then overdue
+    assert plan.count('COVERING INDEX ix_task_user_completed_due (user_id=? AND completed=?)') == 3
+    assert 'COVERING INDEX ix_task_user_completed_due (user_id=? AND completed=? AND due_date<?)' in plan
+    assert 'SCAN task' not in plan
@@ -0,0 +1,51 @@
+# tests/test_reminders.py
+from datetime import datetime, timedelta
+from Neuronudge.models import Task
+from Neuronudge.reminders import ReminderScheduler
+from conftest import add_tasks
+
+
+class FlakyNotifier:
+    """Delivers every reminder except those for the given task titles."""
+
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.sent = []
+
+    def send(self, reminder):
+        if reminder['title'] in self.failing:
+            raise OSError("notifier unavailable")
+        self.sent.append(reminder['title'])
+
+
+def remind_at(db, task_id):
+    return db.session.get(Task, task_id).remind_at
+
+
+def test_failed_reminders_are_retried_later(db, user_id):
+    now = datetime.utcnow()
+    ids = add_tasks(db, user_id, 3, due_date=now + timedelta(hours=2), reminder_set=True, remind_at=now)
+    scheduler = ReminderScheduler(FlakyNotifier(failing={'Task 1'}), retry_delay=300)
+
+    assert scheduler.fire_due(now) == 2
+    assert scheduler.notifier.sent == ['Task 0', 'Task 2']
+    assert remind_at(db, ids[0]) is None
+    assert remind_at(db, ids[2]) is None
+    assert remind_at(db, ids[1]) == now + timedelta(seconds=300)
+
+    # Nothing is due again until the retry time; then it goes out once the notifier recovers
+    assert scheduler.fire_due(now + timedelta(seconds=60)) == 0
+    scheduler.notifier.failing.clear()
+    assert scheduler.fire_due(now + timedelta(seconds=300)) == 1
+    assert scheduler.notifier.sent == ['Task 0', 'Task 2', 'Task 1']
+    db.session.expire_all()
+    assert remind_at(db, ids[1]) is None
+
+
+def test_failed_reminder_is_dropped_once_the_task_is_due(db, user_id):
+    now = datetime.utcnow()
+    ids = add_tasks(db, user_id, 1, due_date=now + timedelta(minutes=2), reminder_set=True, remind_at=now)
+    scheduler = ReminderScheduler(FlakyNotifier(failing={'Task 0'}), retry_delay=300)
+
+    assert scheduler.fire_due(now) == 0
+    assert remind_at(db, ids[0]) is None
@@ -0,0 +1,125 @@
+# tests/test_routing.py
+"""Read replica routing, checked against two SQLite files: a primary and a copy standing in for its replica."""
+import sqlite3
+import time
+import pytest
+from sqlalchemy import select
+from Neuronudge.models import Task
+from Neuronudge.routing import _PRIMARY_UNTIL_KEY
+from conftest import TEST_DATABASE_URL, add_tasks, count_queries
+
+
+def add_raw_task(path, user_id, title):
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "INSERT INTO task (title, description, completed, priority, status, reminder_set, user_id) "
+        "VALUES (?, '', 0, 2, 'not started', 0, ?)", (title, user_id)
+    )
+    conn.commit()
+    conn.close()
+
+
+@pytest.fixture
+def replicated(tmp_path, monkeypatch):
+    """An app whose replica is a snapshot of the primary taken after the test user was created."""
+    if TEST_DATABASE_URL:
+        pytest.skip("uses two SQLite files")
+    primary, replica = tmp_path / 'primary.sqlite', tmp_path / 'replica.sqlite'
+    monkeypatch.setenv('DATABASE_URL', f'sqlite:///{primary}')
+    monkeypatch.setenv('DATABASE_REPLICA_URLS', f'sqlite:///{replica}')
+    monkeypatch.setenv('TEMPLATE_BYTECODE_CACHE_DIR', '')
+    monkeypatch.setenv('TEMPLATE_PRELOAD', '0')
+    from Neuronudge import create_app, db
+    from Neuronudge.models import User
+    app = create_app()
+    app.config.update(TESTING=True, WTF_CSRF_ENABLED=False)
+    with app.app_context():
+        user = User(name='Test User', username='tester', email='tester@example.com', profile_type='general')
+        user.set_password('password123')
+        db.session.add(user)
+        db.session.commit()
+        user_id = user.id
+        add_tasks(db, user_id, 3)
+        source, target = sqlite3.connect(primary), sqlite3.connect(replica)
+        source.backup(target)
+        source.close()
+        target.close()
+    add_raw_task(primary, user_id, 'Only on primary')
+    add_raw_task(replica, user_id, 'Only on replica')
+
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['_user_id'] = str(user_id)
+        session['_fresh'] = True
+    yield app, client, user_id
+    app.extensions['audit'].stop()
+    with app.app_context():
+        db.session.remove()
+        for engine in db.engines.values():
+            engine.dispose()
+
+
+def sticky_until(client):
+    with client.session_transaction() as session:
+        return session.get(_PRIMARY_UNTIL_KEY)
+
+
+def test_read_only_views_read_from_the_replica(replicated):
+    app, client, _ = replicated
+    html = client.get('/tasks').get_data(as_text=True)
+    assert 'Only on replica' in html
+    assert 'Only on primary' not in html
+    assert sticky_until(client) is None
+
+
+def test_writes_and_flushes_go_to_the_primary(replicated):
+    from Neuronudge import db
+    app, client, user_id = replicated
+    with app.test_request_context('/tasks'):
+        replica = db.session.get_bind(clause=select(Task))
+        assert replica is not db.engine
+
+        db.session.add(Task(title='Written', description='', user_id=user_id))
+        db.session.flush()
+        # After a write the rest of the request reads the primary too
+        assert db.session.get_bind(clause=select(Task)) is db.engine
+        db.session.commit()
+        titles = db.session.execute(select(Task.title).where(Task.user_id == user_id)).scalars().all()
+        assert 'Written' in titles and 'Only on primary' in titles
+        db.session.remove()
+
+
+def test_a_write_keeps_the_browser_on_the_primary_for_a_while(replicated):
+    app, client, _ = replicated
+    response = client.post('/task/new', data={
+        'title': 'Fresh task', 'description': '', 'due_date': '2030-01-01', 'priority': '2', 'status': 'not_started'
+    })
+    assert response.status_code == 302
+    assert sticky_until(client) > time.time()
+
+    html = client.get('/tasks').get_data(as_text=True)
+    assert 'Fresh task' in html and 'Only on primary' in html
+
+    # Once the sticky window has passed, reads go back to the replica
+    with client.session_transaction() as session:
+        session[_PRIMARY_UNTIL_KEY] = time.time() - 1
+    html = client.get('/tasks').get_data(as_text=True)
+    assert 'Only on replica' in html and 'Fresh task' not in html
+
+
+def test_dashboard_get_stays_read_only(replicated):
+    from Neuronudge import db
+    app, client, _ = replicated
+    client.get('/dashboard')  # warm up the user and widget caches
+    with app.app_context():
+        with count_queries(db.engine) as primary_statements:
+            response = client.get('/dashboard')
+    assert response.status_code == 200
+    assert not [s for s in primary_statements if not s.lstrip().upper().startswith('SELECT')]
+    assert sticky_until(client) is None
+
+
+def test_read_only_views_use_the_primary_without_replicas(client, db, user_id):
+    add_tasks(db, user_id, 2)
+    html = client.get('/tasks').get_data(as_text=True)
+    assert 'Task 0' in html and 'Task 1' in html
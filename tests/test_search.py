@@ -0,0 +1,81 @@
+# tests/test_search.py
+import pytest
+from Neuronudge.models import Task
+from Neuronudge.search import build_match_query, fts_enabled, search_tasks
+from conftest import add_tasks, is_sqlite
+
+
+def titles(query):
+    return sorted(task.title for task in query.all())
+
+
+@pytest.fixture
+def tasks(db, user_id):
+    db.session.add_all([
+        Task(title='Write weekly report', description='numbers for the team', user_id=user_id),
+        Task(title='Workout', description='legs and back', user_id=user_id),
+        Task(title='Buy groceries', description='milk, bread, report card folder', user_id=user_id),
+    ])
+    db.session.commit()
+    return Task.query.filter_by(user_id=user_id)
+
+
+def test_match_query_uses_prefix_terms():
+    assert build_match_query('wor rep') == '"wor"* "rep"*'
+    assert build_match_query('rep', 'title') == 'title : ("rep"*)'
+    assert build_match_query('!!') is None
+
+
+def test_search_is_backed_by_fts_on_sqlite(db):
+    assert fts_enabled() == is_sqlite(db)
+
+
+def test_prefix_search_on_title(tasks):
+    assert titles(search_tasks(tasks, title='w')) == ['Workout', 'Write weekly report']
+    assert titles(search_tasks(tasks, title='work')) == ['Workout']
+    assert titles(search_tasks(tasks, title='report')) == ['Write weekly report']
+
+
+def test_search_on_description(tasks):
+    assert titles(search_tasks(tasks, description='report')) == ['Buy groceries']
+    assert titles(search_tasks(tasks, title='report', description='team')) == ['Write weekly report']
+
+
+def test_punctuation_only_matches_nothing(tasks):
+    if not fts_enabled():
+        pytest.skip("substring fallback matches punctuation literally")
+    assert titles(search_tasks(tasks, title='***')) == []
+
+
+def test_index_follows_updates_and_deletes(db, tasks):
+    task = tasks.filter_by(title='Workout').one()
+    task.title = 'Stretching'
+    db.session.commit()
+    assert titles(search_tasks(tasks, title='workout')) == []
+    assert titles(search_tasks(tasks, title='stretch')) == ['Stretching']
+
+    db.session.delete(task)
+    db.session.commit()
+    assert titles(search_tasks(tasks, title='stretch')) == []
+
+
+def test_search_only_returns_own_tasks(db, tasks, user_id):
+    from Neuronudge.models import User
+    other = User(username='other', email='other@example.com', password_hash='x')
+    db.session.add(other)
+    db.session.commit()
+    add_tasks(db, other.id, 3, title='Write report')
+    assert titles(search_tasks(tasks, title='report')) == ['Write weekly report']
+
+
+@pytest.mark.parametrize('ranked', [False, True])
+def test_full_text_query_runs_once(db, tasks, ranked):
+    if not fts_enabled():
+        pytest.skip("no full-text index on this database")
+    from sqlalchemy import text
+    query = search_tasks(tasks, title='report', ranked=ranked)
+    sql = query.statement.compile(db.engine, compile_kwargs={'literal_binds': True})
+    plan = [row[-1] for row in db.session.execute(text(f"EXPLAIN QUERY PLAN {sql}")).all()]
+    # Driven by the index hits, not probed once per task row ("INDEX 0:=M")
+    assert not any('task_fts VIRTUAL TABLE INDEX 0:=' in step for step in plan), plan
+    assert titles(query) == ['Write weekly report']
@@ -0,0 +1,87 @@
+# tests/test_stats.py
+from datetime import datetime, timedelta
+import pytest
+from Neuronudge.stats import MemoryStatsCache, TaskCounts, compute_task_counts, get_task_counts, invalidate_task_counts
+from conftest import add_tasks, count_queries
+
+
+def test_counts_come_from_one_query(db, user_id):
+    now = datetime.utcnow()
+    add_tasks(db, user_id, 4, completed=True)
+    add_tasks(db, user_id, 3, due_date=now - timedelta(days=1))
+    add_tasks(db, user_id, 2, due_date=now + timedelta(days=1))
+    add_tasks(db, user_id, 1, due_date=None)
+
+    with count_queries(db.engine) as statements:
+        counts = compute_task_counts(user_id, now)
+
+    assert len(statements) == 1
+    assert counts == TaskCounts(total=10, completed=4, pending=6, overdue=3)
+
+
+def test_no_tasks_gives_zero_counts(db, user_id):
+    assert compute_task_counts(user_id) == TaskCounts()
+
+
+def test_cached_counts_until_invalidated(db, user_id):
+    add_tasks(db, user_id, 2)
+    assert get_task_counts(user_id).total == 2
+
+    add_tasks(db, user_id, 1)
+    with count_queries(db.engine) as statements:
+        assert get_task_counts(user_id).total == 2
+    assert statements == []
+
+    invalidate_task_counts(user_id)
+    assert get_task_counts(user_id).total == 3
+
+
+def test_dashboard_counts_in_one_query(client, db, user_id):
+    add_tasks(db, user_id, 5)
+    invalidate_task_counts(user_id)
+    with count_queries(db.engine) as statements:
+        assert client.get('/dashboard').status_code == 200
+    assert sum('task.completed IS NULL' in s for s in statements) == 1
+
+
+def test_tasks_without_a_completed_flag_still_count_in_the_total(db, user_id):
+    add_tasks(db, user_id, 2, due_date=None)
+    add_tasks(db, user_id, 1, completed=None, due_date=None)
+    assert compute_task_counts(user_id) == TaskCounts(total=3, completed=0, pending=2, overdue=0)
+
+
+NEW_TASK = {'title': 'New task', 'description': '', 'due_date': '2030-01-01', 'priority': '2', 'status': 'not_started'}
+
+
+@pytest.mark.parametrize('url, body, change', [
+    ('/task/new', lambda id: {'data': NEW_TASK}, {'total': 1, 'pending': 1}),
+    ('/dashboard/custom', lambda id: {'data': NEW_TASK}, {'total': 1, 'pending': 1}),
+    ('/task/edit/{id}', lambda id: {'data': {**NEW_TASK, 'status': 'completed'}}, {'completed': 1, 'pending': -1}),
+    ('/task/delete/{id}', lambda id: {}, {'total': -1, 'pending': -1}),
+    ('/tasks/complete/{id}', lambda id: {}, {'completed': 1, 'pending': -1}),
+    ('/task/update_status/{id}', lambda id: {'json': {'status': 'completed'}}, {'completed': 1, 'pending': -1}),
+    ('/tasks/bulk-complete', lambda id: {'json': {'task_ids': [id]}}, {'completed': 1, 'pending': -1}),
+    ('/tasks/bulk-delete', lambda id: {'json': {'task_ids': [id]}}, {'total': -1, 'pending': -1}),
+])
+def test_every_task_write_invalidates_the_cached_counts(client, db, user_id, url, body, change):
+    task_id = add_tasks(db, user_id, 3, due_date=None)[0]
+    before = get_task_counts(user_id).as_dict()  # now cached
+
+    response = client.post(url.format(id=task_id), **body(task_id))
+    assert response.status_code in (200, 302)
+
+    expected = {key: before[key] + change.get(key, 0) for key in before}
+    assert get_task_counts(user_id).as_dict() == expected
+
+
+def test_memory_cache_evicts_least_recently_used_and_expires():
+    cache = MemoryStatsCache(maxsize=2, ttl=60)
+    cache.set(1, TaskCounts(total=1))
+    cache.set(2, TaskCounts(total=2))
+    assert cache.get(1) == TaskCounts(total=1)
+    cache.set(3, TaskCounts(total=3))
+    assert cache.get(2) is None and cache.get(1) == TaskCounts(total=1)
+
+    expired = MemoryStatsCache(ttl=-1)
+    expired.set(1, TaskCounts(total=1))
+    assert expired.get(1) is None
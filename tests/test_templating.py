@@ -0,0 +1,54 @@
+# tests/test_templating.py
+from types import SimpleNamespace
+import pytest
+from jinja2 import DictLoader, Environment
+from Neuronudge import templating
+from Neuronudge.templating import init_templates, preload_templates
+
+
+@pytest.fixture
+def compiles(monkeypatch):
+    """Names of the templates Jinja compiles from source."""
+    names = []
+    compile_source = Environment.compile
+
+    def spy(self, source, name=None, filename=None, *args, **kwargs):
+        names.append(name)
+        return compile_source(self, source, name, filename, *args, **kwargs)
+    monkeypatch.setattr(Environment, 'compile', spy)
+    return names
+
+
+def test_bytecode_cache_is_filled_and_reused(app, tmp_path, compiles):
+    app.config.update(TEMPLATE_BYTECODE_CACHE_DIR=str(tmp_path / 'jinja'), TEMPLATE_PRELOAD=True)
+    init_templates(app)
+    templates = app.jinja_env.list_templates(extensions=('html',))
+    assert sorted(compiles) == sorted(templates)
+    assert len(list((tmp_path / 'jinja').glob('__jinja2_*.cache'))) == len(templates)
+
+    # A new worker: nothing in memory, everything loaded from the cache directory
+    app.jinja_env.cache.clear()
+    compiles.clear()
+    compiled, _ = preload_templates(app)
+    assert compiled == len(templates)
+    assert compiles == []
+
+
+def test_preload_skips_templates_that_fail_to_compile(monkeypatch):
+    failed = []
+    monkeypatch.setattr(templating.logger, 'exception', lambda message, name: failed.append(name))
+    env = Environment(loader=DictLoader({
+        'good.html': '<p>{{ name }}</p>',
+        'broken.html': '{% if %}',
+        'notes.txt': '{% if %}',  # not a page template
+    }))
+    compiled, _ = preload_templates(SimpleNamespace(jinja_env=env))
+    assert compiled == 1
+    assert failed == ['broken.html']
+    assert env.get_template('good.html').render(name='x') == '<p>x</p>'
+
+
+def test_preload_can_be_turned_off(app, compiles):
+    app.config.update(TEMPLATE_BYTECODE_CACHE_DIR='', TEMPLATE_PRELOAD=False)
+    init_templates(app)
+    assert compiles == []
@@ -0,0 +1,43 @@
+# tests/test_user_context.py
+"""Each page loads the user once, with their preferences, however many tasks they have."""
+import pytest
+from Neuronudge.fragments import bump_fragment_version
+from Neuronudge.models import OnboardingPreferences
+from Neuronudge.stats import invalidate_task_counts
+from conftest import add_tasks, count_queries
+
+
+@pytest.fixture
+def preferences(db, user_id):
+    db.session.add(OnboardingPreferences(user_id=user_id, focus_time=40))
+    db.session.commit()
+
+
+def render_and_count(app, client, db, user_id, url):
+    # Drop the cached counts and widgets, as a task write would, so the whole page renders
+    invalidate_task_counts(user_id)
+    bump_fragment_version(user_id)
+    # A context of its own, so nothing memoized on g by an earlier request is reused
+    with app.app_context(), count_queries(db.engine) as statements:
+        assert client.get(url).status_code == 200
+    return statements
+
+
+@pytest.mark.parametrize('url', ['/dashboard', '/dashboard/custom', '/tasks'])
+def test_page_query_count_does_not_grow_with_tasks(app, client, db, user_id, preferences, url):
+    # More than a page either way; a short first page skips the paginator's COUNT
+    add_tasks(db, user_id, 15)
+    client.get(url)  # seeds the activity buffer
+    few = render_and_count(app, client, db, user_id, url)
+    add_tasks(db, user_id, 150)
+    many = render_and_count(app, client, db, user_id, url)
+    assert len(many) == len(few)
+
+
+@pytest.mark.parametrize('url', ['/dashboard', '/dashboard/custom', '/tasks'])
+def test_user_and_preferences_come_from_one_query(app, client, db, user_id, preferences, url):
+    statements = render_and_count(app, client, db, user_id, url)
+    user_loads = [s for s in statements if 'FROM user' in s]
+    assert len(user_loads) == 1
+    assert 'JOIN onboarding_preferences' in user_loads[0]
+    assert not [s for s in statements if 'FROM onboarding_preferences' in s]